@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -48,6 +49,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.QueryInstrumentationMiddleware',  # First, to time the whole stack
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS - must be before CommonMiddleware
@@ -82,13 +84,84 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+# BEGIN attempts retried (with backoff) by core.backends.sqlite3 after the
+# timeout below expires
+SQLITE_LOCK_RETRIES = 3
+
+SQLITE_OPTIONS = {
+    # Seconds a connection waits for another's write lock before failing
+    'timeout': 20,
+    # Take the write lock when a transaction starts (core.backends.sqlite3)
+    'transaction_mode': 'IMMEDIATE',
+    # WAL lets readers and the writer run concurrently; synchronous=NORMAL
+    # is durable against crashes in WAL mode and only risks the last commits
+    # on power loss; 64 MB page cache and 256 MB memory-mapped I/O per
+    # connection; temporary tables and indexes in memory.
+    'init_command': (
+        'PRAGMA journal_mode=WAL;'
+        'PRAGMA synchronous=NORMAL;'
+        'PRAGMA cache_size=-64000;'
+        'PRAGMA mmap_size=268435456;'
+        'PRAGMA temp_store=MEMORY'
+    ),
 }
 
+# DB_ENGINE and the other DB_* variables (see .env.example) select the
+# database; without them the app runs on SQLite in BASE_DIR.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'core.backends.sqlite3')
+
+if DB_ENGINE.endswith('postgresql'):
+    DB_PREPARE_THRESHOLD = os.environ.get('DB_PREPARE_THRESHOLD', '5')
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINE,
+            'NAME': os.environ.get('DB_NAME', 'personal_dev_app'),
+            'USER': os.environ.get('DB_USER', 'postgres'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            # Seconds a connection is kept for later requests instead of
+            # reconnecting (TCP, TLS and auth) on every one; 0 closes it
+            # after each request
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '600')),
+            # Check a kept connection before reusing it, so one the server
+            # dropped is replaced instead of failing the request
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                # Bind parameters on the server so psycopg can prepare
+                # statements: one a connection has run prepare_threshold
+                # times is then parsed and planned only once. Kept
+                # connections (above) carry them across requests. Leave
+                # DB_PREPARE_THRESHOLD empty behind PgBouncer in transaction
+                # mode, where a transaction may land on a server connection
+                # that never saw the statement.
+                'server_side_binding': (
+                    os.environ.get('DB_SERVER_SIDE_BINDING', '').lower()
+                    in ('1', 'true', 'yes')
+                ),
+                'prepare_threshold': (
+                    int(DB_PREPARE_THRESHOLD) if DB_PREPARE_THRESHOLD else None
+                ),
+            },
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINE,
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            # Read by core.backends.sqlite3 only; not an OPTIONS entry, as the
+            # stock backend passes those to sqlite3.connect()
+            'LOCK_RETRIES': SQLITE_LOCK_RETRIES,
+            # Django 5.0's own backend accepts only sqlite3.connect() options
+            'OPTIONS': (
+                SQLITE_OPTIONS
+                if DB_ENGINE == 'core.backends.sqlite3'
+                else {'timeout': SQLITE_OPTIONS['timeout']}
+            ),
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -121,6 +194,73 @@ USE_I18N = True
 USE_TZ = True
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Every process must see the same cache: stats entries are invalidated by
+# bumping a version key, and a per-process cache would keep serving entries
+# that another worker invalidated. Files under CACHE_DIR (default .cache/) are
+# shared by the processes of one host; set REDIS_URL to share across hosts.
+
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_DIR', BASE_DIR / '.cache'),
+        }
+    }
+
+# Cache alias and entry lifetime (seconds) for GET /api/habits/{id}/stats/
+HABIT_STATS_CACHE = 'default'
+HABIT_STATS_CACHE_TIMEOUT = 60 * 60
+
+# Nested logs in habit detail responses: default window (days) and the
+# default and maximum logs_limit. Full history is at /api/habits/{id}/logs/
+HABIT_LOGS_WINDOW_DAYS = 30
+HABIT_LOGS_LIMIT = 100
+
+# Maximum entries accepted by POST /api/habits/check-in/
+HABIT_CHECK_IN_MAX_ENTRIES = 100
+
+# Cache alias and replay window (seconds) for Idempotency-Key responses
+HABIT_IDEMPOTENCY_CACHE = 'default'
+HABIT_IDEMPOTENCY_TIMEOUT = 60 * 60
+
+# Days deletions are kept for GET /api/habits/sync/; older cursors must resync
+HABIT_SYNC_TOMBSTONE_DAYS = 90
+
+# Logs returned per GET /api/habits/sync/ page; clients follow "more"
+HABIT_SYNC_PAGE_SIZE = 1000
+
+# Longest range (days) one GET /api/habits/matrix/ or /trends/ request may cover
+HABIT_MATRIX_MAX_DAYS = 3 * 366
+
+
+# SQL instrumentation (core.middleware.QueryInstrumentationMiddleware)
+# Share of requests, from 0 to 1, that get a Server-Timing header and a
+# "core.sql" log line with query count, duplicates and DB time; 0 disables.
+SQL_INSTRUMENTATION_SAMPLE_RATE = float(
+    os.environ.get('SQL_INSTRUMENTATION_SAMPLE_RATE', '1' if DEBUG else '0')
+)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.sql': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.0/howto/static-files/
 
@@ -0,0 +1,20 @@
+"""
+Shared pytest fixtures for the backend test suite.
+"""
+
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(settings):
+    """
+    Start every test with an empty cache (ids are reused across tests), kept
+    in memory rather than in the development cache directory.
+    """
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    cache.clear()
+    yield
+    cache.clear()
@@ -0,0 +1,76 @@
+"""
+SQLite database backend for core app.
+Django's sqlite3 backend plus the OPTIONS that Django 5.1 adds, so these
+keep working with the stock backend after an upgrade:
+
+- "init_command": semicolon-separated SQL run on every new connection,
+  used for PRAGMAs such as journal_mode=WAL.
+- "transaction_mode": "IMMEDIATE" starts atomic blocks with BEGIN
+  IMMEDIATE. A deferred transaction that reads before it writes fails at
+  once with "database is locked" when another connection is writing, as
+  waiting could deadlock; taking the write lock at BEGIN lets it wait for
+  the busy timeout instead.
+
+It also retries a BEGIN that is still locked out after the busy timeout
+("timeout", in seconds) up to "LOCK_RETRIES" times, with exponential
+backoff, before the error is raised. Nothing has run in the transaction at
+that point, so retrying is always safe. LOCK_RETRIES sits beside OPTIONS
+in the database settings rather than in them: the stock backend passes
+every option it does not know to sqlite3.connect(), which rejects it, but
+ignores keys it does not read.
+"""
+
+import random
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import OperationalError
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = ("DEFERRED", "EXCLUSIVE", "IMMEDIATE")
+# First delay (seconds) between BEGIN retries; doubled on every retry.
+RETRY_BACKOFF = 0.05
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite connection with init commands, BEGIN modes and lock retries."""
+
+    transaction_mode = None
+    init_commands = ()
+    lock_retries = 0
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        mode = params.pop("transaction_mode", None)
+        if mode is not None and mode.upper() not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f"settings.DATABASES[{self.alias!r}]['OPTIONS']['transaction_mode'] "
+                f"must be one of {', '.join(TRANSACTION_MODES)}."
+            )
+        self.transaction_mode = mode.upper() if mode else None
+        self.init_commands = [
+            command.strip()
+            for command in params.pop("init_command", "").split(";")
+            if command.strip()
+        ]
+        self.lock_retries = self.settings_dict.get("LOCK_RETRIES", 0)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for command in self.init_commands:
+            conn.execute(command)
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        # Connecting reads transaction_mode from OPTIONS.
+        self.ensure_connection()
+        sql = f"BEGIN {self.transaction_mode}" if self.transaction_mode else "BEGIN"
+        for attempt in range(self.lock_retries + 1):
+            try:
+                self.cursor().execute(sql)
+                return
+            except OperationalError as error:
+                if attempt == self.lock_retries or "locked" not in str(error):
+                    raise
+            time.sleep(RETRY_BACKOFF * 2**attempt * random.uniform(0.5, 1.5))
@@ -0,0 +1,186 @@
+"""
+SQLite write benchmarks for core app.
+Runs the same concurrent workload against a scratch database file with
+Django's stock sqlite3 backend and with core.backends.sqlite3 configured by
+settings.SQLITE_OPTIONS and SQLITE_LOCK_RETRIES, and reports write
+throughput, latency and lock errors for each.
+
+Writer threads each repeat a transaction shaped like logging a habit: read
+the habit's stats, upsert a log row, then recompute the stats. Reader
+threads meanwhile run a full-table aggregate, the kind of long read that
+blocks writers from committing outside WAL mode.
+
+Run with ``manage.py benchmark_sqlite_writes``.
+"""
+
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import List
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+from habits.benchmarks import percentiles
+
+MODES = {
+    "stock": {"ENGINE": "django.db.backends.sqlite3", "OPTIONS": {}},
+    "tuned": {
+        "ENGINE": "core.backends.sqlite3",
+        "OPTIONS": settings.SQLITE_OPTIONS,
+        "LOCK_RETRIES": settings.SQLITE_LOCK_RETRIES,
+    },
+}
+SCHEMA = [
+    "CREATE TABLE bench_log (id INTEGER PRIMARY KEY, habit INTEGER NOT NULL, "
+    "day INTEGER NOT NULL, completed INTEGER NOT NULL, UNIQUE (habit, day))",
+    "CREATE TABLE bench_stats (habit INTEGER PRIMARY KEY, total INTEGER NOT NULL)",
+]
+UPSERT_LOG = (
+    "INSERT INTO bench_log (habit, day, completed) VALUES (%s, %s, %s) "
+    "ON CONFLICT (habit, day) DO UPDATE SET completed = excluded.completed"
+)
+UPDATE_STATS = (
+    "UPDATE bench_stats SET total = (SELECT COUNT(*) FROM bench_log "
+    "WHERE habit = %s AND completed) WHERE habit = %s"
+)
+READ_ALL = "SELECT habit, COUNT(*), SUM(completed) FROM bench_log GROUP BY habit"
+# Habits written to, and days of history seeded for each.
+HABITS = 200
+DAYS = 365
+
+
+def _register(mode: str, path: str) -> str:
+    """Add a database alias for ``mode`` on the file at ``path``."""
+    alias = f"sqlite_bench_{mode}"
+    connections.settings[alias] = {
+        **connections.settings[DEFAULT_DB_ALIAS],
+        **MODES[mode],
+        "NAME": path,
+        "TEST": {},
+    }
+    return alias
+
+
+def _unregister(alias: str):
+    """Close every thread's connection for ``alias`` and forget it."""
+    connections[alias].close()
+    del connections[alias]
+    del connections.settings[alias]
+
+
+def _seed(alias: str):
+    """Create the benchmark tables with DAYS of logs per habit."""
+    rng = random.Random(0)
+    with transaction.atomic(using=alias), connections[alias].cursor() as cursor:
+        for statement in SCHEMA:
+            cursor.execute(statement)
+        cursor.executemany(
+            "INSERT INTO bench_log (habit, day, completed) VALUES (%s, %s, %s)",
+            [
+                (habit, day, rng.random() < 0.7)
+                for habit in range(HABITS)
+                for day in range(DAYS)
+            ],
+        )
+        cursor.execute(
+            "INSERT INTO bench_stats (habit, total) SELECT habit, SUM(completed) "
+            "FROM bench_log GROUP BY habit"
+        )
+
+
+def _writer(alias, deadline, seed, latencies, errors):
+    """Run log-shaped write transactions until ``deadline``."""
+    rng = random.Random(seed)
+    try:
+        while time.monotonic() < deadline:
+            habit = rng.randrange(HABITS)
+            day = DAYS + rng.randrange(DAYS)
+            started = time.perf_counter()
+            try:
+                with transaction.atomic(using=alias):
+                    with connections[alias].cursor() as cursor:
+                        cursor.execute(
+                            "SELECT total FROM bench_stats WHERE habit = %s", [habit]
+                        )
+                        cursor.execute(UPSERT_LOG, [habit, day, rng.random() < 0.8])
+                        cursor.execute(UPDATE_STATS, [habit, habit])
+            except OperationalError as error:
+                errors.append(str(error))
+            else:
+                latencies.append(time.perf_counter() - started)
+    finally:
+        connections[alias].close()
+
+
+def _reader(alias, deadline, reads):
+    """Run full-table aggregates until ``deadline``."""
+    try:
+        while time.monotonic() < deadline:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(READ_ALL)
+                cursor.fetchall()
+            reads.append(1)
+    finally:
+        connections[alias].close()
+
+
+def run_write_benchmark(
+    mode: str, writers: int = 8, readers: int = 2, duration: float = 5.0
+) -> dict:
+    """Run the workload for ``mode`` ("stock" or "tuned") on a scratch file."""
+    with tempfile.TemporaryDirectory() as directory:
+        alias = _register(mode, os.path.join(directory, f"{mode}.sqlite3"))
+        try:
+            _seed(alias)
+            connections[alias].close()
+            latencies, errors, reads = [], [], []
+            deadline = time.monotonic() + duration
+            threads = [
+                threading.Thread(
+                    target=_writer, args=(alias, deadline, seed, latencies, errors)
+                )
+                for seed in range(writers)
+            ] + [
+                threading.Thread(target=_reader, args=(alias, deadline, reads))
+                for _ in range(readers)
+            ]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            _unregister(alias)
+
+    return {
+        "mode": mode,
+        "writers": writers,
+        "readers": readers,
+        "seconds": round(elapsed, 3),
+        "writes": len(latencies),
+        "writes_per_second": round(len(latencies) / elapsed, 1),
+        "errors": len(errors),
+        "locked": sum("locked" in error for error in errors),
+        "reads_per_second": round(len(reads) / elapsed, 1),
+        **(percentiles(latencies) if latencies else {}),
+    }
+
+
+def format_results(results: List[dict]) -> str:
+    """Render write benchmark results as a text table."""
+    lines = [
+        f"  {'mode':<7}{'writes/s':>10}{'errors':>8}{'locked':>8}"
+        f"{'p50':>9}{'p99':>9}{'max':>9}{'reads/s':>9}"
+    ]
+    for result in results:
+        lines.append(
+            f"  {result['mode']:<7}{result['writes_per_second']:>10.1f}"
+            f"{result['errors']:>8}{result['locked']:>8}"
+            f"{result.get('p50_ms', 0):>9.1f}{result.get('p99_ms', 0):>9.1f}"
+            f"{result.get('max_ms', 0):>9.1f}{result['reads_per_second']:>9.1f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,67 @@
+"""
+Management command to compare SQLite write throughput under concurrency
+between Django's stock sqlite3 backend and core.backends.sqlite3 with
+settings.SQLITE_OPTIONS. Uses scratch database files only.
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import MODES, format_results, run_write_benchmark
+
+
+class Command(BaseCommand):
+    help = "Benchmark concurrent SQLite writes, stock backend vs tuned backend."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--modes",
+            nargs="+",
+            choices=list(MODES),
+            default=list(MODES),
+            help="Backends to run (default: all).",
+        )
+        parser.add_argument(
+            "--writers",
+            type=int,
+            default=8,
+            help="Concurrent writer threads (default: 8).",
+        )
+        parser.add_argument(
+            "--readers",
+            type=int,
+            default=2,
+            help="Concurrent reader threads (default: 2).",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=5.0,
+            help="Seconds per mode (default: 5).",
+        )
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+
+    def handle(self, *args, **options):
+        if options["writers"] < 1 or options["readers"] < 0:
+            raise CommandError("Use at least one writer and no negative readers.")
+
+        results = []
+        for mode in options["modes"]:
+            results.append(
+                run_write_benchmark(
+                    mode, options["writers"], options["readers"], options["duration"]
+                )
+            )
+        self.stdout.write(format_results(results))
+
+        if len(results) == 2 and results[0]["writes_per_second"]:
+            ratio = results[1]["writes_per_second"] / results[0]["writes_per_second"]
+            self.stdout.write(
+                f"{results[1]['mode']} writes {ratio:.1f}x as fast as "
+                f"{results[0]['mode']}"
+            )
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                json.dump(results, handle, indent=2)
+            self.stdout.write(f"Wrote results to {options['output']}")
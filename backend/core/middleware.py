@@ -0,0 +1,97 @@
+"""
+Request instrumentation middleware for core app.
+Counts the SQL queries each sampled request runs, and the time spent in
+them, through connection.execute_wrapper. Results go to a Server-Timing
+response header (shown in browser dev tools) and one log line per request
+on the "core.sql" logger.
+
+Enabled by SQL_INSTRUMENTATION_SAMPLE_RATE, the share of requests measured:
+1.0 measures every request, 0 removes the middleware. Queries run while a
+streaming response is consumed happen after the response is returned and
+are not counted.
+"""
+
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger("core.sql")
+
+
+class QueryStats:
+    """execute_wrapper that counts queries, repeats and time spent in them."""
+
+    def __init__(self):
+        self.statements = Counter()
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.statements[sql, repr(params)] += 1
+
+    @property
+    def count(self) -> int:
+        """Number of queries run."""
+        return sum(self.statements.values())
+
+    @property
+    def duplicates(self) -> int:
+        """Queries that repeated an earlier query with the same parameters."""
+        return self.count - len(self.statements)
+
+
+class QueryInstrumentationMiddleware:
+    """Measure SQL per request and report it via Server-Timing and logging."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.SQL_INSTRUMENTATION_SAMPLE_RATE
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        stats = QueryStats()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - started) * 1000
+        db_ms = stats.seconds * 1000
+
+        timing = (
+            f'db;dur={db_ms:.1f};desc="{stats.count} queries, '
+            f'{stats.duplicates} duplicates", total;dur={total_ms:.1f}'
+        )
+        if response.has_header("Server-Timing"):
+            timing = f"{response['Server-Timing']}, {timing}"
+        response["Server-Timing"] = timing
+
+        match = request.resolver_match
+        fields = {
+            "view": match.view_name if match else None,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": stats.count,
+            "duplicates": stats.duplicates,
+            "db_ms": round(db_ms, 1),
+            "total_ms": round(total_ms, 1),
+        }
+        logger.info(
+            " ".join(f"{name}=%s" for name in fields), *fields.values(), extra=fields
+        )
+        return response
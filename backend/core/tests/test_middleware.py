@@ -0,0 +1,69 @@
+"""
+Unit tests for core middleware (per-request SQL instrumentation).
+"""
+
+import logging
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.middleware import QueryStats
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestQueryStats:
+    """Test the query counting execute wrapper."""
+
+    def test_counts_queries_and_duplicates(self):
+        """Test that repeated statements with equal parameters are duplicates."""
+        stats = QueryStats()
+
+        with connection.execute_wrapper(stats):
+            for pk in (1, 1, 2):
+                User.objects.filter(pk=pk).exists()
+
+        assert stats.count == 3
+        assert stats.duplicates == 1
+        assert stats.seconds > 0
+
+
+@pytest.mark.django_db
+class TestQueryInstrumentationMiddleware:
+    """Test Server-Timing headers and log lines from the middleware."""
+
+    def setup_method(self):
+        """Create an authenticated client."""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("habits:habit-list")
+
+    @override_settings(SQL_INSTRUMENTATION_SAMPLE_RATE=1.0)
+    def test_sampled_request_is_measured(self, caplog):
+        """Test that a measured request reports its queries two ways."""
+        with caplog.at_level(logging.INFO, logger="core.sql"):
+            response = self.client.get(self.url)
+
+        assert response["Server-Timing"].startswith("db;dur=")
+        assert "total;dur=" in response["Server-Timing"]
+        (record,) = [r for r in caplog.records if r.name == "core.sql"]
+        assert record.view == "habits:habit-list"
+        assert record.status == 200
+        assert record.queries >= 1
+        assert f'"{record.queries} queries' in response["Server-Timing"]
+        assert "queries=" in record.getMessage()
+
+    @override_settings(SQL_INSTRUMENTATION_SAMPLE_RATE=0)
+    def test_disabled_by_zero_rate(self, caplog):
+        """Test that a zero sample rate removes the middleware."""
+        with caplog.at_level(logging.INFO, logger="core.sql"):
+            response = self.client.get(self.url)
+
+        assert not response.has_header("Server-Timing")
+        assert not [r for r in caplog.records if r.name == "core.sql"]
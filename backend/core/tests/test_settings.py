@@ -0,0 +1,108 @@
+"""
+Unit tests for environment-driven database and cache settings.
+"""
+
+import runpy
+
+from django.conf import settings
+
+SETTINGS_FILE = settings.BASE_DIR / "config" / "settings.py"
+DB_VARIABLES = [
+    "DB_ENGINE",
+    "DB_NAME",
+    "DB_CONN_MAX_AGE",
+    "DB_SERVER_SIDE_BINDING",
+    "DB_PREPARE_THRESHOLD",
+]
+CACHE_VARIABLES = ["REDIS_URL", "CACHE_DIR"]
+
+
+def load_settings(monkeypatch, **environ) -> dict:
+    """Evaluate the settings module under ``environ``; return its globals."""
+    for name in DB_VARIABLES + CACHE_VARIABLES:
+        monkeypatch.delenv(name, raising=False)
+    for name, value in environ.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_path(str(SETTINGS_FILE))
+
+
+def load_databases(monkeypatch, **environ):
+    """Evaluate the settings module under ``environ``; return DATABASES."""
+    return load_settings(monkeypatch, **environ)["DATABASES"]["default"]
+
+
+class TestDatabaseSettings:
+    """Test DATABASES built from DB_* variables."""
+
+    def test_sqlite_by_default(self, monkeypatch):
+        """Test the tuned SQLite backend without any DB_* variables."""
+        database = load_databases(monkeypatch)
+
+        assert database["ENGINE"] == "core.backends.sqlite3"
+        assert database["NAME"] == settings.BASE_DIR / "db.sqlite3"
+        assert database["OPTIONS"]["transaction_mode"] == "IMMEDIATE"
+        assert database["LOCK_RETRIES"] == 3
+        assert "lock_retries" not in database["OPTIONS"]
+
+    def test_stock_sqlite_backend_gets_connect_options_only(self, monkeypatch):
+        """Test that Django's backend is not passed options it rejects."""
+        database = load_databases(
+            monkeypatch, DB_ENGINE="django.db.backends.sqlite3", DB_NAME="other.db"
+        )
+
+        assert database["NAME"] == "other.db"
+        assert database["OPTIONS"] == {"timeout": 20}
+
+    def test_postgresql_keeps_connections(self, monkeypatch):
+        """Test persistent, health-checked connections and prepared statements."""
+        database = load_databases(
+            monkeypatch,
+            DB_ENGINE="django.db.backends.postgresql",
+            DB_NAME="habits",
+            DB_SERVER_SIDE_BINDING="true",
+        )
+
+        assert database["NAME"] == "habits"
+        assert database["CONN_MAX_AGE"] == 600
+        assert database["CONN_HEALTH_CHECKS"] is True
+        assert database["OPTIONS"] == {
+            "server_side_binding": True,
+            "prepare_threshold": 5,
+        }
+
+    def test_prepared_statements_can_be_disabled(self, monkeypatch):
+        """Test that an empty DB_PREPARE_THRESHOLD turns preparing off."""
+        database = load_databases(
+            monkeypatch,
+            DB_ENGINE="django.db.backends.postgresql",
+            DB_CONN_MAX_AGE="0",
+            DB_PREPARE_THRESHOLD="",
+        )
+
+        assert database["CONN_MAX_AGE"] == 0
+        assert database["OPTIONS"]["server_side_binding"] is False
+        assert database["OPTIONS"]["prepare_threshold"] is None
+
+
+class TestCacheSettings:
+    """Test CACHES built from REDIS_URL and CACHE_DIR."""
+
+    def test_file_cache_by_default(self, monkeypatch):
+        """Test that the default cache is shared by processes, not per process."""
+        cache = load_settings(monkeypatch)["CACHES"]["default"]
+
+        assert cache["BACKEND"].endswith("FileBasedCache")
+        assert cache["LOCATION"] == settings.BASE_DIR / ".cache"
+
+    def test_cache_dir_and_redis(self, monkeypatch):
+        """Test CACHE_DIR moving the file cache and REDIS_URL replacing it."""
+        cache = load_settings(monkeypatch, CACHE_DIR="/tmp/habits")["CACHES"]
+        assert cache["default"]["LOCATION"] == "/tmp/habits"
+
+        cache = load_settings(
+            monkeypatch, CACHE_DIR="/tmp/habits", REDIS_URL="redis://cache:6379/0"
+        )["CACHES"]
+        assert cache["default"] == {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": "redis://cache:6379/0",
+        }
@@ -0,0 +1,105 @@
+"""
+Unit tests for the SQLite backend and its write benchmark.
+"""
+
+import threading
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import OperationalError, connection, connections
+from core.backends.sqlite3.base import DatabaseWrapper
+from core.benchmarks import format_results, run_write_benchmark
+
+
+def wrapper(path, lock_retries=0, **options):
+    """Return a backend connection to the SQLite file at ``path``."""
+    return DatabaseWrapper(
+        {
+            **connections.settings["default"],
+            "NAME": str(path),
+            "OPTIONS": options,
+            "LOCK_RETRIES": lock_retries,
+        },
+        alias="scratch",
+    )
+
+
+def pragma(db, name):
+    """Return the value of PRAGMA ``name`` on ``db``."""
+    with db.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db
+class TestSQLiteBackend:
+    """Test init commands, transaction modes and lock retries."""
+
+    def test_settings_options_apply_to_connections(self):
+        """Test that the configured pragmas and BEGIN mode are in effect."""
+        assert connection.transaction_mode == "IMMEDIATE"
+        assert connection.lock_retries == 3
+        assert pragma(connection, "cache_size") == -64000
+        assert pragma(connection, "busy_timeout") == 20000
+
+    def test_init_command_enables_wal(self, tmp_path):
+        """Test that init_command statements run on a file database."""
+        db = wrapper(
+            tmp_path / "wal.sqlite3",
+            init_command="PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL",
+        )
+        try:
+            assert pragma(db, "journal_mode") == "wal"
+            assert pragma(db, "synchronous") == 1
+        finally:
+            db.close()
+
+    def test_invalid_transaction_mode(self, tmp_path):
+        """Test that unknown BEGIN modes are rejected."""
+        db = wrapper(tmp_path / "bad.sqlite3", transaction_mode="LATER")
+
+        with pytest.raises(ImproperlyConfigured, match="transaction_mode"):
+            db.ensure_connection()
+
+    def test_begin_is_retried_until_the_lock_is_released(self, tmp_path):
+        """Test that a locked-out BEGIN IMMEDIATE retries, then gives up."""
+        path = tmp_path / "locked.sqlite3"
+        holder = wrapper(path, transaction_mode="IMMEDIATE")
+        patient = wrapper(
+            path, timeout=0.05, transaction_mode="IMMEDIATE", lock_retries=5
+        )
+        impatient = wrapper(
+            path, timeout=0.05, transaction_mode="IMMEDIATE", lock_retries=0
+        )
+        try:
+            holder._start_transaction_under_autocommit()
+            with pytest.raises(OperationalError, match="locked"):
+                impatient._start_transaction_under_autocommit()
+
+            release = threading.Timer(0.2, holder.connection.rollback)
+            release.start()
+            patient._start_transaction_under_autocommit()
+            release.join()
+            assert patient.connection.in_transaction
+        finally:
+            for db in (holder, patient, impatient):
+                db.close()
+
+
+@pytest.mark.django_db
+class TestWriteBenchmark:
+    """Test the stock versus tuned write benchmark."""
+
+    def test_both_modes_report_throughput(self):
+        """Test result fields, and that the tuned backend never locks out."""
+        results = [
+            run_write_benchmark(mode, writers=3, readers=1, duration=0.3)
+            for mode in ("stock", "tuned")
+        ]
+
+        stock, tuned = results
+        assert stock["writes"] > 0 and tuned["writes"] > 0
+        assert tuned["errors"] == 0
+        assert tuned["p99_ms"] >= tuned["p50_ms"]
+        assert "sqlite_bench_tuned" not in connections.settings
+        assert "tuned" in format_results(results)
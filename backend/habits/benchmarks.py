@@ -0,0 +1,279 @@
+"""
+Endpoint benchmarks for habits app.
+Seeds a synthetic dataset of users x habits x days of logs, times the main
+API endpoints through the Django test client with real JWT authentication,
+and reports latency percentiles and query counts per dataset size.
+
+Each user's first habit is completed every day, so its streak grows with
+the number of days; check_growth() flags endpoints whose latency or query
+count grows with it. Results are plain dicts that serialize to JSON, so
+runs can be saved and compared with compare_runs().
+
+Run with ``manage.py benchmark_endpoints`` or ``pytest -m benchmark``.
+"""
+
+import math
+import re
+import time
+from datetime import date
+from typing import Callable, Dict, List, NamedTuple
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from core.middleware import QueryStats
+from habits import seeding
+from habits.models import Habit
+
+User = get_user_model()
+
+DEFAULT_SIZES = ["1x5x30", "1x5x365", "1x5x1095"]
+PASSWORD = "benchmark-password"
+# Share of days logged as completed for every habit but the streak habit.
+COMPLETION_RATE = 0.7
+# Latency growing faster than days ** GROWTH_LIMIT is flagged...
+GROWTH_LIMIT = 0.5
+# ...as long as the median grew by more than NOISE_MS.
+NOISE_MS = 2.0
+# A median this much slower than the previous run is a regression.
+REGRESSION_RATIO = 1.25
+# Password hashing dominates login, so it is sampled less often.
+AUTH_REPEATS = 5
+
+SIZE_PATTERN = re.compile(r"^(\d+)x(\d+)x(\d+)$")
+
+
+class DatasetSize(NamedTuple):
+    """Number of users, habits per user and days of logs per habit."""
+
+    users: int
+    habits: int
+    days: int
+
+    @classmethod
+    def parse(cls, value: str) -> "DatasetSize":
+        """Parse "USERSxHABITSxDAYS", e.g. "10x5x365"."""
+        match = SIZE_PATTERN.match(value)
+        counts = [int(group) for group in match.groups()] if match else [0]
+        if 0 in counts:
+            raise ValueError(f"Invalid dataset size {value!r}; use USERSxHABITSxDAYS.")
+        return cls(*counts)
+
+    def __str__(self):
+        return f"{self.users}x{self.habits}x{self.days}"
+
+
+def seed_dataset(size: DatasetSize, prefix: str = "bench", seed: int = 0) -> list:
+    """
+    Create ``size`` worth of users, daily habits and logs ending today.
+    Every habit-day is logged; the first habit of each user is always
+    completed. Users share one pre-hashed PASSWORD. Returns the users.
+    """
+    seeding.seed(
+        size.users,
+        size.habits,
+        size.days,
+        density=1.0,
+        completion_rate=COMPLETION_RATE,
+        streak_habits=1,
+        prefix=prefix,
+        password=PASSWORD,
+        rng_seed=seed,
+    )
+    return list(User.objects.filter(username__startswith=prefix).order_by("pk"))
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Return nearest-rank p50/p90/p95/p99, mean and max of seconds, in ms."""
+    ordered = sorted(samples)
+
+    def rank(percent):
+        return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)] * 1000
+
+    return {
+        "p50_ms": round(rank(50), 3),
+        "p90_ms": round(rank(90), 3),
+        "p95_ms": round(rank(95), 3),
+        "p99_ms": round(rank(99), 3),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def endpoint_requests(user, habit) -> Dict[str, Callable]:
+    """Return a request function per benchmarked endpoint."""
+    client = Client()
+    auth = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}"}
+    refresh = {"token": str(RefreshToken.for_user(user))}
+    today = date.today().isoformat()
+
+    def log():
+        return client.post(
+            reverse("habits:habit-log", args=[habit.pk]),
+            {"date": today, "completed": True},
+            content_type="application/json",
+            **auth,
+        )
+
+    def login():
+        return client.post(
+            reverse("login"),
+            {"username": user.username, "password": PASSWORD},
+            content_type="application/json",
+        )
+
+    def token_refresh():
+        # Refresh tokens rotate, so each call uses the previous call's token.
+        response = client.post(
+            reverse("token_refresh"),
+            {"refresh": refresh["token"]},
+            content_type="application/json",
+        )
+        refresh["token"] = response.json().get("refresh", refresh["token"])
+        return response
+
+    return {
+        "habit-list": lambda: client.get(reverse("habits:habit-list"), **auth),
+        "habit-detail": lambda: client.get(
+            reverse("habits:habit-detail", args=[habit.pk]), **auth
+        ),
+        "habit-stats": lambda: client.get(
+            reverse("habits:habit-stats", args=[habit.pk]), **auth
+        ),
+        "log-list": lambda: client.get(reverse("habits:habitlog-list"), **auth),
+        "habit-log": log,
+        "auth-login": login,
+        "auth-refresh": token_refresh,
+    }
+
+
+def time_endpoint(request: Callable, repeats: int) -> dict:
+    """Time ``repeats`` calls after a warm-up call that counts queries."""
+    queries = QueryStats()
+    with connection.execute_wrapper(queries):
+        response = request()
+    if response.status_code >= 400:
+        raise RuntimeError(f"Benchmark request failed with {response.status_code}")
+
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        request()
+        samples.append(time.perf_counter() - started)
+    return {
+        **percentiles(samples),
+        "queries": queries.count,
+        "duplicate_queries": queries.duplicates,
+    }
+
+
+def benchmark_size(size: DatasetSize, repeats: int = 20) -> dict:
+    """Seed ``size``, time every endpoint for its first user, then clean up."""
+    prefix = f"bench{size}_"
+    users = seed_dataset(size, prefix=prefix)
+    try:
+        habit = Habit.objects.filter(user=users[0]).order_by("pk").first()
+        endpoints = {}
+        for name, request in endpoint_requests(users[0], habit).items():
+            count = min(repeats, AUTH_REPEATS) if name.startswith("auth-") else repeats
+            endpoints[name] = time_endpoint(request, count)
+        return {
+            "size": str(size),
+            **size._asdict(),
+            "logs": size.users * size.habits * size.days,
+            "repeats": repeats,
+            "endpoints": endpoints,
+        }
+    finally:
+        User.objects.filter(username__startswith=prefix).delete()
+
+
+def run_benchmarks(sizes, repeats: int = 20, progress=None) -> dict:
+    """Benchmark every size in turn; ``progress`` is called with each result."""
+    results = []
+    for size in sizes:
+        result = benchmark_size(DatasetSize.parse(str(size)), repeats)
+        results.append(result)
+        if progress is not None:
+            progress(result)
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "database": connection.vendor,
+        "results": results,
+        "warnings": check_growth(results),
+    }
+
+
+def check_growth(results: List[dict]) -> List[str]:
+    """
+    Flag endpoints whose median latency grows faster than days ** GROWTH_LIMIT
+    (by more than NOISE_MS) or whose query count grows, between the sizes
+    with the fewest and the most days.
+    """
+    if len(results) < 2:
+        return []
+    first = min(results, key=lambda result: result["days"])
+    last = max(results, key=lambda result: result["days"])
+    if last["days"] == first["days"]:
+        return []
+
+    warnings = []
+    days_ratio = last["days"] / first["days"]
+    for name, before in first["endpoints"].items():
+        after = last["endpoints"].get(name)
+        if after is None or not before["p50_ms"]:
+            continue
+        exponent = math.log(after["p50_ms"] / before["p50_ms"]) / math.log(days_ratio)
+        if exponent > GROWTH_LIMIT and after["p50_ms"] - before["p50_ms"] > NOISE_MS:
+            warnings.append(
+                f"{name}: p50 {before['p50_ms']:.1f} ms -> {after['p50_ms']:.1f} ms "
+                f"from {first['days']} to {last['days']} days (~days^{exponent:.2f})"
+            )
+        if after["queries"] > before["queries"]:
+            warnings.append(
+                f"{name}: {before['queries']} -> {after['queries']} queries "
+                f"from {first['days']} to {last['days']} days"
+            )
+    return warnings
+
+
+def compare_runs(previous: dict, current: dict) -> List[str]:
+    """List endpoints whose median slowed by REGRESSION_RATIO since ``previous``."""
+    earlier = {
+        (result["size"], name): timings
+        for result in previous.get("results", [])
+        for name, timings in result["endpoints"].items()
+    }
+    regressions = []
+    for result in current["results"]:
+        for name, timings in result["endpoints"].items():
+            before = earlier.get((result["size"], name))
+            if before is None:
+                continue
+            slower = timings["p50_ms"] - before["p50_ms"]
+            if (
+                timings["p50_ms"] > before["p50_ms"] * REGRESSION_RATIO
+                and slower > NOISE_MS
+            ):
+                regressions.append(
+                    f"{name} at {result['size']}: p50 {before['p50_ms']:.1f} ms "
+                    f"-> {timings['p50_ms']:.1f} ms"
+                )
+    return regressions
+
+
+def format_table(result: dict) -> str:
+    """Render one size's timings as a text table."""
+    lines = [
+        f"{result['size']} ({result['logs']} logs)",
+        f"  {'endpoint':<14}{'p50':>9}{'p90':>9}{'p99':>9}{'queries':>9}",
+    ]
+    for name, timings in result["endpoints"].items():
+        lines.append(
+            f"  {name:<14}{timings['p50_ms']:>9.2f}{timings['p90_ms']:>9.2f}"
+            f"{timings['p99_ms']:>9.2f}{timings['queries']:>9}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,255 @@
+"""
+Bit-packed completion history for habits.
+Each habit stores one bit per day in Habit.completion_bits, so streaks and
+completion counts are bit scans over a few hundred bytes instead of HabitLog
+row scans. HabitLog stays the source of truth; the bitmap is derived from it.
+
+Bit 0 is Habit.completion_bits_origin, the earliest completed day, and the
+bitmap is kept in that canonical form so equal histories compare equal.
+"""
+
+import base64
+from datetime import date, timedelta
+from typing import Iterable, Iterator, Optional, Tuple
+
+from django.db import transaction
+
+from habits.models import Habit, HabitLog
+
+
+class CompletionBitmap:
+    """Completed days of one habit packed into an integer, bit 0 at ``origin``."""
+
+    __slots__ = ("origin", "bits")
+
+    def __init__(self, origin: Optional[date] = None, bits: int = 0):
+        self.origin = origin
+        self.bits = bits
+
+    @classmethod
+    def from_habit(cls, habit) -> "CompletionBitmap":
+        """Load the bitmap stored on a habit row."""
+        return cls(
+            habit.completion_bits_origin,
+            int.from_bytes(bytes(habit.completion_bits), "little"),
+        )
+
+    @classmethod
+    def from_dates(cls, days: Iterable[date]) -> "CompletionBitmap":
+        """Build a bitmap from completed dates."""
+        bitmap = cls()
+        for day in days:
+            bitmap.set(day)
+        return bitmap
+
+    def to_fields(self) -> Tuple[Optional[date], bytes]:
+        """Return values for completion_bits_origin and completion_bits."""
+        return self.origin, self.bits.to_bytes(
+            (self.bits.bit_length() + 7) // 8, "little"
+        )
+
+    def __eq__(self, other):
+        return (self.origin, self.bits) == (other.origin, other.bits)
+
+    def __contains__(self, day: date) -> bool:
+        if self.origin is None or day < self.origin:
+            return False
+        return bool(self.bits >> (day - self.origin).days & 1)
+
+    def set(self, day: date, completed: bool = True):
+        """Mark ``day`` as completed or not completed."""
+        if not completed:
+            if day in self:
+                self.bits &= ~(1 << (day - self.origin).days)
+                self._normalize()
+            return
+        if self.origin is None:
+            self.origin, self.bits = day, 1
+        elif day < self.origin:
+            self.bits = (self.bits << (self.origin - day).days) | 1
+            self.origin = day
+        else:
+            self.bits |= 1 << (day - self.origin).days
+
+    def _normalize(self):
+        """Move the origin up to the earliest remaining completed day."""
+        if not self.bits:
+            self.origin = None
+            return
+        shift = (self.bits & -self.bits).bit_length() - 1
+        self.bits >>= shift
+        self.origin += timedelta(days=shift)
+
+    def count(self) -> int:
+        """Number of completed days (popcount)."""
+        return self.bits.bit_count()
+
+    def current_streak(self, today: date) -> int:
+        """Completed days in the run ending at ``today``."""
+        if today not in self:
+            return 0
+        position = (today - self.origin).days
+        # The highest missing day at or below today bounds the run.
+        gaps = ~self.bits & ((1 << (position + 1)) - 1)
+        return position + 1 - gaps.bit_length()
+
+    def longest_streak(self) -> int:
+        """Length of the longest run of completed days."""
+        return max((length for _, length in self.runs()), default=0)
+
+    def window(self, start: date, end: date) -> int:
+        """Completed days from ``start`` to ``end`` inclusive, bit 0 at start."""
+        if self.origin is None or end < start:
+            return 0
+        offset = (start - self.origin).days
+        bits = self.bits >> offset if offset >= 0 else self.bits << -offset
+        return bits & ((1 << ((end - start).days + 1)) - 1)
+
+    def runs(self) -> Iterator[Tuple[date, int]]:
+        """Yield (start, length) for each run of completed days, oldest first."""
+        bits, offset = self.bits, 0
+        while bits:
+            zeros = (bits & -bits).bit_length() - 1
+            bits >>= zeros
+            offset += zeros
+            ones = (~bits & (bits + 1)).bit_length() - 1
+            yield self.origin + timedelta(days=offset), ones
+            bits >>= ones
+            offset += ones
+
+
+def encode_window(bits: int, length: int, encoding: str = "bits"):
+    """
+    Encode ``length`` days of a window for transport.
+
+    "bits" gives base64 of the little-endian bytes (bit 0 is the first day);
+    "runs" gives alternating run lengths starting with a run of missed days,
+    so [0, 3, 2, 1] reads three done, two missed, one done.
+    """
+    if encoding == "bits":
+        return base64.b64encode(bits.to_bytes((length + 7) // 8, "little")).decode()
+
+    runs, position, completed = [], 0, False
+    while position < length:
+        # Trailing zeros of the remaining bits (inverted for a completed run).
+        rest = (~bits if completed else bits) >> position
+        run = (rest & -rest).bit_length() - 1 if rest else length - position
+        run = min(run, length - position)
+        runs.append(run)
+        position += run
+        completed = not completed
+    return runs
+
+
+def completion_matrix(habits, start: date, end: date, encoding: str = "bits"):
+    """Return one encoded completion vector per habit over start..end."""
+    length = (end - start).days + 1
+    matrix = []
+    for habit in habits:
+        bits = CompletionBitmap.from_habit(habit).window(start, end)
+        matrix.append(
+            {
+                "id": habit.pk,
+                "name": habit.name,
+                "completed": bits.bit_count(),
+                encoding: encode_window(bits, length, encoding),
+            }
+        )
+    return matrix
+
+
+def record_day(habit_id: int, day: date, completed: bool, habit=None):
+    """Set one day's bit for a habit, locking its row for the update."""
+    with transaction.atomic():
+        row = (
+            Habit.objects.select_for_update()
+            .filter(pk=habit_id)
+            .values("completion_bits", "completion_bits_origin")
+            .first()
+        )
+        if row is None:
+            return
+        bitmap = CompletionBitmap(
+            row["completion_bits_origin"],
+            int.from_bytes(bytes(row["completion_bits"]), "little"),
+        )
+        bitmap.set(day, completed)
+        _store(habit_id, bitmap, habit)
+
+
+def record_days(days: Iterable[Tuple[int, date, bool]]) -> dict:
+    """
+    Set the bits of (habit_id, day, completed) triples, locking each habit's
+    row, and store every changed bitmap in one update. Returns the updated
+    bitmaps by habit id.
+    """
+    days = list(days)
+    with transaction.atomic(savepoint=False):
+        bitmaps = {
+            habit.pk: CompletionBitmap.from_habit(habit)
+            for habit in Habit.objects.select_for_update()
+            .filter(pk__in={habit_id for habit_id, _, _ in days})
+            .order_by("pk")
+            .only("completion_bits", "completion_bits_origin")
+        }
+        for habit_id, day, completed in days:
+            if habit_id in bitmaps:
+                bitmaps[habit_id].set(day, completed)
+        _store_all(bitmaps)
+    return bitmaps
+
+
+def compute_bitmaps(habit_ids: Iterable[int]) -> dict:
+    """Return a fresh bitmap for each habit id from its completed logs."""
+    bitmaps = {habit_id: CompletionBitmap() for habit_id in habit_ids}
+    rows = (
+        HabitLog.objects.filter(habit_id__in=list(bitmaps), completed=True)
+        .order_by()
+        .values_list("habit_id", "date")
+        .iterator()
+    )
+    for habit_id, day in rows:
+        bitmaps[habit_id].set(day)
+    return bitmaps
+
+
+def rebuild_bitmaps(habit_ids: Iterable[int], habit=None):
+    """Recompute and store bitmaps for the given habits in one update."""
+    _store_all(compute_bitmaps(habit_ids), habit)
+
+
+def check_bitmaps(habit_ids: Iterable[int]) -> list:
+    """Return ids of habits whose stored bitmap disagrees with HabitLog."""
+    expected = compute_bitmaps(habit_ids)
+    stored = Habit.objects.filter(pk__in=list(expected)).only(
+        "completion_bits", "completion_bits_origin"
+    )
+    return [
+        habit.pk
+        for habit in stored
+        if CompletionBitmap.from_habit(habit) != expected[habit.pk]
+    ]
+
+
+def _store_all(bitmaps, habit=None):
+    """Write bitmaps by habit id in one update, like ``_store``."""
+    updates = []
+    for habit_id, bitmap in bitmaps.items():
+        origin, bits = bitmap.to_fields()
+        updates.append(
+            Habit(pk=habit_id, completion_bits=bits, completion_bits_origin=origin)
+        )
+        if habit is not None and habit.pk == habit_id:
+            habit.completion_bits, habit.completion_bits_origin = bits, origin
+    Habit.objects.bulk_update(updates, ["completion_bits", "completion_bits_origin"])
+
+
+def _store(habit_id, bitmap, habit=None):
+    """Write a bitmap without touching Habit.updated_at."""
+    origin, bits = bitmap.to_fields()
+    Habit.objects.filter(pk=habit_id).update(
+        completion_bits=bits, completion_bits_origin=origin
+    )
+    # Keep an already loaded instance in step with its row.
+    if habit is not None and habit.pk == habit_id:
+        habit.completion_bits, habit.completion_bits_origin = bits, origin
@@ -0,0 +1,178 @@
+"""
+Bulk habit log writes for habits app.
+Batches of logs are upserted with a single INSERT ... ON CONFLICT against the
+(habit, date) unique constraint. Bulk writes skip model signals, so derived
+state (HabitStats, completion bitmaps, daily rollups, stats cache versions)
+is updated once per batch: ``apply_upserted_logs`` applies the batch's logs
+in place, at a cost set by the batch rather than the history, while
+``refresh_derived_state`` rebuilds whole habits for seeding and repairs.
+"""
+
+from typing import Iterable, List, NamedTuple
+
+from django.db import transaction
+
+from habits.bitmaps import rebuild_bitmaps, record_days
+from habits.cache import bump_version
+from habits.models import Habit, HabitLog, HabitStats, UserDailyRollup
+
+CREATED = "created"
+UPDATED = "updated"
+ERROR = "error"
+
+
+class EntryResult(NamedTuple):
+    """Outcome of one entry of a bulk write, in request order."""
+
+    index: int
+    status: str
+    log: HabitLog = None
+    errors: dict = None
+
+    def as_dict(self) -> dict:
+        """Return a JSON-friendly representation."""
+        result = {"index": self.index, "status": self.status}
+        if self.log is not None:
+            result.update(
+                id=self.log.pk,
+                habit=self.log.habit_id,
+                date=self.log.date.isoformat(),
+                completed=self.log.completed,
+            )
+        if self.errors:
+            result["errors"] = self.errors
+        return result
+
+
+def upsert_logs(user, entries: Iterable[dict]) -> List[EntryResult]:
+    """
+    Insert or update one log per entry for habits owned by ``user``.
+
+    Each entry holds a ``habit`` id, ``date``, ``completed`` and ``notes``.
+    Ownership is checked, and the habits locked, for the whole batch with
+    one query; entries naming a habit the user does not own, or repeating an
+    earlier entry's habit and date, are reported as errors and skipped while
+    the rest are written.
+    """
+    entries = list(entries)
+    habit_ids = {entry["habit"] for entry in entries}
+    results = [None] * len(entries)
+    with transaction.atomic():
+        # Locking the habits makes concurrent writes to their days run in
+        # turn, so the existing logs read below are still those the upsert
+        # meets: each log is counted once and reported created only once.
+        owned = set(
+            Habit.objects.select_for_update()
+            .filter(user=user, pk__in=habit_ids)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+
+        logs, positions, seen = [], [], set()
+        for index, entry in enumerate(entries):
+            key = (entry["habit"], entry["date"])
+            if entry["habit"] not in owned:
+                results[index] = EntryResult(
+                    index, ERROR, errors={"habit": ["Habit not found."]}
+                )
+            elif key in seen:
+                results[index] = EntryResult(
+                    index, ERROR, errors={"date": ["Duplicate entry for this habit."]}
+                )
+            else:
+                seen.add(key)
+                positions.append(index)
+                logs.append(
+                    HabitLog(
+                        habit_id=entry["habit"],
+                        user_id=user.pk,
+                        date=entry["date"],
+                        completed=entry.get("completed", True),
+                        notes=entry.get("notes", ""),
+                    )
+                )
+
+        if logs:
+            existing = {
+                (habit_id, day): completed
+                for habit_id, day, completed in HabitLog.objects.filter(
+                    user=user,
+                    habit_id__in={log.habit_id for log in logs},
+                    date__in={log.date for log in logs},
+                ).values_list("habit_id", "date", "completed")
+            }
+            HabitLog.objects.bulk_create(
+                logs,
+                update_conflicts=True,
+                unique_fields=["habit", "date"],
+                update_fields=["completed", "notes", "updated_at"],
+            )
+            apply_upserted_logs(logs, existing)
+
+            for index, log in zip(positions, logs):
+                status = UPDATED if (log.habit_id, log.date) in existing else CREATED
+                results[index] = EntryResult(index, status, log=log)
+
+    return results
+
+
+def refresh_derived_state(habit_ids: Iterable[int], since=None, until=None):
+    """
+    Rebuild HabitStats and completion bitmaps for ``habit_ids`` and their
+    owners' daily rollups, and invalidate their cached statistics once the
+    transaction commits.
+
+    Rollups are rebuilt for the days from ``since`` through ``until`` (or
+    just ``since``); without ``since`` the owners' whole history is.
+    """
+    habit_ids = list(habit_ids)
+    if not habit_ids:
+        return
+    HabitStats.objects.rebuild(habit_ids)
+    rebuild_bitmaps(habit_ids)
+    user_ids = (
+        Habit.objects.filter(pk__in=habit_ids)
+        .order_by()
+        .values_list("user_id", flat=True)
+        .distinct()
+    )
+    if since is None:
+        UserDailyRollup.objects.rebuild(user_ids)
+    else:
+        UserDailyRollup.objects.rebuild(user_ids, since, until or since)
+
+    def bump_versions():
+        for habit_id in habit_ids:
+            bump_version(habit_id)
+
+    transaction.on_commit(bump_versions)
+
+
+def apply_upserted_logs(logs, previous):
+    """
+    Update derived state in place for upserted logs, given ``previous``, the
+    completed flag each (habit_id, date) had before the write (absent if the
+    log was created): completion bitmaps are patched, HabitStats adjusted
+    from them and the owners' rollups recomputed over the changed days, so
+    the cost follows the batch rather than the habits' history.
+    """
+    changed = [
+        log for log in logs if previous.get((log.habit_id, log.date)) != log.completed
+    ]
+    if changed:
+        bitmaps = record_days(
+            (log.habit_id, log.date, log.completed) for log in changed
+        )
+        HabitStats.objects.record_logs_upserted(changed, previous, bitmaps)
+        UserDailyRollup.objects.rebuild(
+            {log.user_id for log in changed},
+            min(log.date for log in changed),
+            max(log.date for log in changed),
+        )
+    habit_ids = {log.habit_id for log in logs}
+
+    def bump_versions():
+        for habit_id in habit_ids:
+            bump_version(habit_id)
+
+    transaction.on_commit(bump_versions)
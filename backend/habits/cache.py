@@ -0,0 +1,128 @@
+"""
+Versioned cache for habit statistics.
+Entries are keyed by a per-habit version that Habit and HabitLog signals
+replace, so any write invalidates every cached entry of the habit without
+deleting keys. Versions are random tokens written with set() rather than
+counters bumped with incr(): incr() reads and writes separately on the file
+and database backends, so concurrent bumps could be lost there.
+
+Hit and miss counters live in the same cache so a shared backend reports
+totals across workers. They are kept only on backends with an atomic
+incr(); elsewhere counting would lose updates and write on every read.
+"""
+
+import uuid
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.memcached import BaseMemcachedCache
+from django.core.cache.backends.redis import RedisCache
+
+KEY_PREFIX = "habit-stats"
+# Backends whose incr() is atomic, so hit and miss counters are kept on them.
+COUNTING_BACKENDS = (LocMemCache, BaseMemcachedCache, RedisCache)
+
+
+def get_cache():
+    """Return the cache configured for habit statistics."""
+    return caches[settings.HABIT_STATS_CACHE]
+
+
+def version_key(habit_id) -> str:
+    """Cache key holding a habit's current version."""
+    return f"{KEY_PREFIX}:version:{habit_id}"
+
+
+def get_version(habit_id) -> str:
+    """Return the habit's current version, creating one if needed."""
+    cache = get_cache()
+    version = cache.get(version_key(habit_id))
+    if version is None:
+        cache.add(version_key(habit_id), new_version(), timeout=None)
+        version = cache.get(version_key(habit_id))
+    return version
+
+
+def bump_version(habit_id):
+    """Invalidate all cached statistics of a habit."""
+    get_cache().set(version_key(habit_id), new_version(), timeout=None)
+
+
+def new_version() -> str:
+    """
+    Return a version no earlier one can equal, so an evicted version key or
+    a bump racing another never brings back entries cached under an older
+    version.
+    """
+    return uuid.uuid4().hex
+
+
+def stats_key(habit_id, version) -> str:
+    """Cache key for a habit's statistics at a given version."""
+    # Current streaks and period progress roll over at midnight.
+    today = date.today().isoformat()
+    return f"{KEY_PREFIX}:{habit_id}:{version}:{today}"
+
+
+def get_stats(habit_id, version, user_id):
+    """
+    Return cached statistics for a habit owned by ``user_id``.
+    Returns None on a miss or when the entry belongs to another user.
+    """
+    entry = get_cache().get(stats_key(habit_id, version))
+    if entry is not None and entry[0] == user_id:
+        _count("hits")
+        return entry[1]
+    _count("misses")
+    return None
+
+
+def set_stats(habit_id, version, user_id, stats):
+    """
+    Cache statistics computed at ``version``.
+    Callers read the version before computing, so a write that lands in the
+    meantime leaves the entry under an already superseded version.
+    """
+    get_cache().set(
+        stats_key(habit_id, version),
+        (user_id, stats),
+        timeout=settings.HABIT_STATS_CACHE_TIMEOUT,
+    )
+
+
+def counting() -> bool:
+    """Whether the configured backend keeps hit and miss counters."""
+    return isinstance(get_cache(), COUNTING_BACKENDS)
+
+
+def get_counters() -> dict:
+    """Return hit and miss totals and the hit rate."""
+    counters = get_cache().get_many([f"{KEY_PREFIX}:hits", f"{KEY_PREFIX}:misses"])
+    hits = counters.get(f"{KEY_PREFIX}:hits", 0)
+    misses = counters.get(f"{KEY_PREFIX}:misses", 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 4) if total else 0.0,
+    }
+
+
+def reset_counters():
+    """Reset hit and miss totals."""
+    get_cache().delete_many([f"{KEY_PREFIX}:hits", f"{KEY_PREFIX}:misses"])
+
+
+def _count(counter):
+    """Increment a hit or miss counter where the backend counts atomically."""
+    cache = get_cache()
+    if not isinstance(cache, COUNTING_BACKENDS):
+        return
+    key = f"{KEY_PREFIX}:{counter}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
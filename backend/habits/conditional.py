@@ -0,0 +1,67 @@
+"""
+Conditional GET support for habit API views.
+Computes a strong ETag from cheap validators (an aggregate query or a cache
+version) and answers a matching If-None-Match with 304 before any queryset
+is evaluated or serialized.
+"""
+
+import hashlib
+from datetime import date
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
+
+
+class ConditionalGetMixin:
+    """
+    Mixin for viewsets answering conditional GETs on list and retrieve.
+
+    Subclasses implement ``get_etag_validators()`` returning values that change
+    whenever the response would, or None to skip validation. Custom actions
+    opt in by routing their handler through ``conditional_response()``.
+    """
+
+    def list(self, request, *args, **kwargs):
+        """List with If-None-Match support."""
+        return self.conditional_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve with If-None-Match support."""
+        return self.conditional_response(request, super().retrieve, *args, **kwargs)
+
+    def get_etag_validators(self):
+        """Return values the response depends on, or None to skip the check."""
+        raise NotImplementedError
+
+    def get_etag(self, request):
+        """Return a strong ETag for the current request, or None."""
+        validators = self.get_etag_validators()
+        if validators is None:
+            return None
+        parts = (
+            request.user.pk,
+            request.get_full_path(),
+            request.META.get("HTTP_ACCEPT", ""),
+            # Streaks and period progress roll over at midnight.
+            date.today().isoformat(),
+            validators,
+        )
+        return quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+
+    def conditional_response(self, request, handler, *args, **kwargs):
+        """Return 304 when the client's ETag matches, else run ``handler``."""
+        etag = self.get_etag(request)
+        # "If-None-Match: *" would match any object id, existing or not (and
+        # stats validators never touch the database), so it is not honoured.
+        if etag is not None and request.META.get("HTTP_IF_NONE_MATCH") != "*":
+            not_modified = get_conditional_response(request, etag=etag)
+            if not_modified is not None:
+                not_modified["ETag"] = etag
+                patch_vary_headers(not_modified, ["Authorization"])
+                return not_modified
+
+        response = handler(request, *args, **kwargs)
+        if etag is not None and response.status_code == 200:
+            response["ETag"] = etag
+            patch_vary_headers(response, ["Authorization"])
+        return response
@@ -0,0 +1,74 @@
+"""
+Idempotency keys for habit write endpoints.
+A client retrying a write sends the same ``Idempotency-Key`` header; the
+first successful response is cached per user and key for
+HABIT_IDEMPOTENCY_TIMEOUT seconds and replayed to retries, so a retry costs
+one cache lookup instead of a database write.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+HEADER = "Idempotency-Key"
+KEY_PREFIX = "habit-idempotency"
+MAX_KEY_LENGTH = 255
+
+
+def get_cache():
+    """Return the cache configured for idempotency keys."""
+    return caches[settings.HABIT_IDEMPOTENCY_CACHE]
+
+
+def get_key(request):
+    """Return the request's idempotency key, or None when absent."""
+    return request.headers.get(HEADER) or None
+
+
+def fingerprint(request, *parts) -> str:
+    """Hash the request body and ``parts`` identifying the target."""
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(repr((parts, body)).encode()).hexdigest()
+
+
+def cache_key(user_id, key) -> str:
+    """Cache key of a user's idempotency key."""
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return f"{KEY_PREFIX}:{user_id}:{digest}"
+
+
+def replay(request, key, request_fingerprint):
+    """
+    Return the stored response for ``key``, or None on a miss.
+    Reusing a key for a different request is answered with 422.
+    """
+    if len(key) > MAX_KEY_LENGTH:
+        return Response(
+            {"detail": f"{HEADER} must be at most {MAX_KEY_LENGTH} characters."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    entry = get_cache().get(cache_key(request.user.pk, key))
+    if entry is None:
+        return None
+    stored_fingerprint, status_code, data = entry
+    if stored_fingerprint != request_fingerprint:
+        return Response(
+            {"detail": f"{HEADER} was already used for a different request."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    return Response(data, status=status_code, headers={"Idempotent-Replayed": "true"})
+
+
+def store(request, key, request_fingerprint, response):
+    """Remember a successful response for retries with the same key."""
+    if status.is_success(response.status_code):
+        get_cache().set(
+            cache_key(request.user.pk, key),
+            (request_fingerprint, response.status_code, response.data),
+            timeout=settings.HABIT_IDEMPOTENCY_TIMEOUT,
+        )
+    return response
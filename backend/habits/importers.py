@@ -0,0 +1,352 @@
+"""
+Streaming import of habit log history for habits app.
+Reads CSV, NDJSON or a Loop Habit Tracker Checkmarks.csv export row by row,
+maps habit names to the user's habits (creating missing ones) and writes logs
+in chunked bulk upserts. Memory stays constant in the file size. Each chunk
+commits on its own with the derived state of its logs applied in place, so
+a failed import keeps the chunks before it and can be resumed after them.
+
+Formats:
+- csv: header with habit, date and optional completed and notes columns
+- ndjson: one {"habit", "date", "completed", "notes"} object per line;
+  lines with a "type" other than "log" (habits in an export) are ignored
+- loop: Loop Habit Tracker's Checkmarks.csv, a Date column followed by one
+  column per habit; 2 (checked manually) imports as a completed day, every
+  other value (unchecked, automatic or unknown) is skipped
+"""
+
+import csv
+import json
+import time
+from datetime import date
+from itertools import islice
+from typing import Iterator, List, NamedTuple, Optional
+
+from django.db import transaction
+
+from habits.bulk import apply_upserted_logs
+from habits.models import (
+    ChangeCounter,
+    Habit,
+    HabitFrequency,
+    HabitLog,
+    UserDailyRollup,
+)
+
+FORMATS = ("csv", "ndjson", "loop")
+ON_CONFLICT = ("update", "skip")
+LOOP_CHECKED = "2"
+MAX_ERRORS = 10
+
+TRUE_VALUES = {"", "1", "true", "t", "yes", "y", "x", "✓"}
+FALSE_VALUES = {"0", "false", "f", "no", "n"}
+
+
+class RowError(ValueError):
+    """A malformed input row; it is skipped and reported."""
+
+
+class Row(NamedTuple):
+    """One log to import, keyed by habit name."""
+
+    habit: str
+    date: date
+    completed: bool
+    notes: str
+
+
+class ImportInterrupted(Exception):
+    """An import failed partway; its first ``rows`` rows are committed."""
+
+    def __init__(self, rows: int, error: Exception):
+        super().__init__(f"Import stopped after row {rows}: {error}")
+        self.rows = rows
+        self.error = error
+
+
+class ImportResult(NamedTuple):
+    """
+    Totals of one import: rows read, distinct (habit, date) logs sent to the
+    database, malformed rows skipped and habits created.
+    """
+
+    rows: int
+    logs: int
+    skipped: int
+    habits_created: int
+    seconds: float
+    errors: List[str]
+
+    @property
+    def rows_per_second(self) -> float:
+        """Rows read per second of wall time."""
+        return self.rows / self.seconds if self.seconds else float(self.rows)
+
+    def as_dict(self) -> dict:
+        """Return a JSON-friendly representation."""
+        return {
+            "rows": self.rows,
+            "logs": self.logs,
+            "skipped": self.skipped,
+            "habits_created": self.habits_created,
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+            "errors": self.errors,
+        }
+
+
+def detect_format(filename: str) -> str:
+    """Guess the format from a file name."""
+    name = filename.lower()
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if name.endswith("checkmarks.csv"):
+        return "loop"
+    return "csv"
+
+
+def parse_options(fmt: Optional[str], on_conflict: str, filename: str = ""):
+    """Validate format and conflict options, inferring the format if unset."""
+    fmt = fmt or detect_format(filename)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; choose from {', '.join(FORMATS)}.")
+    if on_conflict not in ON_CONFLICT:
+        raise ValueError(
+            f"Unknown on_conflict {on_conflict!r}; choose from "
+            f"{', '.join(ON_CONFLICT)}."
+        )
+    return fmt, on_conflict
+
+
+def read_rows(stream, fmt: str) -> Iterator:
+    """Yield a Row, or a RowError for a malformed one, per input row."""
+    readers = {"csv": _read_csv, "ndjson": _read_ndjson, "loop": _read_loop}
+    return readers[fmt](stream)
+
+
+def import_logs(
+    user,
+    stream,
+    fmt: str = "csv",
+    batch_size: int = 1000,
+    on_conflict: str = "update",
+    resume_after: int = 0,
+) -> ImportResult:
+    """
+    Import a stream of rows into ``user``'s habits, committing every chunk.
+
+    Rows are written ``batch_size`` at a time, each chunk in its own
+    transaction with one bulk upsert on (habit, date) whose logs are
+    applied to the derived state in place, so committed chunks are complete
+    and rows imported twice only rewrite the same logs. Habits the import
+    creates are expected from their first day, and their rollups are
+    extended through today once when the import stops. ``on_conflict`` decides
+    whether a day that is already logged is overwritten ("update") or kept
+    ("skip"). When a chunk fails, ImportInterrupted reports how many rows
+    were committed; pass that as ``resume_after`` to skip them next time.
+    """
+    started = time.perf_counter()
+    habits = dict(Habit.objects.filter(user=user).values_list("name", "pk"))
+    starts = {}
+    position = resume_after
+    logs_written = skipped = 0
+    errors = []
+    # First day of habits this import created or moved back, whose rollups
+    # are extended through today once the import stops.
+    expected_since = None
+
+    items = read_rows(stream, fmt)
+    try:
+        # Skipped rows are read, not written; their errors were reported.
+        for _ in islice(items, resume_after):
+            pass
+        while chunk := list(islice(items, batch_size)):
+            with transaction.atomic():
+                new = {}
+                for item in chunk:
+                    if not isinstance(item, RowError) and item.habit not in habits:
+                        new[item.habit] = min(item.date, new.get(item.habit, item.date))
+                if new:
+                    created = _create_habits(user, new)
+                    habits.update(created)
+                    starts.update((created[name], day) for name, day in new.items())
+                    expected_since = min(
+                        day for day in (expected_since, *new.values()) if day
+                    )
+                logs, moved = {}, {}
+                for row_number, item in enumerate(chunk, position + 1):
+                    if isinstance(item, RowError):
+                        skipped += 1
+                        if len(errors) < MAX_ERRORS:
+                            errors.append(f"Row {row_number}: {item}")
+                        continue
+                    habit_id = habits[item.habit]
+                    if habit_id in starts and item.date < starts[habit_id]:
+                        moved[habit_id] = starts[habit_id] = item.date
+                    # The last row for a day wins within a chunk as across.
+                    logs[habit_id, item.date] = HabitLog(
+                        habit_id=habit_id,
+                        user_id=user.pk,
+                        date=item.date,
+                        completed=item.completed,
+                        notes=item.notes,
+                    )
+                if moved:
+                    _move_starts(user, moved)
+                    expected_since = min(expected_since, *moved.values())
+                if logs:
+                    _write(list(logs.values()), on_conflict)
+                    logs_written += len(logs)
+            position += len(chunk)
+    except Exception as error:
+        raise ImportInterrupted(position, error) from error
+    finally:
+        if expected_since is not None:
+            UserDailyRollup.objects.rebuild([user.pk], expected_since, date.today())
+
+    return ImportResult(
+        rows=position - resume_after,
+        logs=logs_written,
+        skipped=skipped,
+        habits_created=len(starts),
+        seconds=time.perf_counter() - started,
+        errors=errors,
+    )
+
+
+def _move_starts(user, starts):
+    """Move habits created by an import back to their earliest imported day."""
+    change_seq = ChangeCounter.objects.advance(user.pk)
+    Habit.objects.bulk_update(
+        [
+            Habit(pk=pk, start_date=day, change_seq=change_seq)
+            for pk, day in starts.items()
+        ],
+        ["start_date", "change_seq"],
+    )
+
+
+def _write(logs, on_conflict):
+    """
+    Bulk insert one chunk of logs and apply the ones written to the derived
+    state in place.
+    """
+    previous = {
+        (habit_id, day): completed
+        for habit_id, day, completed in HabitLog.objects.filter(
+            habit_id__in={log.habit_id for log in logs},
+            date__in={log.date for log in logs},
+        ).values_list("habit_id", "date", "completed")
+    }
+    if on_conflict == "skip":
+        logs = [log for log in logs if (log.habit_id, log.date) not in previous]
+        HabitLog.objects.bulk_create(logs, ignore_conflicts=True)
+    else:
+        HabitLog.objects.bulk_create(
+            logs,
+            update_conflicts=True,
+            unique_fields=["habit", "date"],
+            update_fields=["completed", "notes", "updated_at"],
+        )
+    apply_upserted_logs(logs, previous)
+
+
+def _create_habits(user, starts) -> dict:
+    """
+    Create daily habits for names seen for the first time, starting on the
+    given days, and return their ids by name. Created in bulk, they skip the
+    rollup signal; import_logs extends the rollups once at the end.
+    """
+    change_seq = ChangeCounter.objects.advance(user.pk)
+    created = Habit.objects.bulk_create(
+        [
+            Habit(
+                user=user,
+                name=name,
+                frequency=HabitFrequency.DAILY,
+                start_date=day,
+                change_seq=change_seq,
+            )
+            for name, day in starts.items()
+        ]
+    )
+    return {habit.name: habit.pk for habit in created}
+
+
+def _make_row(habit, day, completed=None, notes=None) -> Row:
+    """Validate raw values into a Row."""
+    habit = (habit or "").strip()
+    if not habit:
+        raise RowError("missing habit name")
+    if len(habit) > Habit._meta.get_field("name").max_length:
+        raise RowError("habit name is too long")
+    try:
+        day = date.fromisoformat(str(day or "").strip())
+    except ValueError:
+        raise RowError(f"invalid date {day!r}")
+    return Row(habit, day, _parse_completed(completed), str(notes or ""))
+
+
+def _parse_completed(value) -> bool:
+    """Parse a completed flag; a missing or blank value means completed."""
+    if value is None or isinstance(value, bool):
+        return value is not False
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise RowError(f"invalid completed value {value!r}")
+
+
+def _read_csv(stream):
+    for record in csv.DictReader(stream):
+        try:
+            yield _make_row(
+                record.get("habit"),
+                record.get("date"),
+                record.get("completed"),
+                record.get("notes"),
+            )
+        except RowError as error:
+            yield error
+
+
+def _read_ndjson(stream):
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise RowError("expected a JSON object")
+            if record.get("type", "log") != "log":
+                # Habit lines of an export; habits are matched by name.
+                continue
+            yield _make_row(
+                record.get("habit"),
+                record.get("date"),
+                record.get("completed"),
+                record.get("notes"),
+            )
+        except json.JSONDecodeError as error:
+            yield RowError(f"invalid JSON ({error.msg})")
+        except RowError as error:
+            yield error
+
+
+def _read_loop(stream):
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if not header:
+        return
+    names = [name.strip() for name in header[1:]]
+    for record in reader:
+        if not record:
+            continue
+        for name, value in zip(names, record[1:]):
+            if name and value.strip() == LOOP_CHECKED:
+                try:
+                    yield _make_row(name, record[0], True)
+                except RowError as error:
+                    yield error
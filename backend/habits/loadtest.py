@@ -0,0 +1,348 @@
+"""
+Concurrent load generator for habits app.
+Starts config.wsgi (Django's threaded WSGI server) or config.asgi (uvicorn,
+if installed) in a subprocess, or targets an already running server, and
+drives a weighted mix of API calls from many virtual users, each a thread
+with its own keep-alive connection and JWT. Reports throughput and latency
+percentiles and histograms per scenario.
+
+Unlike the test-client benchmarks, requests go through a real server with
+concurrent workers, so lock contention and worker saturation show up. The
+log scenario writes HabitLog rows on random days of the seeded history;
+500 responses whose debug page reports "database is locked" are counted
+separately to expose SQLite write locking (with DEBUG off they are plain
+errors).
+
+Run with ``manage.py load_test``.
+"""
+
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Dict, List, NamedTuple
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.urls import reverse
+
+from habits.benchmarks import percentiles
+
+SCENARIOS = ("login", "list", "log", "stats", "logs")
+DEFAULT_MIX = "login=1,list=4,log=4,stats=3,logs=3"
+# Upper bounds of the latency histogram buckets, in ms; slower goes in "inf".
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+LOCKED_MARKER = b"database is locked"
+SERVER_START_TIMEOUT = 30.0
+REQUEST_TIMEOUT = 60.0
+SERVER_SCRIPT = (
+    "import sys, django; django.setup(); "
+    "from habits.loadtest import serve; serve(*sys.argv[1:])"
+)
+
+
+class Sample(NamedTuple):
+    """One request: scenario, HTTP status (0 on connection error) and time."""
+
+    scenario: str
+    status: int
+    seconds: float
+    locked: bool
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """Parse "name=weight,..." into scenario weights, e.g. "list=3,log=1"."""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in SCENARIOS or not weight.isdigit():
+            raise ValueError(
+                f"Invalid mix entry {part!r}; use name=weight with names from "
+                f"{', '.join(SCENARIOS)}."
+            )
+        mix[name] = int(weight)
+    if not any(mix.values()):
+        raise ValueError("The mix needs at least one positive weight.")
+    return mix
+
+
+def histogram(samples: List[float]) -> List[list]:
+    """Count seconds into HISTOGRAM_BOUNDS_MS buckets as [bound, count] pairs."""
+    counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+    for seconds in samples:
+        ms = seconds * 1000
+        index = next(
+            (i for i, bound in enumerate(HISTOGRAM_BOUNDS_MS) if ms <= bound),
+            len(HISTOGRAM_BOUNDS_MS),
+        )
+        counts[index] += 1
+    return [[bound, count] for bound, count in zip(HISTOGRAM_BOUNDS_MS, counts)] + [
+        ["inf", counts[-1]]
+    ]
+
+
+def free_port(host: str) -> int:
+    """Return a port on ``host`` that is free right now."""
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def serve(interface: str, host: str, port: str):
+    """Serve config.wsgi or config.asgi until killed."""
+    port = int(port)
+    if interface == "asgi":
+        import uvicorn
+
+        uvicorn.run("config.asgi:application", host=host, port=port, log_level="error")
+        return
+
+    from django.core.servers.basehttp import run
+
+    from config.wsgi import application
+
+    run(host, port, application, threading=True)
+
+
+@contextmanager
+def start_server(interface: str, host: str = "127.0.0.1", port: int = 0):
+    """
+    Run serve() in a subprocess and yield its base URL once it accepts
+    connections. SQL instrumentation is switched off in the server, and its
+    output goes to a temporary file that is shown if it fails to start.
+    """
+    if interface == "asgi":
+        try:
+            import uvicorn  # noqa: F401
+        except ImportError:
+            raise RuntimeError("The asgi server needs uvicorn; pip install uvicorn.")
+    port = port or free_port(host)
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": os.environ.get(
+            "DJANGO_SETTINGS_MODULE", "config.settings"
+        ),
+        "SQL_INSTRUMENTATION_SAMPLE_RATE": "0",
+    }
+    command = [sys.executable, "-c", SERVER_SCRIPT, interface, host, str(port)]
+    with tempfile.TemporaryFile() as output:
+        process = subprocess.Popen(
+            command,
+            cwd=settings.BASE_DIR,
+            env=env,
+            stdout=output,
+            stderr=subprocess.STDOUT,
+        )
+        try:
+            deadline = time.monotonic() + SERVER_START_TIMEOUT
+            while True:
+                try:
+                    socket.create_connection((host, port), timeout=1).close()
+                    break
+                except OSError:
+                    if process.poll() is not None or time.monotonic() > deadline:
+                        output.seek(0)
+                        log = output.read().decode(errors="replace")
+                        raise RuntimeError(
+                            f"The {interface} server did not start.\n{log}"
+                        )
+                    time.sleep(0.1)
+            yield f"http://{host}:{port}"
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+
+class Client:
+    """Keep-alive HTTP connection to the server under test, with a JWT."""
+
+    def __init__(self, base_url: str):
+        url = urlsplit(base_url)
+        self.connection = http.client.HTTPConnection(
+            url.hostname, url.port, timeout=REQUEST_TIMEOUT
+        )
+        self.token = None
+
+    def request(self, method: str, path: str, body=None):
+        """Send one request and return (status, body, seconds)."""
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        payload = json.dumps(body) if body is not None else None
+        started = time.perf_counter()
+        try:
+            self.connection.request(method, path, payload, headers)
+            response = self.connection.getresponse()
+            content = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException) as exc:
+            self.connection.close()
+            content, status = str(exc).encode(), 0
+        return status, content, time.perf_counter() - started
+
+    def close(self):
+        """Close the connection."""
+        self.connection.close()
+
+
+def virtual_user(
+    base_url: str,
+    username: str,
+    password: str,
+    mix: Dict[str, int],
+    duration: float,
+    history_days: int,
+    seed: int,
+) -> List[Sample]:
+    """
+    Log in as ``username``, then call random scenarios from ``mix`` for
+    ``duration`` seconds. Returns a Sample per request, the login included.
+    """
+    rng = random.Random(seed)
+    client = Client(base_url)
+    samples = []
+
+    def call(scenario, method, path, body=None):
+        status, content, seconds = client.request(method, path, body)
+        locked = status >= 500 and LOCKED_MARKER in content
+        samples.append(Sample(scenario, status, seconds, locked))
+        return status, content
+
+    credentials = {"username": username, "password": password}
+
+    def login():
+        status, content = call("login", "POST", reverse("login"), credentials)
+        if status == 200:
+            client.token = json.loads(content)["access"]
+        return status
+
+    try:
+        if login() != 200:
+            return samples
+        status, content = call("list", "GET", reverse("habits:habit-list"))
+        if status != 200:
+            return samples
+        habits = [habit["id"] for habit in json.loads(content)["results"]]
+
+        today = date.today()
+        names, weights = zip(*mix.items())
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            scenario = rng.choices(names, weights)[0]
+            habit = rng.choice(habits)
+            if scenario == "login":
+                login()
+            elif scenario == "list":
+                call("list", "GET", reverse("habits:habit-list"))
+            elif scenario == "log":
+                day = today - timedelta(days=rng.randrange(history_days))
+                call(
+                    "log",
+                    "POST",
+                    reverse("habits:habit-log", args=[habit]),
+                    {"date": day.isoformat(), "completed": rng.random() < 0.8},
+                )
+            elif scenario == "stats":
+                call("stats", "GET", reverse("habits:habit-stats", args=[habit]))
+            else:
+                call("logs", "GET", reverse("habits:habit-logs", args=[habit]))
+    finally:
+        client.close()
+    return samples
+
+
+def run_load(
+    base_url: str,
+    usernames: List[str],
+    password: str,
+    mix: Dict[str, int],
+    duration: float,
+    history_days: int,
+    seed: int = 0,
+) -> dict:
+    """Run one virtual user per username concurrently and summarize."""
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(usernames)) as pool:
+        futures = [
+            pool.submit(
+                virtual_user,
+                base_url,
+                username,
+                password,
+                mix,
+                duration,
+                history_days,
+                seed + index,
+            )
+            for index, username in enumerate(usernames)
+        ]
+        samples = [sample for future in futures for sample in future.result()]
+    elapsed = time.perf_counter() - started
+    return summarize(samples, elapsed, len(usernames))
+
+
+def summarize(samples: List[Sample], elapsed: float, users: int) -> dict:
+    """Aggregate samples into totals and per-scenario latency statistics."""
+    scenarios = {}
+    for name in SCENARIOS:
+        chosen = [sample for sample in samples if sample.scenario == name]
+        if not chosen:
+            continue
+        statuses = {}
+        for sample in chosen:
+            statuses[str(sample.status)] = statuses.get(str(sample.status), 0) + 1
+        seconds = [sample.seconds for sample in chosen]
+        scenarios[name] = {
+            "requests": len(chosen),
+            "errors": sum(not 200 <= sample.status < 400 for sample in chosen),
+            "locked": sum(sample.locked for sample in chosen),
+            "statuses": statuses,
+            **percentiles(seconds),
+            "histogram": histogram(seconds),
+        }
+    return {
+        "users": users,
+        "seconds": round(elapsed, 3),
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        "errors": sum(scenario["errors"] for scenario in scenarios.values()),
+        "locked": sum(scenario["locked"] for scenario in scenarios.values()),
+        "scenarios": scenarios,
+    }
+
+
+def format_report(result: dict) -> str:
+    """Render a load test result as text tables and histograms."""
+    lines = [
+        f"{result['requests']} requests from {result['users']} virtual users in "
+        f"{result['seconds']:.1f}s: {result['throughput_rps']:.1f} req/s, "
+        f"{result['errors']} errors ({result['locked']} database is locked)",
+        f"  {'scenario':<9}{'reqs':>7}{'errors':>8}{'locked':>8}"
+        f"{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}",
+    ]
+    for name, stats in result["scenarios"].items():
+        lines.append(
+            f"  {name:<9}{stats['requests']:>7}{stats['errors']:>8}"
+            f"{stats['locked']:>8}{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}"
+            f"{stats['p99_ms']:>9.1f}{stats['max_ms']:>9.1f}"
+        )
+    for name, stats in result["scenarios"].items():
+        lines.append(f"{name} latency (ms)")
+        peak = max(count for _, count in stats["histogram"]) or 1
+        for bound, count in stats["histogram"]:
+            if count:
+                bar = "#" * max(round(count / peak * 40), 1)
+                lines.append(f"  <= {bound:>5} {count:>7} {bar}")
+    return "\n".join(lines)
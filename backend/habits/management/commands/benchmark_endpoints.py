@@ -0,0 +1,90 @@
+"""
+Management command to benchmark the habits API on synthetic datasets.
+Runs against a throwaway test database, so it never touches real data, and
+writes the results as JSON for comparison with later runs.
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from habits.benchmarks import (
+    DEFAULT_SIZES,
+    DatasetSize,
+    compare_runs,
+    format_table,
+    run_benchmarks,
+)
+
+
+class Command(BaseCommand):
+    help = "Benchmark API endpoint latency across synthetic dataset sizes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            nargs="+",
+            default=DEFAULT_SIZES,
+            help="Dataset sizes as USERSxHABITSxDAYS (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--repeats",
+            type=int,
+            default=20,
+            help="Timed requests per endpoint and size (default: 20).",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the results to this JSON file.",
+        )
+        parser.add_argument(
+            "--compare",
+            help="Report endpoints slower than in this earlier JSON result.",
+        )
+        parser.add_argument(
+            "--fail-on-regression",
+            action="store_true",
+            help="Exit with an error when growth or regressions are flagged.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [DatasetSize.parse(size) for size in options["sizes"]]
+        except ValueError as error:
+            raise CommandError(str(error))
+        previous = None
+        if options["compare"]:
+            with open(options["compare"]) as handle:
+                previous = json.load(handle)
+
+        setup_test_environment(debug=False)
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with override_settings(SQL_INSTRUMENTATION_SAMPLE_RATE=0):
+                run = run_benchmarks(
+                    sizes,
+                    options["repeats"],
+                    progress=lambda result: self.stdout.write(format_table(result)),
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                json.dump(run, handle, indent=2)
+            self.stdout.write(f"Wrote results to {options['output']}")
+
+        flagged = run["warnings"] + (compare_runs(previous, run) if previous else [])
+        for warning in flagged:
+            self.stderr.write(warning)
+        if flagged and options["fail_on_regression"]:
+            raise CommandError(f"{len(flagged)} performance warning(s)")
+        if not flagged:
+            self.stdout.write(self.style.SUCCESS("No performance warnings"))
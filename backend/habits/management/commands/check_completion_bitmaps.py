@@ -0,0 +1,62 @@
+"""
+Management command to check Habit completion bitmaps against HabitLog.
+Reports habits whose bitmap disagrees with their logs and can repair them.
+"""
+
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from habits.bitmaps import check_bitmaps, rebuild_bitmaps
+from habits.models import Habit
+
+
+class Command(BaseCommand):
+    help = "Compare Habit completion bitmaps with HabitLog rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--habit",
+            type=int,
+            action="append",
+            dest="habit_ids",
+            help="Only check this habit id (repeatable).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of habits checked per batch (default: 500).",
+        )
+        parser.add_argument(
+            "--repair",
+            action="store_true",
+            help="Rebuild inconsistent bitmaps from HabitLog.",
+        )
+
+    def handle(self, *args, **options):
+        habits = Habit.objects.order_by("pk").values_list("pk", flat=True)
+        if options["habit_ids"]:
+            habits = habits.filter(pk__in=options["habit_ids"])
+        habit_ids = habits.iterator(chunk_size=options["batch_size"])
+
+        checked = 0
+        inconsistent = []
+        while batch := list(islice(habit_ids, options["batch_size"])):
+            stale = check_bitmaps(batch)
+            if stale and options["repair"]:
+                rebuild_bitmaps(stale)
+            inconsistent.extend(stale)
+            checked += len(batch)
+
+        for habit_id in inconsistent:
+            self.stderr.write(f"Habit {habit_id}: bitmap does not match its logs")
+        if inconsistent and not options["repair"]:
+            raise CommandError(
+                f"{len(inconsistent)} of {checked} habit(s) have stale bitmaps"
+            )
+
+        repaired = f", repaired {len(inconsistent)}" if inconsistent else ""
+        self.stdout.write(
+            self.style.SUCCESS(f"Checked {checked} habit bitmap(s){repaired}")
+        )
@@ -0,0 +1,34 @@
+"""
+Management command to report habit stats cache effectiveness.
+"""
+
+from django.core.management.base import BaseCommand
+
+from habits import cache as stats_cache
+
+
+class Command(BaseCommand):
+    help = "Show hit/miss counters of the habit stats cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Reset the counters after reporting them.",
+        )
+
+    def handle(self, *args, **options):
+        if not stats_cache.counting():
+            self.stdout.write(
+                "Counters are kept only on caches with atomic increments "
+                "(Redis, Memcached or local memory)."
+            )
+            return
+        counters = stats_cache.get_counters()
+        self.stdout.write(
+            f"hits={counters['hits']} misses={counters['misses']} "
+            f"hit_rate={counters['hit_rate']:.2%}"
+        )
+        if options["reset"]:
+            stats_cache.reset_counters()
+            self.stdout.write(self.style.SUCCESS("Counters reset"))
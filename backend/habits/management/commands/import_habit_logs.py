@@ -0,0 +1,94 @@
+"""
+Management command to import habit log history from a file.
+Streams CSV, NDJSON or Loop Habit Tracker exports into a user's habits in
+chunked bulk upserts and reports throughput. Chunks commit as they go; an
+interrupted import is continued with --resume-after.
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from habits.importers import (
+    FORMATS,
+    ON_CONFLICT,
+    ImportInterrupted,
+    import_logs,
+    parse_options,
+)
+
+
+class Command(BaseCommand):
+    help = "Import habit logs for a user from CSV, NDJSON or a Loop export."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import.")
+        parser.add_argument(
+            "--user",
+            required=True,
+            help="Username owning the imported habits.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Input format (default: inferred from the file name).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of logs written per bulk insert (default: 1000).",
+        )
+        parser.add_argument(
+            "--on-conflict",
+            choices=ON_CONFLICT,
+            default="update",
+            help="Overwrite or keep days that are already logged (default: update).",
+        )
+        parser.add_argument(
+            "--resume-after",
+            type=int,
+            default=0,
+            help="Skip this many rows, committed by an interrupted import "
+            "(default: 0).",
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(username=options["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['user']!r} does not exist")
+        fmt, on_conflict = parse_options(
+            options["format"], options["on_conflict"], options["path"]
+        )
+
+        try:
+            stream = open(options["path"], newline="", encoding="utf-8-sig")
+        except OSError as error:
+            raise CommandError(f"Cannot open {options['path']}: {error}")
+        with stream:
+            try:
+                result = import_logs(
+                    user,
+                    stream,
+                    fmt=fmt,
+                    batch_size=options["batch_size"],
+                    on_conflict=on_conflict,
+                    resume_after=options["resume_after"],
+                )
+            except ImportInterrupted as interrupted:
+                raise CommandError(
+                    f"{interrupted}\nRows up to {interrupted.rows} are saved; "
+                    f"rerun with --resume-after {interrupted.rows} to continue."
+                )
+
+        for error in result.errors:
+            self.stderr.write(error)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result.logs} log(s) from {result.rows} row(s) "
+                f"({result.skipped} skipped, {result.habits_created} habit(s) "
+                f"created) in {result.seconds:.2f}s "
+                f"({result.rows_per_second:.0f} rows/s)"
+            )
+        )
@@ -0,0 +1,152 @@
+"""
+Management command to load test the habits API through a real server.
+Seeds one user per virtual user into the configured database, starts
+config.wsgi or config.asgi locally (or targets --url, which must use the
+same database), runs the request mix and deletes the seeded users again.
+Use a development database: seeding bypasses model signals.
+"""
+
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from habits.loadtest import (
+    DEFAULT_MIX,
+    format_report,
+    parse_mix,
+    run_load,
+    start_server,
+)
+from habits.seeding import DEFAULT_PASSWORD, seed
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Drive concurrent virtual users against a live API server."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--server",
+            choices=["wsgi", "asgi"],
+            default="wsgi",
+            help="Server to start: Django's threaded WSGI server or uvicorn "
+            "(default: wsgi).",
+        )
+        parser.add_argument(
+            "--url",
+            help="Base URL of an already running server; none is started.",
+        )
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=20,
+            help="Concurrent virtual users (default: 20).",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=30.0,
+            help="Seconds each virtual user keeps sending requests (default: 30).",
+        )
+        parser.add_argument(
+            "--mix",
+            default=DEFAULT_MIX,
+            help=f"Scenario weights (default: {DEFAULT_MIX}).",
+        )
+        parser.add_argument(
+            "--habits-per-user",
+            type=int,
+            default=5,
+            help="Daily habits per virtual user (default: 5).",
+        )
+        parser.add_argument(
+            "--history-days",
+            type=int,
+            default=90,
+            help="Days of seeded history that log calls pick from (default: 90).",
+        )
+        parser.add_argument(
+            "--density",
+            type=float,
+            default=0.2,
+            help="Share of seeded habit-days with a log; the rest are "
+            "inserted by log calls (default: 0.2).",
+        )
+        parser.add_argument(
+            "--prefix",
+            default="loadtest",
+            help='Username prefix of the seeded users (default: "loadtest").',
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Random seed (default: 0)."
+        )
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument(
+            "--keep-data",
+            action="store_true",
+            help="Keep the seeded users and their data afterwards.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            mix = parse_mix(options["mix"])
+        except ValueError as error:
+            raise CommandError(str(error))
+        if options["users"] < 1 or options["habits_per_user"] < 1:
+            raise CommandError("--users and --habits-per-user must be positive.")
+        if options["history_days"] < 1 or options["duration"] <= 0:
+            raise CommandError("--history-days and --duration must be positive.")
+        prefix = options["prefix"]
+        users = User.objects.filter(username__startswith=prefix)
+        if users.exists():
+            raise CommandError(
+                f'Users prefixed "{prefix}" already exist; pick another --prefix.'
+            )
+
+        seeded = seed(
+            options["users"],
+            options["habits_per_user"],
+            options["history_days"],
+            density=options["density"],
+            prefix=prefix,
+            password=DEFAULT_PASSWORD,
+            rng_seed=options["seed"],
+        )
+        self.stdout.write(
+            f"Seeded {seeded.users} user(s) with {seeded.logs} log(s); "
+            f"running for {options['duration']:g}s"
+        )
+        usernames = list(users.order_by("pk").values_list("username", flat=True))
+        try:
+            if options["url"]:
+                result = self.load(options["url"], usernames, mix, options)
+            else:
+                try:
+                    with start_server(options["server"]) as url:
+                        result = self.load(url, usernames, mix, options)
+                except RuntimeError as error:
+                    raise CommandError(str(error))
+        finally:
+            if not options["keep_data"]:
+                users.delete()
+
+        self.stdout.write(format_report(result))
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                json.dump(result, handle, indent=2)
+            self.stdout.write(f"Wrote results to {options['output']}")
+
+    def load(self, url, usernames, mix, options):
+        """Run the load and tag the result with how it was produced."""
+        result = run_load(
+            url,
+            usernames,
+            DEFAULT_PASSWORD,
+            mix,
+            options["duration"],
+            options["history_days"],
+            options["seed"],
+        )
+        return {"url": url, "server": options["server"], "mix": mix, **result}
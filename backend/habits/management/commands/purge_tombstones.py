@@ -0,0 +1,22 @@
+"""
+Management command to delete sync tombstones past their retention.
+Sync cursors older than HABIT_SYNC_TOMBSTONE_DAYS are rejected, so older
+tombstones can no longer be read by any client.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from habits.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = "Delete sync tombstones older than HABIT_SYNC_TOMBSTONE_DAYS."
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=settings.HABIT_SYNC_TOMBSTONE_DAYS)
+        deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} tombstone(s)"))
@@ -0,0 +1,62 @@
+"""
+Management command to rebuild and verify the HabitStats summary table.
+Recomputes every habit's summary from its HabitLog rows in batches.
+"""
+
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from habits.models import Habit, HabitStats
+
+
+class Command(BaseCommand):
+    help = "Rebuild HabitStats from HabitLog rows and verify the result."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--habit",
+            type=int,
+            action="append",
+            dest="habit_ids",
+            help="Only process this habit id (repeatable).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of habits recomputed per batch (default: 500).",
+        )
+        parser.add_argument(
+            "--verify-only",
+            action="store_true",
+            help="Compare stored stats with a fresh computation without writing.",
+        )
+
+    def handle(self, *args, **options):
+        habits = Habit.objects.order_by("pk").values_list("pk", flat=True)
+        if options["habit_ids"]:
+            habits = habits.filter(pk__in=options["habit_ids"])
+        habit_ids = habits.iterator(chunk_size=options["batch_size"])
+
+        processed = 0
+        mismatches = []
+        while batch := list(islice(habit_ids, options["batch_size"])):
+            if not options["verify_only"]:
+                HabitStats.objects.rebuild(batch)
+            mismatches.extend(HabitStats.objects.verify(batch))
+            processed += len(batch)
+
+        for habit_id, field, stored, expected in mismatches:
+            self.stderr.write(
+                f"Habit {habit_id}: {field} is {stored!r}, expected {expected!r}"
+            )
+        if mismatches:
+            raise CommandError(
+                f"{len(mismatches)} stale value(s) across {processed} habit(s)"
+            )
+
+        action = "Verified" if options["verify_only"] else "Rebuilt and verified"
+        self.stdout.write(
+            self.style.SUCCESS(f"{action} stats for {processed} habit(s)")
+        )
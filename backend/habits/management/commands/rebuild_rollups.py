@@ -0,0 +1,73 @@
+"""
+Management command to rebuild the UserDailyRollup table.
+Log and habit writes keep rollups current; run this nightly (for example
+with --since yesterday's date) so days without any writes still get their
+expected counts, and once in full after deploying or after bulk SQL edits.
+"""
+
+from datetime import date
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from habits.models import Habit, UserDailyRollup
+
+
+def iso_date(value):
+    """Parse an ISO date argument."""
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date {value!r}; use YYYY-MM-DD.")
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-user daily rollups from Habit and HabitLog rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            type=iso_date,
+            help="First day to rebuild (default: each user's whole history).",
+        )
+        parser.add_argument(
+            "--until",
+            type=iso_date,
+            help="Last day to rebuild (default: today or the latest log).",
+        )
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="user_ids",
+            help="Only process this user id (repeatable).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=100,
+            help="Number of users rebuilt per chunk (default: 100).",
+        )
+
+    def handle(self, *args, **options):
+        since, until = options["since"], options["until"]
+        if since and until and since > until:
+            raise CommandError("--since must not be after --until.")
+
+        users = (
+            Habit.objects.order_by("user_id")
+            .values_list("user_id", flat=True)
+            .distinct()
+        )
+        if options["user_ids"]:
+            users = users.filter(user_id__in=options["user_ids"])
+        user_ids = users.iterator(chunk_size=options["chunk_size"])
+
+        processed = rows = 0
+        while chunk := list(islice(user_ids, options["chunk_size"])):
+            rows += len(UserDailyRollup.objects.rebuild(chunk, since, until))
+            processed += len(chunk)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {rows} rollup row(s) for {processed} user(s)")
+        )
@@ -0,0 +1,131 @@
+"""
+Management command to fill the database with synthetic habit data.
+Meant for local load testing and benchmarks: rows are bulk-inserted without
+model signals, so never run it against a database holding real users.
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from habits.seeding import DEFAULT_PASSWORD, seed
+
+User = get_user_model()
+
+
+def positive_int(value):
+    """Parse a positive integer argument."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise CommandError(f"Invalid count {value!r}; use a positive integer.")
+    return number
+
+
+def share(value):
+    """Parse a probability argument between 0 and 1."""
+    try:
+        number = float(value)
+    except ValueError:
+        number = -1.0
+    if not 0 <= number <= 1:
+        raise CommandError(f"Invalid share {value!r}; use a number from 0 to 1.")
+    return number
+
+
+class Command(BaseCommand):
+    help = "Bulk-insert synthetic users, profiles, habits and habit logs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users", type=positive_int, default=100, help="Users (default: 100)."
+        )
+        parser.add_argument(
+            "--habits-per-user",
+            type=positive_int,
+            default=5,
+            help="Daily habits per user (default: 5).",
+        )
+        parser.add_argument(
+            "--days",
+            type=positive_int,
+            default=365,
+            help="Days of history ending today (default: 365).",
+        )
+        parser.add_argument(
+            "--density",
+            type=share,
+            default=0.8,
+            help="Share of habit-days with a log (default: 0.8).",
+        )
+        parser.add_argument(
+            "--completion-rate",
+            type=share,
+            default=0.8,
+            help="Share of logs marked completed (default: 0.8).",
+        )
+        parser.add_argument(
+            "--streak-habits",
+            type=int,
+            default=0,
+            help="Habits per user completed every day (default: 0).",
+        )
+        parser.add_argument(
+            "--prefix",
+            default="seed",
+            help='Username prefix; users are "<prefix><n>" (default: "seed").',
+        )
+        parser.add_argument(
+            "--password",
+            default=DEFAULT_PASSWORD,
+            help=f'Password of every user (default: "{DEFAULT_PASSWORD}").',
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Random seed (default: 0)."
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=positive_int,
+            default=100,
+            help="Users written per transaction (default: 100).",
+        )
+        parser.add_argument(
+            "--skip-derived",
+            action="store_true",
+            help="Skip stats, bitmaps and rollups; rebuild them later with "
+            "rebuild_habit_stats and rebuild_rollups.",
+        )
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        if User.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(
+                f'Users prefixed "{prefix}" already exist; pick another --prefix.'
+            )
+        if not 0 <= options["streak_habits"] <= options["habits_per_user"]:
+            raise CommandError(
+                "--streak-habits must be between 0 and --habits-per-user."
+            )
+
+        result = seed(
+            options["users"],
+            options["habits_per_user"],
+            options["days"],
+            density=options["density"],
+            completion_rate=options["completion_rate"],
+            streak_habits=options["streak_habits"],
+            prefix=prefix,
+            password=options["password"],
+            rng_seed=options["seed"],
+            chunk_size=options["chunk_size"],
+            derived=not options["skip_derived"],
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {result.users} user(s), {result.habits} habit(s) and "
+                f"{result.logs} log(s) in {result.seconds:.1f}s "
+                f"({result.logs_per_second:,.0f} logs/s)"
+            )
+        )
@@ -0,0 +1,45 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HabitStats",
+            fields=[
+                (
+                    "habit",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="habits.habit",
+                    ),
+                ),
+                ("total_logs", models.PositiveIntegerField(default=0)),
+                ("completed_logs", models.PositiveIntegerField(default=0)),
+                ("longest_streak", models.PositiveIntegerField(default=0)),
+                (
+                    "current_run_start",
+                    models.DateField(
+                        blank=True,
+                        help_text="First day of the most recent run of completed days",
+                        null=True,
+                    ),
+                ),
+                ("last_completed_date", models.DateField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "Habit stats",
+            },
+        ),
+    ]
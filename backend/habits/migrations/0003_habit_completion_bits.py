@@ -0,0 +1,52 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:27
+
+from django.db import migrations, models
+
+
+def build_completion_bits(apps, schema_editor):
+    """Pack existing completed logs into each habit's bitmap."""
+    Habit = apps.get_model("habits", "Habit")
+    HabitLog = apps.get_model("habits", "HabitLog")
+
+    for habit_id in Habit.objects.values_list("pk", flat=True).iterator():
+        days = list(
+            HabitLog.objects.filter(habit_id=habit_id, completed=True).values_list(
+                "date", flat=True
+            )
+        )
+        if not days:
+            continue
+        origin = min(days)
+        bits = 0
+        for day in days:
+            bits |= 1 << (day - origin).days
+        Habit.objects.filter(pk=habit_id).update(
+            completion_bits=bits.to_bytes((bits.bit_length() + 7) // 8, "little"),
+            completion_bits_origin=origin,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0002_habitstats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="habit",
+            name="completion_bits",
+            field=models.BinaryField(default=b""),
+        ),
+        migrations.AddField(
+            model_name="habit",
+            name="completion_bits_origin",
+            field=models.DateField(
+                blank=True,
+                editable=False,
+                help_text="Day stored in bit 0 of completion_bits",
+                null=True,
+            ),
+        ),
+        migrations.RunPython(build_completion_bits, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0003_habit_completion_bits"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="habit",
+            index=models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="habits_habi_user_id_54fcb2_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="habitlog",
+            index=models.Index(
+                fields=["-date", "-id"], name="habits_habi_date_10187e_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_log_users(apps, schema_editor):
+    """Copy each log's owner from its habit."""
+    Habit = apps.get_model("habits", "Habit")
+    HabitLog = apps.get_model("habits", "HabitLog")
+
+    HabitLog.objects.update(
+        user_id=models.Subquery(
+            Habit.objects.filter(pk=models.OuterRef("habit_id")).values("user_id")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0004_keyset_pagination_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="habitlog",
+            name="habits_habi_date_10187e_idx",
+        ),
+        migrations.AddField(
+            model_name="habitlog",
+            name="user",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="habit_logs",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.RunPython(backfill_log_users, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="habitlog",
+            name="user",
+            field=models.ForeignKey(
+                editable=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="habit_logs",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="habitlog",
+            index=models.Index(
+                fields=["user", "date", "id"], name="habits_habi_user_id_8952d2_idx"
+            ),
+        ),
+    ]
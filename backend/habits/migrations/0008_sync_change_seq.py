@@ -0,0 +1,82 @@
+# Generated by Django 5.0.1 on 2026-10-17 01:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0007_user_daily_rollup"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChangeCounter",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="+",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("value", models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name="habit",
+            name="habits_habi_user_id_bbc18b_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="habitlog",
+            name="habits_habi_user_id_3e8a9e_idx",
+        ),
+        migrations.AddField(
+            model_name="habit",
+            name="change_seq",
+            field=models.PositiveBigIntegerField(
+                default=0,
+                editable=False,
+                help_text="ChangeCounter value of the last write",
+            ),
+        ),
+        migrations.AddField(
+            model_name="habitlog",
+            name="change_seq",
+            field=models.PositiveBigIntegerField(
+                default=0,
+                editable=False,
+                help_text="ChangeCounter value of the last write",
+            ),
+        ),
+        migrations.AddField(
+            model_name="tombstone",
+            name="change_seq",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="habit",
+            index=models.Index(
+                fields=["user", "change_seq"], name="habits_habi_user_id_18a633_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="habitlog",
+            index=models.Index(
+                fields=["user", "change_seq", "id"],
+                name="habits_habi_user_id_a7f47f_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tombstone",
+            index=models.Index(
+                fields=["user", "change_seq"], name="habits_tomb_user_id_86d935_idx"
+            ),
+        ),
+    ]
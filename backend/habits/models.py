@@ -3,9 +3,12 @@ Models for habit tracking module.
 Week 2: Habit and HabitLog with streak calculations.
 """
 
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
+from django.utils import timezone
 from datetime import date, timedelta
 
 User = get_user_model()
@@ -30,6 +33,107 @@ class HabitFrequency(models.TextChoices):
     MONTHLY = "monthly", "Monthly"
 
 
+class HabitQuerySet(models.QuerySet):
+    """QuerySet for habits with batch statistics."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._with_stats = False
+        self._with_streaks = False
+
+    def with_stats(self):
+        """
+        Annotate log counts and attach streaks and completion rate.
+
+        Counts are computed in SQL, daily streaks come from each row's
+        completion bitmap and period streaks from one extra query, so a page
+        costs the same number of queries no matter how many habits it holds
+        or how long their streaks are.
+        """
+        queryset = self.annotate(
+            total_logs=models.Count("logs"),
+            completed_logs=models.Count("logs", filter=models.Q(logs__completed=True)),
+        )
+        if not queryset.query.order_by:
+            # Django ignores Meta.ordering on GROUP BY queries; keep it explicit.
+            queryset = queryset.order_by(*self.model._meta.ordering)
+        queryset._with_stats = True
+        return queryset
+
+    def with_streaks(self):
+        """
+        Attach current streaks and period progress only, from each row's
+        completion bitmap. Unlike with_stats() nothing aggregates the logs,
+        so the cost does not grow with history.
+        """
+        queryset = self._chain()
+        queryset._with_streaks = True
+        return queryset
+
+    def with_recent_logs(self, since, limit):
+        """
+        Prefetch each habit's newest logs dated ``since`` or later, at most
+        ``limit`` per habit, into ``recent_logs`` with one query.
+        """
+        logs = HabitLog.objects.filter(date__gte=since).order_by("-date")[:limit]
+        return self.prefetch_related(
+            models.Prefetch("logs", queryset=logs, to_attr="recent_logs")
+        )
+
+    def with_day_log(self, day):
+        """Prefetch each habit's log for ``day``, if any, into ``day_logs``."""
+        return self.prefetch_related(
+            models.Prefetch(
+                "logs",
+                queryset=HabitLog.objects.filter(date=day),
+                to_attr="day_logs",
+            )
+        )
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._with_stats = self._with_stats
+        clone._with_streaks = self._with_streaks
+        return clone
+
+    def _fetch_all(self):
+        fetched = self._result_cache is not None
+        super()._fetch_all()
+        if fetched:
+            return
+        if self._with_stats:
+            self._attach_stats()
+        elif self._with_streaks:
+            self._attach_streaks()
+
+    def _attach_stats(self):
+        """Set streak, period progress and completion rate on fetched habits."""
+        from habits.periods import daily_period_stats, get_period_stats
+
+        habits = [obj for obj in self._result_cache if isinstance(obj, Habit)]
+        periods = get_period_stats(habits)
+        for habit in habits:
+            if habit.pk in periods:
+                stats = periods[habit.pk]
+            else:
+                stats = daily_period_stats(habit.get_streaks())
+            habit.current_streak = stats.current_streak
+            habit.longest_streak = stats.longest_streak
+            habit.period_progress = stats.current_period
+            habit.completion_rate = habit.completion_rate_for(habit.completed_logs)
+
+    def _attach_streaks(self):
+        """Set current streak and period progress on fetched habits."""
+        from habits.periods import current_progress
+
+        today = date.today()
+        for habit in self._result_cache:
+            if isinstance(habit, Habit):
+                habit.period_progress, habit.current_streak = current_progress(
+                    habit, today
+                )
+
+
 class Habit(models.Model):
     """Model for tracking habits."""
 
@@ -53,16 +157,69 @@ class Habit(models.Model):
     )
     start_date = models.DateField()
     is_active = models.BooleanField(default=True)
+    completion_bits = models.BinaryField(default=b"", editable=False)
+    completion_bits_origin = models.DateField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Day stored in bit 0 of completion_bits",
+    )
+    change_seq = models.PositiveBigIntegerField(
+        default=0, editable=False, help_text="ChangeCounter value of the last write"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = HabitQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
         indexes = [
             models.Index(fields=["user", "is_active"]),
             models.Index(fields=["created_at"]),
+            models.Index(fields=["user", "-created_at", "-id"]),
+            models.Index(fields=["user", "change_seq"]),
         ]
 
+    # Fields that decide which days a habit is expected in UserDailyRollup.
+    ROLLUP_FIELDS = ("category", "frequency", "start_date", "is_active")
+    # Fields habits.bitmaps maintains with queryset updates; save() never
+    # writes them, so a stale in-memory bitmap cannot overwrite a newer one.
+    BITMAP_FIELDS = ("completion_bits", "completion_bits_origin")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        habit = super().from_db(db, field_names, values)
+        habit._stored_rollup_values = habit.rollup_values()
+        return habit
+
+    def save(self, *args, **kwargs):
+        """
+        Save the habit under the owner's next change sequence number,
+        leaving BITMAP_FIELDS of an existing row untouched.
+        """
+        if not self._state.adding:
+            update_fields = kwargs.get("update_fields")
+            if update_fields is None:
+                update_fields = [
+                    field.name
+                    for field in self._meta.concrete_fields
+                    if not field.primary_key
+                ]
+            update_fields = [
+                field for field in update_fields if field not in self.BITMAP_FIELDS
+            ]
+            if not update_fields:
+                return
+            kwargs["update_fields"] = {*update_fields, "change_seq"}
+        with transaction.atomic(savepoint=False):
+            self.change_seq = ChangeCounter.objects.advance(self.user_id)
+            super().save(*args, **kwargs)
+
+    def rollup_values(self):
+        """Return the loaded ROLLUP_FIELDS values (None where deferred)."""
+        return tuple(self.__dict__.get(field) for field in self.ROLLUP_FIELDS)
+
     def __str__(self):
         """Return habit name with frequency."""
         frequency_display = dict(HabitFrequency.choices).get(
@@ -70,77 +227,102 @@ class Habit(models.Model):
         )
         return f"{self.name} ({frequency_display})"
 
-    def calculate_current_streak(self) -> int:
-        """
-        Calculate current streak (consecutive days completed).
-        For daily habits only.
-        """
-        if self.frequency != HabitFrequency.DAILY:
-            return 0
-
-        today = date.today()
-        streak = 0
+    @property
+    def completion_bitmap(self):
+        """Completed days packed one bit per day (see habits.bitmaps)."""
+        from habits.bitmaps import CompletionBitmap
 
-        # Check backward from today
-        current_date = today
+        return CompletionBitmap.from_habit(self)
 
-        while True:
-            log = HabitLog.objects.filter(
-                habit=self, date=current_date, completed=True
-            ).first()
+    def get_streaks(self):
+        """Return current and longest day streaks from the completion bitmap."""
+        from habits.streaks import Streaks
 
-            if log:
-                streak += 1
-                current_date -= timedelta(days=1)
-            else:
-                break
+        bitmap = self.completion_bitmap
+        return Streaks(bitmap.current_streak(date.today()), bitmap.longest_streak())
 
-        return streak
+    def get_period_stats(self):
+        """Return current period progress and period streaks."""
+        from habits.periods import daily_period_stats, get_period_stats
 
-    def get_longest_streak(self) -> int:
-        """Calculate longest streak ever achieved."""
-        logs = (
-            HabitLog.objects.filter(habit=self, completed=True)
-            .order_by("date")
-            .values_list("date", flat=True)
-        )
+        if self.frequency == HabitFrequency.DAILY:
+            return daily_period_stats(self.get_streaks())
+        return get_period_stats([self])[self.pk]
 
-        if not logs:
-            return 0
+    def calculate_current_streak(self) -> int:
+        """
+        Calculate current streak.
+        Consecutive days completed for daily habits; consecutive weeks or
+        months meeting goal_count for weekly and monthly habits.
+        """
+        if self.frequency != HabitFrequency.DAILY:
+            return self.get_period_stats().current_streak
 
-        longest = 1
-        current = 1
-        logs_list = list(logs)
+        return self.completion_bitmap.current_streak(date.today())
 
-        for i in range(1, len(logs_list)):
-            if logs_list[i] == logs_list[i - 1] + timedelta(days=1):
-                current += 1
-                longest = max(longest, current)
-            else:
-                current = 1
+    def get_longest_streak(self) -> int:
+        """Calculate longest streak ever achieved (in days, weeks or months)."""
+        if self.frequency != HabitFrequency.DAILY:
+            return self.get_period_stats().longest_streak
 
-        return longest
+        return self.completion_bitmap.longest_streak()
 
     def get_completion_rate(self) -> float:
         """Calculate completion rate percentage."""
-        today = date.today()
-        days_active = (today - self.start_date).days + 1
+        return self.completion_rate_for(self.completion_bitmap.count())
+
+    @property
+    def days_active(self) -> int:
+        """Number of days from start date through today."""
+        return (date.today() - self.start_date).days + 1
+
+    def completion_rate_for(self, completed: int) -> float:
+        """Return completion rate percentage for a number of completed logs."""
+        days_active = self.days_active
 
         if days_active <= 0:
             return 0.0
 
-        completed = HabitLog.objects.filter(habit=self, completed=True).count()
-
         return (completed / days_active) * 100
 
 
+class HabitLogQuerySet(models.QuerySet):
+    """QuerySet for habit logs."""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        Bulk insert logs, copying each owner from its habit and taking the
+        owner's next change sequence number like save(). Upserts rewrite
+        change_seq along with the given update_fields.
+        """
+        objs = list(objs)
+        for obj in objs:
+            obj.fill_user()
+        if kwargs.get("update_fields"):
+            kwargs["update_fields"] = [*kwargs["update_fields"], "change_seq"]
+        with transaction.atomic(savepoint=False):
+            for user_id in sorted({obj.user_id for obj in objs}):
+                change_seq = ChangeCounter.objects.advance(user_id)
+                for obj in objs:
+                    if obj.user_id == user_id:
+                        obj.change_seq = change_seq
+            return super().bulk_create(objs, *args, **kwargs)
+
+
 class HabitLog(models.Model):
     """Model for logging habit completions."""
 
     habit = models.ForeignKey(Habit, on_delete=models.CASCADE, related_name="logs")
+    # Denormalized habit.user so ownership filters need no join.
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="habit_logs", editable=False
+    )
     date = models.DateField()
     completed = models.BooleanField(default=False)
     notes = models.TextField(blank=True, default="")
+    change_seq = models.PositiveBigIntegerField(
+        default=0, editable=False, help_text="ChangeCounter value of the last write"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -150,9 +332,609 @@ class HabitLog(models.Model):
         indexes = [
             models.Index(fields=["habit", "date"]),
             models.Index(fields=["habit", "completed"]),
+            models.Index(fields=["user", "date", "id"]),
+            models.Index(fields=["user", "change_seq", "id"]),
         ]
 
+    objects = HabitLogQuerySet.as_manager()
+
     def __str__(self):
         """Return log string representation."""
         status = "✓" if self.completed else "✗"
         return f"{self.habit.name} - {self.date} ({status})"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        log = super().from_db(db, field_names, values)
+        # A log moved to another date refreshes the rollups of both days.
+        log._stored_date = log.__dict__.get("date")
+        return log
+
+    def fill_user(self):
+        """Copy the owner from the habit when not set."""
+        if self.user_id is None:
+            self.user_id = self.habit.user_id
+
+    def save(self, *args, **kwargs):
+        """
+        Save the log under the owner's next change sequence number and
+        update derived habit stats in one transaction.
+        """
+        self.fill_user()
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "change_seq"}
+        with transaction.atomic():
+            self.change_seq = ChangeCounter.objects.advance(self.user_id)
+            super().save(*args, **kwargs)
+
+
+class HabitStatsManager(models.Manager):
+    """Manager for computing, rebuilding and verifying habit stats."""
+
+    def compute(self, habit_ids):
+        """Return fresh, unsaved HabitStats for each habit id from HabitLog rows."""
+        from habits.streaks import get_runs
+
+        habit_ids = list(habit_ids)
+        counts = {
+            row["habit_id"]: row
+            for row in HabitLog.objects.filter(habit_id__in=habit_ids)
+            .order_by()
+            .values("habit_id")
+            .annotate(
+                total=models.Count("id"),
+                completed=models.Count("id", filter=models.Q(completed=True)),
+            )
+        }
+        runs = get_runs(habit_ids)
+
+        computed = {}
+        for habit_id in habit_ids:
+            row = counts.get(habit_id, {"total": 0, "completed": 0})
+            computed[habit_id] = self.model(
+                habit_id=habit_id,
+                total_logs=row["total"],
+                completed_logs=row["completed"],
+                longest_streak=runs[habit_id].longest,
+                current_run_start=runs[habit_id].latest_start,
+                last_completed_date=runs[habit_id].latest_end,
+            )
+        return computed
+
+    def rebuild(self, habit_ids):
+        """Recompute and upsert stats for the given habits."""
+        stats = list(self.compute(habit_ids).values())
+        return self.bulk_create(
+            stats,
+            update_conflicts=True,
+            unique_fields=["habit"],
+            update_fields=HabitStats.SUMMARY_FIELDS + ["updated_at"],
+        )
+
+    def verify(self, habit_ids):
+        """Return (habit_id, field, stored, expected) for every stale value."""
+        computed = self.compute(habit_ids)
+        stored = self.in_bulk(list(computed))
+
+        mismatches = []
+        for habit_id, expected in computed.items():
+            actual = stored.get(habit_id)
+            if actual is None:
+                mismatches.append((habit_id, "row", None, "present"))
+                continue
+            for field in HabitStats.SUMMARY_FIELDS:
+                if getattr(actual, field) != getattr(expected, field):
+                    mismatches.append(
+                        (
+                            habit_id,
+                            field,
+                            getattr(actual, field),
+                            getattr(expected, field),
+                        )
+                    )
+        return mismatches
+
+    def for_habit(self, habit):
+        """Return the habit's stats row, building it on first access."""
+        try:
+            return habit.stats
+        except HabitStats.DoesNotExist:
+            return self.rebuild([habit.pk])[0]
+
+    def record_log_saved(self, log, created):
+        """Apply a saved log: append in place when possible, else recompute."""
+        with transaction.atomic():
+            stats = self.select_for_update().filter(pk=log.habit_id).first()
+            if stats is not None and created and stats.append(log):
+                stats.save()
+            else:
+                self.rebuild([log.habit_id])
+
+    def record_logs_upserted(self, logs, previous, bitmaps):
+        """
+        Apply upserted logs given ``previous``, the completed flag each
+        (habit_id, date) had before the write (absent if created). Counts
+        are adjusted by the changes and streaks read from the habits'
+        updated completion ``bitmaps``, so no log history is scanned; habits
+        without a stats row yet are computed from their logs.
+        """
+        with transaction.atomic(savepoint=False):
+            stored = {
+                stats.pk: stats
+                for stats in self.select_for_update()
+                .filter(pk__in=list(bitmaps))
+                .order_by("pk")
+            }
+            for log in logs:
+                stats = stored.get(log.habit_id)
+                if stats is None:
+                    continue
+                was_completed = previous.get((log.habit_id, log.date))
+                if was_completed is None:
+                    stats.total_logs += 1
+                stats.completed_logs += log.completed - bool(was_completed)
+            for habit_id, stats in stored.items():
+                stats.fold_bitmap(bitmaps[habit_id])
+            missing = [habit_id for habit_id in bitmaps if habit_id not in stored]
+            if missing:
+                stored.update(self.compute(missing))
+            self.bulk_create(
+                list(stored.values()),
+                update_conflicts=True,
+                unique_fields=["habit"],
+                update_fields=HabitStats.SUMMARY_FIELDS + ["updated_at"],
+            )
+
+
+class HabitStats(models.Model):
+    """
+    Denormalized per-habit summary kept in step with HabitLog writes.
+    Stats reads become a single primary-key lookup however long the history.
+    """
+
+    SUMMARY_FIELDS = [
+        "total_logs",
+        "completed_logs",
+        "longest_streak",
+        "current_run_start",
+        "last_completed_date",
+    ]
+
+    habit = models.OneToOneField(
+        Habit, on_delete=models.CASCADE, primary_key=True, related_name="stats"
+    )
+    total_logs = models.PositiveIntegerField(default=0)
+    completed_logs = models.PositiveIntegerField(default=0)
+    longest_streak = models.PositiveIntegerField(default=0)
+    current_run_start = models.DateField(
+        null=True,
+        blank=True,
+        help_text="First day of the most recent run of completed days",
+    )
+    last_completed_date = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = HabitStatsManager()
+
+    class Meta:
+        verbose_name_plural = "Habit stats"
+
+    def __str__(self):
+        """Return stats string representation."""
+        return f"Stats for habit {self.habit_id}"
+
+    @property
+    def current_streak(self) -> int:
+        """Length of the most recent run if it reaches today."""
+        today = date.today()
+        if self.last_completed_date is None or not (
+            self.current_run_start <= today <= self.last_completed_date
+        ):
+            return 0
+        return (today - self.current_run_start).days + 1
+
+    def fold_bitmap(self, bitmap):
+        """Take the streak fields from the habit's completion bitmap."""
+        self.longest_streak = bitmap.longest_streak()
+        if not bitmap.bits:
+            self.current_run_start = self.last_completed_date = None
+            return
+        last = bitmap.origin + timedelta(days=bitmap.bits.bit_length() - 1)
+        self.last_completed_date = last
+        self.current_run_start = last - timedelta(days=bitmap.current_streak(last) - 1)
+
+    def append(self, log, new=True) -> bool:
+        """
+        Fold a newly created log, or with ``new=False`` an existing log just
+        marked completed, into the summary.
+        Returns False when the log lands before the latest run and the
+        summary has to be recomputed instead.
+        """
+        last = self.last_completed_date
+        if log.completed and last is not None and log.date <= last:
+            return False
+
+        if new:
+            self.total_logs += 1
+        if not log.completed:
+            return True
+
+        self.completed_logs += 1
+        if last is not None and (log.date - last).days == 1:
+            self.last_completed_date = log.date
+        else:
+            self.current_run_start = self.last_completed_date = log.date
+        run = (self.last_completed_date - self.current_run_start).days + 1
+        self.longest_streak = max(self.longest_streak, run)
+        return True
+
+
+class UserDailyRollupManager(models.Manager):
+    """Manager for computing and rebuilding per-user daily rollups."""
+
+    def history_range(self, user_ids):
+        """
+        Return (first, last) days the users' rollups can cover: from the
+        earliest habit start or log through today or the latest log.
+        """
+        habits = Habit.objects.filter(user_id__in=user_ids).aggregate(
+            first=models.Min("start_date")
+        )
+        logs = HabitLog.objects.filter(user_id__in=user_ids).aggregate(
+            first=models.Min("date"), last=models.Max("date")
+        )
+        firsts = [day for day in (habits["first"], logs["first"]) if day]
+        last = max(day for day in (date.today(), logs["last"]) if day)
+        return (min(firsts), last) if firsts else (None, None)
+
+    def compute(self, user_ids, start, end):
+        """
+        Return fresh, unsaved rollups for the users from ``start`` to ``end``.
+
+        A habit is expected on a day when it is an active daily habit that
+        has started by then (and the day is not in the future), or when it
+        was completed that day, so completed never exceeds expected. Days
+        where nothing is expected get no row.
+        """
+        user_ids = list(user_ids)
+        cells = {}
+
+        def cell(user_id, day, category):
+            return cells.setdefault((user_id, day), {}).setdefault(category, [0, 0])
+
+        # Sweep each user's daily habits in start order, counting those due.
+        daily = (
+            Habit.objects.filter(
+                user_id__in=user_ids,
+                frequency=HabitFrequency.DAILY,
+                is_active=True,
+                start_date__lte=min(end, date.today()),
+            )
+            .order_by("user_id", "start_date")
+            .values_list("user_id", "start_date", "category")
+        )
+        habits_by_user = {}
+        for user_id, start_date, category in daily:
+            habits_by_user.setdefault(user_id, []).append((start_date, category))
+        for user_id, habits in habits_by_user.items():
+            due, index = {}, 0
+            day = max(start, habits[0][0])
+            while day <= min(end, date.today()):
+                while index < len(habits) and habits[index][0] <= day:
+                    category = habits[index][1]
+                    due[category] = due.get(category, 0) + 1
+                    index += 1
+                for category, count in due.items():
+                    cell(user_id, day, category)[1] += count
+                day += timedelta(days=1)
+
+        completed_when_due = models.Q(
+            completed=True,
+            habit__frequency=HabitFrequency.DAILY,
+            habit__is_active=True,
+            habit__start_date__lte=models.F("date"),
+        )
+        logs = (
+            HabitLog.objects.filter(user_id__in=user_ids, date__range=(start, end))
+            .order_by()
+            .values_list("user_id", "date", "habit__category")
+            .annotate(
+                completed_count=models.Count("id", filter=models.Q(completed=True)),
+                due_count=models.Count("id", filter=completed_when_due),
+            )
+        )
+        for user_id, day, category, completed, completed_due in logs:
+            if completed:
+                counts = cell(user_id, day, category)
+                counts[0] += completed
+                # Completions the sweep did not expect still count as due.
+                counts[1] += completed - completed_due
+
+        rollups = []
+        for (user_id, day), categories in sorted(cells.items()):
+            rollups.append(
+                self.model(
+                    user_id=user_id,
+                    date=day,
+                    completed=sum(counts[0] for counts in categories.values()),
+                    expected=sum(counts[1] for counts in categories.values()),
+                    categories={
+                        category: {"completed": counts[0], "expected": counts[1]}
+                        for category, counts in sorted(categories.items())
+                    },
+                )
+            )
+        return rollups
+
+    def rebuild(self, user_ids, start=None, end=None):
+        """
+        Recompute and replace the users' rollups from ``start`` to ``end``,
+        defaulting to their whole history.
+
+        The users' rows are locked first where the database supports it, so
+        concurrent rebuilds for one user run in turn and each computes from
+        the logs the other committed. Rows are upserted on (user, date), so
+        rebuilds never collide on the unique constraint either way.
+        """
+        user_ids = list(user_ids)
+        with transaction.atomic():
+            if connection.features.has_select_for_update:
+                list(
+                    User.objects.select_for_update()
+                    .filter(pk__in=user_ids)
+                    .order_by("pk")
+                    .values_list("pk", flat=True)
+                )
+            stale = self.filter(user_id__in=user_ids)
+            if start is None or end is None:
+                first, last = self.history_range(user_ids)
+                if first is None:
+                    stale.delete()
+                    return []
+            # An open end also clears rows left outside the current history.
+            if start is not None:
+                stale = stale.filter(date__gte=start)
+            else:
+                start = first
+            if end is not None:
+                stale = stale.filter(date__lte=end)
+            else:
+                end = last
+            stale.delete()
+            return self.bulk_create(
+                self.compute(user_ids, start, end),
+                update_conflicts=True,
+                unique_fields=["user", "date"],
+                update_fields=["completed", "expected", "categories"],
+            )
+
+
+class UserDailyRollup(models.Model):
+    """
+    Per-user, per-day completed and expected habit counts, with a
+    {category: {"completed", "expected"}} breakdown. Trends read one row per
+    day instead of scanning HabitLog; see UserDailyRollupManager.compute.
+    """
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="daily_rollups"
+    )
+    date = models.DateField()
+    completed = models.PositiveIntegerField(default=0)
+    expected = models.PositiveIntegerField(default=0)
+    categories = models.JSONField(default=dict)
+
+    objects = UserDailyRollupManager()
+
+    class Meta:
+        unique_together = ("user", "date")
+        ordering = ["date"]
+
+    def __str__(self):
+        """Return rollup string representation."""
+        return f"{self.date}: {self.completed}/{self.expected}"
+
+
+class ChangeCounterManager(models.Manager):
+    """Manager handing out per-user change sequence numbers."""
+
+    def current(self, user_id) -> int:
+        """Return the user's last committed change sequence number."""
+        value = self.filter(user_id=user_id).values_list("value", flat=True).first()
+        return value or 0
+
+    def advance(self, user_id) -> int:
+        """
+        Return the user's next change sequence number.
+        Call it inside the writing transaction: the counter row stays locked
+        until that commits, so a user's writes commit in sequence order.
+        """
+        counter = self.filter(user_id=user_id)
+        if not counter.update(value=models.F("value") + 1):
+            self.bulk_create([self.model(user_id=user_id)], ignore_conflicts=True)
+            counter.update(value=models.F("value") + 1)
+        return counter.values_list("value", flat=True).get()
+
+
+class ChangeCounter(models.Model):
+    """
+    Per-user sequence numbering habit, log and tombstone writes for sync.
+    Unlike timestamps, a sequence number read from a committed counter
+    covers every write numbered at or below it.
+    """
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="+"
+    )
+    value = models.PositiveBigIntegerField(default=0)
+
+    objects = ChangeCounterManager()
+
+    def __str__(self):
+        """Return counter string representation."""
+        return f"Change {self.value} of user {self.user_id}"
+
+
+class Tombstone(models.Model):
+    """
+    Record of a deleted habit or log, so sync clients learn about deletions.
+    Logs deleted along with their habit only leave the habit's tombstone.
+    """
+
+    HABIT = "habit"
+    HABIT_LOG = "habitlog"
+    KIND_CHOICES = [(HABIT, "Habit"), (HABIT_LOG, "Habit log")]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    change_seq = models.PositiveBigIntegerField(default=0)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "deleted_at"]),
+            models.Index(fields=["user", "change_seq"]),
+        ]
+
+    def __str__(self):
+        """Return tombstone string representation."""
+        return f"Deleted {self.kind} {self.object_id}"
+
+
+@receiver(post_save, sender=HabitLog)
+def update_habit_stats_on_save(sender, instance, created, raw=False, **kwargs):
+    """Keep HabitStats in step when a log is created or updated."""
+    if not raw:
+        HabitStats.objects.record_log_saved(instance, created)
+
+
+@receiver(post_delete, sender=HabitLog)
+def update_habit_stats_on_delete(sender, instance, origin=None, **kwargs):
+    """Recompute HabitStats when a log is deleted on its own."""
+    if deleted_on_its_own(origin):
+        HabitStats.objects.rebuild([instance.habit_id])
+
+
+@receiver(post_save, sender=HabitLog)
+def update_completion_bitmap_on_save(sender, instance, created, raw=False, **kwargs):
+    """Keep the habit's completion bitmap in step with a saved log."""
+    from habits.bitmaps import rebuild_bitmaps, record_day
+
+    if raw:
+        return
+    habit = instance.habit if HabitLog.habit.is_cached(instance) else None
+    if created:
+        record_day(instance.habit_id, instance.date, instance.completed, habit)
+    else:
+        # The log's date may have changed, so rebuild rather than flip a bit.
+        rebuild_bitmaps([instance.habit_id], habit)
+
+
+@receiver(post_delete, sender=HabitLog)
+def update_completion_bitmap_on_delete(sender, instance, origin=None, **kwargs):
+    """Clear the day's bit when a log is deleted on its own."""
+    from habits.bitmaps import record_day
+
+    if deleted_on_its_own(origin):
+        habit = instance.habit if HabitLog.habit.is_cached(instance) else None
+        record_day(instance.habit_id, instance.date, False, habit)
+
+
+@receiver(post_save, sender=HabitLog)
+def update_daily_rollup_on_save(sender, instance, created, raw=False, **kwargs):
+    """Recompute the owner's rollup for the log's day (and its old day)."""
+    if raw:
+        return
+    days = {instance.date, getattr(instance, "_stored_date", None)} - {None}
+    for day in sorted(days):
+        UserDailyRollup.objects.rebuild([instance.user_id], day, day)
+    instance._stored_date = instance.date
+
+
+@receiver(post_delete, sender=HabitLog)
+def update_daily_rollup_on_delete(sender, instance, origin=None, **kwargs):
+    """Recompute the owner's rollup for the day of a log deleted on its own."""
+    if deleted_on_its_own(origin):
+        UserDailyRollup.objects.rebuild(
+            [instance.user_id], instance.date, instance.date
+        )
+
+
+@receiver(post_save, sender=Habit)
+def update_daily_rollups_for_habit(sender, instance, created, raw=False, **kwargs):
+    """Recompute rollups when a habit changes which days it is expected."""
+    if raw:
+        return
+    stored = getattr(instance, "_stored_rollup_values", None)
+    if created:
+        if instance.start_date <= date.today():
+            UserDailyRollup.objects.rebuild(
+                [instance.user_id], instance.start_date, date.today()
+            )
+    elif stored != instance.rollup_values():
+        UserDailyRollup.objects.rebuild([instance.user_id])
+    instance._stored_rollup_values = instance.rollup_values()
+
+
+@receiver(post_delete, sender=Habit)
+def update_daily_rollups_on_habit_delete(sender, instance, origin=None, **kwargs):
+    """Recompute the owner's rollups once a habit and its logs are gone."""
+    if deleted_on_its_own(origin, Habit):
+        UserDailyRollup.objects.rebuild([instance.user_id])
+
+
+@receiver(post_save, sender=Habit)
+@receiver(post_delete, sender=Habit)
+def invalidate_stats_cache_for_habit(sender, instance, **kwargs):
+    """Invalidate cached statistics once a habit change commits."""
+    from habits.cache import bump_version
+
+    transaction.on_commit(lambda: bump_version(instance.pk))
+
+
+@receiver(post_save, sender=HabitLog)
+@receiver(post_delete, sender=HabitLog)
+def invalidate_stats_cache_for_log(sender, instance, origin=None, **kwargs):
+    """Invalidate the habit's cached statistics once a log change commits."""
+    from habits.cache import bump_version
+
+    # A cascading habit delete invalidates through the habit's own signal.
+    if "created" in kwargs or deleted_on_its_own(origin):
+        transaction.on_commit(lambda: bump_version(instance.habit_id))
+
+
+@receiver(post_delete, sender=Habit)
+def record_habit_tombstone(sender, instance, origin=None, **kwargs):
+    """Leave a tombstone for a habit deleted on its own."""
+    if deleted_on_its_own(origin, Habit):
+        Tombstone.objects.create(
+            user_id=instance.user_id,
+            kind=Tombstone.HABIT,
+            object_id=instance.pk,
+            change_seq=ChangeCounter.objects.advance(instance.user_id),
+        )
+
+
+@receiver(post_delete, sender=HabitLog)
+def record_log_tombstone(sender, instance, origin=None, **kwargs):
+    """Leave a tombstone for a log deleted on its own."""
+    if deleted_on_its_own(origin):
+        Tombstone.objects.create(
+            user_id=instance.user_id,
+            kind=Tombstone.HABIT_LOG,
+            object_id=instance.pk,
+            change_seq=ChangeCounter.objects.advance(instance.user_id),
+        )
+
+
+def deleted_on_its_own(origin, model=None):
+    """
+    Whether a deletion started from an instance or queryset of ``model``
+    (HabitLog by default). Logs removed by cascade from their habit or user
+    take derived data with them.
+    """
+    model = model or HabitLog
+    return isinstance(origin, model) or (
+        isinstance(origin, models.QuerySet) and origin.model is model
+    )
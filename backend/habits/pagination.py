@@ -0,0 +1,70 @@
+"""
+Pagination for habits app.
+Keyset (cursor) pagination: each page filters on the last row's ordering key
+instead of counting rows and skipping an OFFSET, so page N costs the same as
+page 1. Exact totals are not reported; clients can opt in to an estimate.
+"""
+
+import json
+
+from django.db import connections
+from rest_framework.pagination import CursorPagination
+
+# Above this many rows the estimate is reported as "<cap>+" on backends
+# without planner statistics.
+ESTIMATE_CAP = 1000
+
+
+class EstimatedTotalCursorPagination(CursorPagination):
+    """
+    Cursor pagination with an opt-in ``X-Total-Estimate`` response header.
+
+    Clients pass ``?estimate_total=1`` to receive it. PostgreSQL reports the
+    planner's row estimate for the filtered query; other backends count at
+    most ``ESTIMATE_CAP`` rows, so the header never costs a full scan.
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    estimate_query_param = "estimate_total"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.estimate = None
+        if request.query_params.get(self.estimate_query_param) in ("1", "true"):
+            self.estimate = estimate_count(queryset)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.estimate is not None:
+            response["X-Total-Estimate"] = self.estimate
+        return response
+
+
+class HabitCursorPagination(EstimatedTotalCursorPagination):
+    """Habits, newest first, keyed on (created_at, id)."""
+
+    ordering = ("-created_at", "-id")
+
+
+class HabitLogCursorPagination(EstimatedTotalCursorPagination):
+    """Habit logs, most recent day first, keyed on (date, id)."""
+
+    ordering = ("-date", "-id")
+
+
+def estimate_count(queryset) -> str:
+    """Return an approximate row count for ``queryset`` as a header value."""
+    connection = connections[queryset.db]
+    if connection.vendor == "postgresql":
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return str(plan[0]["Plan"]["Plan Rows"])
+
+    count = queryset.order_by()[: ESTIMATE_CAP + 1].count()
+    return f"{ESTIMATE_CAP}+" if count > ESTIMATE_CAP else str(count)
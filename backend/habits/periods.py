@@ -0,0 +1,193 @@
+"""
+Period-aware progress engine for habits.
+Buckets weekly and monthly completions into ISO weeks or calendar months with
+one aggregate query and scores each period against the habit's goal_count.
+
+Streaks for these habits count consecutive periods whose goal was met. The
+period in progress never breaks a streak: until its goal is reached the
+streak runs up to the previous period. Current progress and streak alone
+can be read from the completion bitmap instead, with no query.
+"""
+
+from datetime import date, timedelta
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from django.db.models import Case, Count, DateField, When
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from habits.models import HabitFrequency, HabitLog
+
+PERIOD_NAMES = {
+    HabitFrequency.DAILY: "day",
+    HabitFrequency.WEEKLY: "week",
+    HabitFrequency.MONTHLY: "month",
+}
+
+
+class PeriodProgress(NamedTuple):
+    """Completions within one period measured against the habit's goal."""
+
+    period: str
+    start: date
+    completed: int
+    goal: int
+
+    @property
+    def met(self) -> bool:
+        """Whether the goal for the period was reached."""
+        return self.completed >= self.goal
+
+    def as_dict(self) -> dict:
+        """Return a JSON-friendly representation."""
+        return {
+            "period": self.period,
+            "start": self.start.isoformat(),
+            "completed": self.completed,
+            "goal": self.goal,
+            "met": self.met,
+        }
+
+
+class PeriodStats(NamedTuple):
+    """Current period progress plus current and longest period streaks."""
+
+    current_period: PeriodProgress
+    current_streak: int
+    longest_streak: int
+
+
+def period_start(day: date, frequency: str) -> date:
+    """Return the first day of the period containing ``day``."""
+    if frequency == HabitFrequency.WEEKLY:
+        return day - timedelta(days=day.weekday())
+    if frequency == HabitFrequency.MONTHLY:
+        return day.replace(day=1)
+    return day
+
+
+def next_period_start(start: date, frequency: str) -> date:
+    """Return the first day of the period following the one at ``start``."""
+    if frequency == HabitFrequency.WEEKLY:
+        return start + timedelta(weeks=1)
+    if frequency == HabitFrequency.MONTHLY:
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def daily_period_stats(streaks, today: Optional[date] = None) -> PeriodStats:
+    """
+    Express daily streaks as period stats.
+    A daily habit is logged at most once per day, so its goal is one completion.
+    """
+    today = today or date.today()
+    current = PeriodProgress(
+        period=PERIOD_NAMES[HabitFrequency.DAILY],
+        start=today,
+        completed=1 if streaks.current else 0,
+        goal=1,
+    )
+    return PeriodStats(current, streaks.current, streaks.longest)
+
+
+def get_period_stats(
+    habits: Iterable, today: Optional[date] = None
+) -> Dict[int, PeriodStats]:
+    """
+    Return period stats for each weekly or monthly habit in one query.
+
+    Daily habits are skipped; their streaks come from the day-based streak
+    engine (see ``daily_period_stats``).
+    """
+    habits = [h for h in habits if h.frequency != HabitFrequency.DAILY]
+    if not habits:
+        return {}
+
+    today = today or date.today()
+    weekly_ids = [h.pk for h in habits if h.frequency == HabitFrequency.WEEKLY]
+    rows = (
+        HabitLog.objects.filter(habit_id__in=[h.pk for h in habits], completed=True)
+        .annotate(
+            period=Case(
+                When(habit_id__in=weekly_ids, then=TruncWeek("date")),
+                default=TruncMonth("date"),
+                output_field=DateField(),
+            )
+        )
+        .values("habit_id", "period")
+        .annotate(completed=Count("id"))
+        .order_by("habit_id", "period")
+        .values_list("habit_id", "period", "completed")
+    )
+
+    buckets = {habit.pk: [] for habit in habits}
+    for habit_id, start, completed in rows:
+        buckets[habit_id].append((start, completed))
+
+    return {
+        habit.pk: _score_periods(habit, buckets[habit.pk], today) for habit in habits
+    }
+
+
+def current_progress(habit, today: Optional[date] = None) -> Tuple[PeriodProgress, int]:
+    """
+    Return the habit's current period progress and current streak from its
+    completion bitmap, for any frequency and without a query.
+
+    Periods are counted back only while the streak lasts, so the cost
+    follows the streak rather than the history; longest streaks are left
+    to ``get_period_stats``.
+    """
+    today = today or date.today()
+    frequency = habit.frequency
+    goal = 1 if frequency == HabitFrequency.DAILY else habit.goal_count
+    bitmap = habit.completion_bitmap
+
+    def completed_in(start):
+        end = next_period_start(start, frequency) - timedelta(days=1)
+        return bitmap.window(start, end).bit_count()
+
+    start = period_start(today, frequency)
+    current = PeriodProgress(PERIOD_NAMES[frequency], start, completed_in(start), goal)
+    if frequency == HabitFrequency.DAILY:
+        # Daily streaks end at today, as in the day-based streak engine.
+        return current, bitmap.current_streak(today)
+    # The period in progress only extends the streak once its goal is met.
+    streak = 1 if current.met else 0
+    start = period_start(start - timedelta(days=1), frequency)
+    while completed_in(start) >= goal:
+        streak += 1
+        start = period_start(start - timedelta(days=1), frequency)
+    return current, streak
+
+
+def _score_periods(habit, buckets, today):
+    """Walk one habit's non-empty periods, oldest first, to score streaks."""
+    frequency = habit.frequency
+    current_start = period_start(today, frequency)
+    previous_start = period_start(current_start - timedelta(days=1), frequency)
+
+    longest = run = current_streak = current_completed = 0
+    run_end = None
+    for start, completed in buckets:
+        if start == current_start:
+            current_completed = completed
+        if completed < habit.goal_count:
+            run = 0
+            continue
+        if run and next_period_start(run_end, frequency) == start:
+            run += 1
+        else:
+            run = 1
+        run_end = start
+        longest = max(longest, run)
+        # A streak is alive while its last met period is this one or the last.
+        if start in (current_start, previous_start):
+            current_streak = run
+
+    current = PeriodProgress(
+        period=PERIOD_NAMES[frequency],
+        start=current_start,
+        completed=current_completed,
+        goal=habit.goal_count,
+    )
+    return PeriodStats(current, current_streak, longest)
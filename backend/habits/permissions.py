@@ -0,0 +1,14 @@
+"""
+Permissions for habits app.
+Ownership checks read the object's own user_id column, so neither habits nor
+habit logs need a join to decide who may touch them.
+"""
+
+from rest_framework.permissions import BasePermission
+
+
+class IsOwner(BasePermission):
+    """Allow access only to objects whose ``user_id`` is the requesting user."""
+
+    def has_object_permission(self, request, view, obj):
+        return obj.user_id == request.user.pk
@@ -0,0 +1,162 @@
+"""
+Fast synthetic data seeding for habits app.
+Bulk-inserts users, profiles, habits and logs for local load and benchmark
+runs. Model signals are bypassed (bulk_create does not send them), every
+user shares one password hash computed once, and a seeded RNG makes runs
+reproducible.
+
+Logs go in through cursor.executemany() with column values prepared once
+per day, skipping model instantiation, which dominates ORM bulk inserts
+at millions of rows. Derived state (HabitStats, completion bitmaps, daily
+rollups) is then rebuilt with one refresh_derived_state() per user chunk.
+Rows keep change_seq 0: their users are new, so a full sync picks them up
+and no sync cursor can be past them.
+"""
+
+import random
+import time
+from datetime import date, timedelta
+from typing import NamedTuple
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.models import UserProfile
+from habits.bulk import refresh_derived_state
+from habits.models import (
+    ChangeCounter,
+    Habit,
+    HabitCategory,
+    HabitFrequency,
+    HabitLog,
+)
+
+User = get_user_model()
+
+DEFAULT_PASSWORD = "seed-password"
+LOG_COLUMNS = [
+    "habit",
+    "user",
+    "date",
+    "completed",
+    "notes",
+    "change_seq",
+    "created_at",
+    "updated_at",
+]
+
+
+class SeedResult(NamedTuple):
+    """Counts and timing of a seeding run."""
+
+    users: int
+    habits: int
+    logs: int
+    seconds: float
+
+    @property
+    def logs_per_second(self) -> float:
+        """Log insert throughput over the whole run."""
+        return self.logs / self.seconds if self.seconds else 0.0
+
+
+def seed(
+    users: int,
+    habits_per_user: int,
+    days: int,
+    density: float = 0.8,
+    completion_rate: float = 0.8,
+    streak_habits: int = 0,
+    prefix: str = "seed",
+    password: str = DEFAULT_PASSWORD,
+    rng_seed: int = 0,
+    chunk_size: int = 100,
+    derived: bool = True,
+) -> SeedResult:
+    """
+    Create ``users`` users named ``<prefix><n>``, each with daily habits
+    started ``days`` days ago.
+
+    Each habit-day gets a log with probability ``density``, completed with
+    probability ``completion_rate``; the first ``streak_habits`` habits of
+    every user are instead completed every day. Users are written
+    ``chunk_size`` at a time, each chunk in one transaction.
+    """
+    started = time.perf_counter()
+    rng = random.Random(rng_seed)
+    start = date.today() - timedelta(days=days - 1)
+    categories = [choice for choice, _ in HabitCategory.choices]
+    password_hash = make_password(password)
+    # Values are prepared for the database once, not per row.
+    prepared_days = [
+        HabitLog._meta.get_field("date").get_db_prep_value(
+            start + timedelta(days=day), connection
+        )
+        for day in range(days)
+    ]
+    now = HabitLog._meta.get_field("created_at").get_db_prep_value(
+        timezone.now(), connection
+    )
+    sql = _insert_sql(HabitLog, LOG_COLUMNS)
+
+    habit_count = log_count = 0
+    for first in range(0, users, chunk_size):
+        with transaction.atomic():
+            chunk = User.objects.bulk_create(
+                User(
+                    username=f"{prefix}{n}",
+                    email=f"{prefix}{n}@example.com",
+                    password=password_hash,
+                )
+                for n in range(first, min(first + chunk_size, users))
+            )
+            UserProfile.objects.bulk_create(UserProfile(user=user) for user in chunk)
+            ChangeCounter.objects.bulk_create(
+                ChangeCounter(user=user) for user in chunk
+            )
+            habits = Habit.objects.bulk_create(
+                Habit(
+                    user=user,
+                    name=f"Habit {index}",
+                    category=categories[index % len(categories)],
+                    frequency=HabitFrequency.DAILY,
+                    start_date=start,
+                )
+                for user in chunk
+                for index in range(habits_per_user)
+            )
+
+            rows = []
+            for position, habit in enumerate(habits):
+                streak = position % habits_per_user < streak_habits
+                for day in prepared_days:
+                    if streak:
+                        completed = True
+                    elif rng.random() < density:
+                        completed = rng.random() < completion_rate
+                    else:
+                        continue
+                    rows.append(
+                        (habit.pk, habit.user_id, day, completed, "", 0, now, now)
+                    )
+            with connection.cursor() as cursor:
+                cursor.executemany(sql, rows)
+            log_count += len(rows)
+
+            if derived:
+                refresh_derived_state([habit.pk for habit in habits])
+        habit_count += len(habits)
+
+    return SeedResult(users, habit_count, log_count, time.perf_counter() - started)
+
+
+def _insert_sql(model, fields) -> str:
+    """Return a parameterized INSERT for ``fields`` of ``model``."""
+    quote = connection.ops.quote_name
+    columns = ", ".join(quote(model._meta.get_field(name).column) for name in fields)
+    placeholders = ", ".join(["%s"] * len(fields))
+    return (
+        f"INSERT INTO {quote(model._meta.db_table)} ({columns}) VALUES ({placeholders})"
+    )
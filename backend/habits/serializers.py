@@ -3,10 +3,129 @@ Serializers for habits app.
 Week 2: Habit and HabitLog serializers with streak calculations.
 """
 
+from datetime import date, timedelta
+from django.conf import settings
 from rest_framework import serializers
 from habits.models import Habit, HabitLog
 
 
+def get_logs_window(query_params=None):
+    """
+    Return (since, limit) bounding the logs nested in a habit.
+
+    Defaults to the last HABIT_LOGS_WINDOW_DAYS days and HABIT_LOGS_LIMIT
+    logs; ``logs_since`` (ISO date) and ``logs_limit`` query parameters
+    narrow or move the window, with the limit capped at HABIT_LOGS_LIMIT.
+    """
+    query_params = query_params or {}
+    since = date.today() - timedelta(days=settings.HABIT_LOGS_WINDOW_DAYS)
+    limit = settings.HABIT_LOGS_LIMIT
+    errors = {}
+
+    if query_params.get("logs_since"):
+        try:
+            since = date.fromisoformat(query_params["logs_since"])
+        except ValueError:
+            errors["logs_since"] = ["Enter a date in YYYY-MM-DD format."]
+    if query_params.get("logs_limit"):
+        try:
+            limit = int(query_params["logs_limit"])
+        except ValueError:
+            limit = -1
+        if not 0 <= limit <= settings.HABIT_LOGS_LIMIT:
+            errors["logs_limit"] = [
+                f"Enter a whole number from 0 to {settings.HABIT_LOGS_LIMIT}."
+            ]
+
+    if errors:
+        raise serializers.ValidationError(errors)
+    return since, limit
+
+
+MATRIX_ENCODINGS = ("bits", "runs")
+TREND_PERIODS = ("day", "week", "month")
+
+
+def _parse_date_range(query_params, errors, default_days, max_days):
+    """
+    Return (start, end) from ``from`` and ``to`` (ISO dates, inclusive),
+    defaulting to the ``default_days`` ending today; problems go to ``errors``.
+    """
+    end = date.today()
+    start = None
+    for name in ("from", "to"):
+        if query_params.get(name):
+            try:
+                value = date.fromisoformat(query_params[name])
+            except ValueError:
+                errors[name] = ["Enter a date in YYYY-MM-DD format."]
+                continue
+            if name == "from":
+                start = value
+            else:
+                end = value
+    if start is None:
+        start = end - timedelta(days=default_days - 1)
+    if not errors:
+        if start > end:
+            errors["from"] = ["Must not be after 'to'."]
+        elif (end - start).days >= max_days:
+            errors["to"] = [f"Enter a range of at most {max_days} days."]
+    return start, end
+
+
+def get_matrix_params(query_params=None):
+    """
+    Return (start, end, habit_ids, encoding) for the completion matrix.
+
+    ``from`` and ``to`` (ISO dates, inclusive) default to the year ending
+    today and may span at most HABIT_MATRIX_MAX_DAYS days; ``habits`` is an
+    optional comma-separated list of ids and ``encoding`` one of
+    MATRIX_ENCODINGS.
+    """
+    query_params = query_params or {}
+    habit_ids = None
+    encoding = query_params.get("encoding") or "bits"
+    errors = {}
+
+    start, end = _parse_date_range(
+        query_params, errors, 365, settings.HABIT_MATRIX_MAX_DAYS
+    )
+    if query_params.get("habits"):
+        try:
+            habit_ids = [int(pk) for pk in query_params["habits"].split(",")]
+        except ValueError:
+            errors["habits"] = ["Enter a comma-separated list of habit ids."]
+    if encoding not in MATRIX_ENCODINGS:
+        errors["encoding"] = [f"Choose one of: {', '.join(MATRIX_ENCODINGS)}."]
+
+    if errors:
+        raise serializers.ValidationError(errors)
+    return start, end, habit_ids, encoding
+
+
+def get_trends_params(query_params=None):
+    """
+    Return (start, end, period) for completion trends.
+
+    ``from`` and ``to`` default to the 30 days ending today and may span at
+    most HABIT_MATRIX_MAX_DAYS days; ``period`` is one of TREND_PERIODS.
+    """
+    query_params = query_params or {}
+    period = query_params.get("period") or "day"
+    errors = {}
+
+    start, end = _parse_date_range(
+        query_params, errors, 30, settings.HABIT_MATRIX_MAX_DAYS
+    )
+    if period not in TREND_PERIODS:
+        errors["period"] = [f"Choose one of: {', '.join(TREND_PERIODS)}."]
+
+    if errors:
+        raise serializers.ValidationError(errors)
+    return start, end, period
+
+
 class HabitLogSerializer(serializers.ModelSerializer):
     """Serializer for HabitLog model."""
 
@@ -16,10 +135,20 @@ class HabitLogSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at"]
 
 
+class CheckInEntrySerializer(serializers.Serializer):
+    """One entry of a bulk check-in: a log for one habit on one day."""
+
+    habit = serializers.IntegerField(min_value=1)
+    date = serializers.DateField()
+    completed = serializers.BooleanField(default=True)
+    notes = serializers.CharField(allow_blank=True, default="")
+
+
 class HabitListSerializer(serializers.ModelSerializer):
     """Serializer for Habit list view (minimal info)."""
 
     current_streak = serializers.SerializerMethodField()
+    period_progress = serializers.SerializerMethodField()
 
     class Meta:
         model = Habit
@@ -30,14 +159,46 @@ class HabitListSerializer(serializers.ModelSerializer):
             "frequency",
             "is_active",
             "current_streak",
+            "period_progress",
             "created_at",
         ]
         read_only_fields = ["id", "created_at"]
 
     def get_current_streak(self, obj):
-        """Get current streak for the habit."""
+        """Get current streak, preferring with_stats() or with_streaks()."""
+        if hasattr(obj, "current_streak"):
+            return obj.current_streak
         return obj.calculate_current_streak()
 
+    def get_period_progress(self, obj):
+        """Get progress toward goal_count in the current day, week or month."""
+        if hasattr(obj, "period_progress"):
+            return obj.period_progress.as_dict()
+        return obj.get_period_stats().current_period.as_dict()
+
+
+class TodayHabitSerializer(HabitListSerializer):
+    """Active habit with today's log, for GET /api/habits/today/."""
+
+    today = serializers.SerializerMethodField()
+
+    class Meta(HabitListSerializer.Meta):
+        fields = [
+            "id",
+            "name",
+            "category",
+            "frequency",
+            "goal_count",
+            "current_streak",
+            "period_progress",
+            "today",
+        ]
+
+    def get_today(self, obj):
+        """Get today's log from the with_day_log() prefetch, or None."""
+        logs = obj.day_logs
+        return HabitLogSerializer(logs[0]).data if logs else None
+
 
 class HabitSerializer(serializers.ModelSerializer):
     """Serializer for Habit model with full details."""
@@ -45,7 +206,8 @@ class HabitSerializer(serializers.ModelSerializer):
     current_streak = serializers.SerializerMethodField()
     longest_streak = serializers.SerializerMethodField()
     completion_rate = serializers.SerializerMethodField()
-    logs = HabitLogSerializer(many=True, read_only=True)
+    period_progress = serializers.SerializerMethodField()
+    logs = serializers.SerializerMethodField()
 
     class Meta:
         model = Habit
@@ -61,6 +223,7 @@ class HabitSerializer(serializers.ModelSerializer):
             "current_streak",
             "longest_streak",
             "completion_rate",
+            "period_progress",
             "logs",
             "created_at",
             "updated_at",
@@ -73,14 +236,40 @@ class HabitSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
     def get_current_streak(self, obj):
-        """Get current streak for the habit."""
+        """Get current streak, preferring the with_stats() annotation."""
+        if hasattr(obj, "current_streak"):
+            return obj.current_streak
         return obj.calculate_current_streak()
 
+    def get_logs(self, obj):
+        """
+        Get the newest logs within the window, preferring the
+        with_recent_logs() prefetch. Full history is paginated at
+        /api/habits/{id}/logs/.
+        """
+        if hasattr(obj, "recent_logs"):
+            logs = obj.recent_logs
+        else:
+            since, limit = self.context.get("logs_window") or get_logs_window()
+            logs = obj.logs.filter(date__gte=since)[:limit]
+        return HabitLogSerializer(logs, many=True, context=self.context).data
+
     def get_longest_streak(self, obj):
-        """Get longest streak achieved."""
+        """Get longest streak achieved, preferring the with_stats() annotation."""
+        if hasattr(obj, "longest_streak"):
+            return obj.longest_streak
         return obj.get_longest_streak()
 
     def get_completion_rate(self, obj):
-        """Get completion rate percentage."""
-        rate = obj.get_completion_rate()
+        """Get completion rate percentage, preferring the with_stats() annotation."""
+        if hasattr(obj, "completion_rate"):
+            rate = obj.completion_rate
+        else:
+            rate = obj.get_completion_rate()
         return round(rate, 2)
+
+    def get_period_progress(self, obj):
+        """Get progress toward goal_count in the current day, week or month."""
+        if hasattr(obj, "period_progress"):
+            return obj.period_progress.as_dict()
+        return obj.get_period_stats().current_period.as_dict()
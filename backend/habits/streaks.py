@@ -0,0 +1,179 @@
+"""
+Set-based streak engine for habits.
+Computes current and longest daily streaks with one gaps-and-islands query.
+
+Consecutive completed dates of a habit form an "island": subtracting each
+row's position (ROW_NUMBER over the habit's dates) from its date yields the
+same value for every day of a run, so grouping on that value gives one row
+per run without walking the history day by day.
+"""
+
+from datetime import date
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from django.db import connection
+
+from habits.models import HabitLog
+
+
+class Streaks(NamedTuple):
+    """Current and longest streak (in days) for a single habit."""
+
+    current: int
+    longest: int
+
+
+class Runs(NamedTuple):
+    """Summary of a habit's runs of consecutive completed days."""
+
+    longest: int
+    current_start: Optional[date]
+    latest_start: Optional[date]
+    latest_end: Optional[date]
+
+    def current_streak(self, today: date) -> int:
+        """Return the length of the run containing ``today`` up to today."""
+        if self.current_start is None:
+            return 0
+        return (today - self.current_start).days + 1
+
+
+NO_STREAKS = Streaks(current=0, longest=0)
+NO_RUNS = Runs(longest=0, current_start=None, latest_start=None, latest_end=None)
+
+# Expression turning a date and its row number into a per-run constant.
+ISLAND_KEY_SQL = {
+    "postgresql": "{date} - CAST({row_number} AS integer)",
+    "sqlite": "julianday({date}) - {row_number}",
+    "mysql": "DATE_SUB({date}, INTERVAL {row_number} DAY)",
+}
+
+
+def get_streaks(
+    habit_ids: Iterable[int], today: Optional[date] = None
+) -> Dict[int, Streaks]:
+    """
+    Return current and longest streaks for each habit id.
+
+    The current streak counts back from ``today``: it is the number of days
+    from the start of the run containing today up to today, or 0 when today
+    has not been completed. Habits without completed logs map to
+    ``NO_STREAKS``.
+    """
+    today = today or date.today()
+    return {
+        habit_id: Streaks(current=runs.current_streak(today), longest=runs.longest)
+        for habit_id, runs in get_runs(habit_ids, today).items()
+    }
+
+
+def get_runs(habit_ids: Iterable[int], today: Optional[date] = None) -> Dict[int, Runs]:
+    """
+    Return the run summary for each habit id in a single query.
+
+    Besides the longest run, the summary holds the start of the run
+    containing ``today`` and the boundaries of the most recent run. Habits
+    without completed logs map to ``NO_RUNS``.
+    """
+    habit_ids = list(habit_ids)
+    if not habit_ids:
+        return {}
+
+    today = today or date.today()
+    if connection.features.supports_over_clause and connection.vendor in (
+        ISLAND_KEY_SQL
+    ):
+        runs = _window_runs(habit_ids, today)
+    else:
+        runs = _scan_runs(habit_ids, today)
+
+    return {habit_id: runs.get(habit_id, NO_RUNS) for habit_id in habit_ids}
+
+
+def _window_runs(habit_ids, today):
+    """Collapse runs with ROW_NUMBER() and aggregate them in the database."""
+    qn = connection.ops.quote_name
+    row_number = "ROW_NUMBER() OVER (PARTITION BY {habit} ORDER BY {date})".format(
+        habit=qn("habit_id"), date=qn("date")
+    )
+    island_key = ISLAND_KEY_SQL[connection.vendor].format(
+        date=qn("date"), row_number=row_number
+    )
+    placeholders = ", ".join(["%s"] * len(habit_ids))
+
+    # Runs never overlap, so the latest run has both the greatest start and
+    # the greatest end date.
+    sql = f"""
+        SELECT habit_id,
+               MAX(run_length),
+               MAX(CASE WHEN run_start <= %s AND run_end >= %s THEN run_start END),
+               MAX(run_start),
+               MAX(run_end)
+        FROM (
+            SELECT habit_id,
+                   MIN(day) AS run_start,
+                   MAX(day) AS run_end,
+                   COUNT(*) AS run_length
+            FROM (
+                SELECT {qn("habit_id")} AS habit_id,
+                       {qn("date")} AS day,
+                       {island_key} AS island
+                FROM {qn(HabitLog._meta.db_table)}
+                WHERE {qn("completed")} = %s
+                  AND {qn("habit_id")} IN ({placeholders})
+            ) numbered
+            GROUP BY habit_id, island
+        ) runs
+        GROUP BY habit_id
+    """
+    today_value = connection.ops.adapt_datefield_value(today)
+    params = [today_value, today_value, True, *habit_ids]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    return {
+        habit_id: Runs(
+            longest=longest,
+            current_start=_to_date(current_start),
+            latest_start=_to_date(latest_start),
+            latest_end=_to_date(latest_end),
+        )
+        for habit_id, longest, current_start, latest_start, latest_end in rows
+    }
+
+
+def _scan_runs(habit_ids, today):
+    """Portable fallback: one ordered query, runs collapsed while streaming."""
+    rows = (
+        HabitLog.objects.filter(habit_id__in=habit_ids, completed=True)
+        .order_by("habit_id", "date")
+        .values_list("habit_id", "date")
+        .iterator()
+    )
+
+    runs = {}
+    previous_habit = previous_date = None
+    for habit_id, day in rows:
+        summary = runs.get(habit_id, NO_RUNS)
+        if habit_id == previous_habit and (day - previous_date).days == 1:
+            run_start = summary.latest_start
+        else:
+            run_start = day
+        runs[habit_id] = Runs(
+            longest=max(summary.longest, (day - run_start).days + 1),
+            current_start=run_start if day == today else summary.current_start,
+            latest_start=run_start,
+            latest_end=day,
+        )
+        previous_habit, previous_date = habit_id, day
+
+    return runs
+
+
+def _to_date(value):
+    """Convert a raw date column value (ISO text on SQLite) to a date."""
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    return value
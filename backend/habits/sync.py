@@ -0,0 +1,165 @@
+"""
+Delta sync feed for habits app.
+Returns the habits and logs a user created, updated or deleted since a
+cursor, so offline clients fetch a handful of rows instead of everything.
+
+Every write takes the next number of the owner's ChangeCounter inside its
+transaction and stores it in change_seq. The counter row stays locked until
+the write commits, so once a sync reads the counter at N, every write
+numbered up to N has committed and none can appear below N later, however
+long its transaction ran. The cursor holds the last number a client has
+applied, plus the time it was issued so that cursors older than tombstone
+retention can be refused.
+
+Logs come in pages of HABIT_SYNC_PAGE_SIZE ordered by (change_seq, id). A
+page that stops short of the counter returns "more" with a cursor that
+continues after its last log; clients repeat the request until "more" is
+false. Habits and deletions are few and come whole with every page, so rows
+may repeat across pages and syncs; clients apply changes by id. Deleted
+rows are reported from Tombstone.
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from habits.models import ChangeCounter, Habit, HabitLog, Tombstone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+HABIT_FIELDS = [
+    "id",
+    "name",
+    "description",
+    "category",
+    "frequency",
+    "goal_count",
+    "start_date",
+    "is_active",
+    "created_at",
+    "updated_at",
+]
+LOG_FIELDS = [
+    "id",
+    "habit_id",
+    "date",
+    "completed",
+    "notes",
+    "created_at",
+    "updated_at",
+]
+
+
+class CursorError(ValueError):
+    """The sync cursor is malformed."""
+
+
+class CursorExpired(CursorError):
+    """The sync cursor is older than tombstone retention."""
+
+
+class Cursor(NamedTuple):
+    """
+    Sync position: every change up to ``seq`` has been applied, and with
+    ``log_id`` also the logs numbered ``seq`` up to that id.
+    """
+
+    issued: datetime
+    seq: int
+    log_id: Optional[int] = None
+
+
+def encode_cursor(seq: int, log_id: int = None, issued: datetime = None) -> str:
+    """Return the opaque cursor for a position, issued now by default."""
+    issued = (issued or timezone.now()) - EPOCH
+    parts = [issued // timedelta(microseconds=1), seq]
+    if log_id is not None:
+        parts.append(log_id)
+    return "-".join(str(part) for part in parts)
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Return the position encoded in ``cursor``."""
+    try:
+        parts = [int(part) for part in cursor.split("-")]
+    except (AttributeError, ValueError):
+        raise CursorError("Invalid sync cursor.")
+    if len(parts) == 1:
+        # Cursors from before change sequences held only a timestamp.
+        raise CursorExpired("Sync cursor expired; resync without a cursor.")
+    if len(parts) > 3:
+        raise CursorError("Invalid sync cursor.")
+    try:
+        issued = EPOCH + timedelta(microseconds=parts[0])
+    except OverflowError:
+        raise CursorError("Invalid sync cursor.")
+    return Cursor(issued, *parts[1:])
+
+
+def get_changes(user, since=None) -> dict:
+    """
+    Return rows changed since the ``since`` cursor, or everything without one,
+    with logs limited to one page.
+
+    Raises CursorExpired when the cursor predates tombstone retention, as
+    deletions before then are no longer known; clients resync from scratch.
+    """
+    latest = ChangeCounter.objects.current(user.pk)
+    habits = Habit.objects.filter(user=user, change_seq__lte=latest)
+    logs = HabitLog.objects.filter(user=user, change_seq__lte=latest)
+    tombstones = Tombstone.objects.filter(user=user, change_seq__lte=latest)
+
+    if since is not None:
+        position = decode_cursor(since)
+        retention = timedelta(days=settings.HABIT_SYNC_TOMBSTONE_DAYS)
+        if position.issued < timezone.now() - retention or position.seq > latest:
+            raise CursorExpired("Sync cursor expired; resync without a cursor.")
+        if position.seq == latest and position.log_id is None:
+            return _page(latest, [], [], {"habits": [], "logs": []})
+        habits = habits.filter(change_seq__gt=position.seq)
+        tombstones = tombstones.filter(change_seq__gt=position.seq)
+        after = Q(change_seq__gt=position.seq)
+        if position.log_id is not None:
+            after |= Q(change_seq=position.seq, id__gt=position.log_id)
+        logs = logs.filter(after)
+    else:
+        # A full sync has nothing to delete on the client.
+        tombstones = tombstones.none()
+
+    deleted = {"habits": [], "logs": []}
+    for kind, object_id in tombstones.order_by("change_seq").values_list(
+        "kind", "object_id"
+    ):
+        key = "habits" if kind == Tombstone.HABIT else "logs"
+        deleted[key].append(object_id)
+
+    page_size = settings.HABIT_SYNC_PAGE_SIZE
+    log_rows = list(
+        logs.order_by("change_seq", "id").values("change_seq", *LOG_FIELDS)[
+            : page_size + 1
+        ]
+    )
+    habit_rows = list(habits.order_by("change_seq", "id").values(*HABIT_FIELDS))
+    if len(log_rows) > page_size:
+        del log_rows[page_size:]
+        last = log_rows[-1]
+        cursor = encode_cursor(last["change_seq"], last["id"])
+    else:
+        cursor = None
+    for row in log_rows:
+        del row["change_seq"]
+    return _page(latest, habit_rows, log_rows, deleted, cursor)
+
+
+def _page(latest, habits, logs, deleted, cursor=None) -> dict:
+    """Assemble a sync response; ``cursor`` continues an unfinished sync."""
+    return {
+        "cursor": cursor or encode_cursor(latest),
+        "more": cursor is not None,
+        "habits": habits,
+        "logs": logs,
+        "deleted": deleted,
+    }
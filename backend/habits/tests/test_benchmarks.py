@@ -0,0 +1,111 @@
+"""
+Unit tests for the endpoint benchmark suite, and the suite itself
+(run with -m benchmark; set BENCHMARK_OUTPUT to keep the JSON results).
+"""
+
+import json
+import os
+import pytest
+from django.contrib.auth import get_user_model
+from habits.benchmarks import (
+    DatasetSize,
+    check_growth,
+    compare_runs,
+    format_table,
+    percentiles,
+    run_benchmarks,
+    seed_dataset,
+)
+from habits.models import HabitLog, HabitStats, UserDailyRollup
+
+User = get_user_model()
+
+
+def result(days, p50, queries=3):
+    """Return a one-endpoint benchmark result."""
+    return {
+        "size": f"1x1x{days}",
+        "days": days,
+        "endpoints": {"habit-list": {"p50_ms": p50, "queries": queries}},
+    }
+
+
+class TestBenchmarkHelpers:
+    """Test size parsing, percentiles and regression checks."""
+
+    def test_parse_size(self):
+        """Test USERSxHABITSxDAYS parsing."""
+        assert DatasetSize.parse("10x5x365") == DatasetSize(10, 5, 365)
+        assert str(DatasetSize(10, 5, 365)) == "10x5x365"
+        for value in ("10x5", "0x5x365", "ax5x365"):
+            with pytest.raises(ValueError):
+                DatasetSize.parse(value)
+
+    def test_percentiles(self):
+        """Test nearest-rank percentiles in milliseconds."""
+        timings = percentiles([i / 1000 for i in range(1, 101)])
+
+        assert (timings["p50_ms"], timings["p90_ms"], timings["p99_ms"]) == (
+            50.0,
+            90.0,
+            99.0,
+        )
+        assert timings["max_ms"] == 100.0
+
+    def test_check_growth_flags_linear_latency_and_queries(self):
+        """Test that latency tracking days, or extra queries, are flagged."""
+        flat = [result(30, 5.0), result(900, 6.0)]
+        linear = [result(30, 5.0), result(900, 150.0)]
+        more_queries = [result(30, 5.0), result(900, 5.0, queries=30)]
+
+        assert check_growth(flat) == []
+        assert "~days^1.00" in check_growth(linear)[0]
+        assert check_growth(more_queries) == [
+            "habit-list: 3 -> 30 queries from 30 to 900 days"
+        ]
+
+    def test_compare_runs(self):
+        """Test that only clearly slower medians count as regressions."""
+        previous = {"results": [result(30, 10.0)]}
+
+        assert compare_runs(previous, {"results": [result(30, 11.0)]}) == []
+        assert compare_runs(previous, {"results": [result(30, 20.0)]}) == [
+            "habit-list at 1x1x30: p50 10.0 ms -> 20.0 ms"
+        ]
+
+
+@pytest.mark.django_db
+class TestSeedDataset:
+    """Test the synthetic dataset."""
+
+    def test_seed_builds_logs_and_derived_state(self):
+        """Test that seeding creates every log and its summaries."""
+        users = seed_dataset(DatasetSize(2, 3, 10))
+
+        assert HabitLog.objects.count() == 60
+        assert HabitStats.objects.count() == 6
+        assert UserDailyRollup.objects.filter(user=users[0]).count() == 10
+        streak_habit = users[0].habits.order_by("pk").first()
+        assert streak_habit.get_longest_streak() == 10
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+class TestEndpointBenchmark:
+    """Benchmark endpoint latency across dataset sizes (run with -m benchmark)."""
+
+    SIZES = ["1x5x30", "1x5x365", "1x5x1095"]
+
+    def test_endpoints_do_not_grow_with_history(self, settings, tmp_path):
+        """Test that no endpoint slows down or adds queries as history grows."""
+        settings.SQL_INSTRUMENTATION_SAMPLE_RATE = 0
+
+        run = run_benchmarks(self.SIZES, repeats=10)
+
+        output = os.environ.get("BENCHMARK_OUTPUT") or tmp_path / "benchmark.json"
+        with open(output, "w") as handle:
+            json.dump(run, handle, indent=2)
+        print()
+        for size_result in run["results"]:
+            print(format_table(size_result))
+        assert run["warnings"] == []
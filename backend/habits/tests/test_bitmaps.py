@@ -0,0 +1,304 @@
+"""
+Unit tests for bit-packed completion history.
+"""
+
+import base64
+import json
+import pytest
+from datetime import date, timedelta
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from habits.bitmaps import (
+    CompletionBitmap,
+    check_bitmaps,
+    encode_window,
+    rebuild_bitmaps,
+)
+from habits.models import Habit, HabitLog, HabitCategory, HabitFrequency
+
+User = get_user_model()
+
+DAY = date(2026, 3, 10)
+
+
+def days(*offsets):
+    """Return dates at the given day offsets from DAY."""
+    return [DAY + timedelta(days=offset) for offset in offsets]
+
+
+class TestCompletionBitmap:
+    """Test bit operations on CompletionBitmap."""
+
+    def test_empty_bitmap(self):
+        """Test an empty history."""
+        bitmap = CompletionBitmap()
+
+        assert bitmap.count() == 0
+        assert bitmap.current_streak(DAY) == 0
+        assert bitmap.longest_streak() == 0
+        assert bitmap.to_fields() == (None, b"")
+
+    def test_streaks_and_count(self):
+        """Test popcount, current and longest runs."""
+        bitmap = CompletionBitmap.from_dates(days(0, 1, 2, 3, 5, 8, 9, 10))
+
+        assert bitmap.count() == 8
+        assert bitmap.longest_streak() == 4
+        assert bitmap.current_streak(DAY + timedelta(days=10)) == 3
+        assert bitmap.current_streak(DAY + timedelta(days=9)) == 2
+        assert bitmap.current_streak(DAY + timedelta(days=11)) == 0
+        assert bitmap.current_streak(DAY - timedelta(days=1)) == 0
+        assert list(bitmap.runs()) == [
+            (DAY, 4),
+            (DAY + timedelta(days=5), 1),
+            (DAY + timedelta(days=8), 3),
+        ]
+
+    def test_setting_earlier_day_moves_origin(self):
+        """Test that an earlier completion shifts the origin back."""
+        bitmap = CompletionBitmap.from_dates(days(5, 6))
+        bitmap.set(DAY)
+
+        assert bitmap.origin == DAY
+        assert list(bitmap.runs()) == [(DAY, 1), (DAY + timedelta(days=5), 2)]
+
+    def test_clearing_keeps_canonical_form(self):
+        """Test that clearing bits normalizes the origin."""
+        bitmap = CompletionBitmap.from_dates(days(0, 1, 4))
+        bitmap.set(DAY, completed=False)
+        bitmap.set(DAY + timedelta(days=1), completed=False)
+
+        assert bitmap == CompletionBitmap.from_dates(days(4))
+        bitmap.set(DAY + timedelta(days=4), completed=False)
+        assert bitmap == CompletionBitmap()
+
+    def test_round_trip_through_bytes(self):
+        """Test that stored bytes decode to the same bitmap."""
+        bitmap = CompletionBitmap.from_dates(days(*range(0, 2000, 3)))
+        origin, bits = bitmap.to_fields()
+        habit = Habit(completion_bits=bits, completion_bits_origin=origin)
+
+        assert CompletionBitmap.from_habit(habit) == bitmap
+        assert len(bits) == 250
+
+    def test_window(self):
+        """Test slicing a range that starts before or after the origin."""
+        bitmap = CompletionBitmap.from_dates(days(0, 1, 5))
+
+        assert bitmap.window(DAY - timedelta(days=2), DAY + timedelta(days=3)) == (
+            0b001100
+        )
+        assert bitmap.window(DAY + timedelta(days=1), DAY + timedelta(days=9)) == (
+            0b10001
+        )
+        assert bitmap.window(DAY + timedelta(days=6), DAY + timedelta(days=9)) == 0
+        assert CompletionBitmap().window(DAY, DAY) == 0
+
+    def test_encode_window(self):
+        """Test the base64 and run-length encodings."""
+        bits = 0b100111000
+
+        assert base64.b64decode(encode_window(bits, 9)) == b"\x38\x01"
+        assert encode_window(bits, 9, "runs") == [3, 3, 2, 1]
+        assert encode_window(bits, 12, "runs") == [3, 3, 2, 1, 3]
+        assert encode_window(0b11, 2, "runs") == [0, 2]
+        assert encode_window(0, 4, "runs") == [4]
+
+
+@pytest.mark.django_db
+class TestCompletionBitmapMaintenance:
+    """Test that HabitLog writes keep the bitmap consistent."""
+
+    def make_habit(self):
+        """Create a daily habit for a fresh user."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        return Habit.objects.create(
+            user=user,
+            name="Exercise",
+            category=HabitCategory.HEALTH,
+            frequency=HabitFrequency.DAILY,
+            goal_count=1,
+            start_date=date.today() - timedelta(days=10),
+        )
+
+    def test_log_writes_update_bitmap(self):
+        """Test create, update (including date changes) and delete."""
+        habit = self.make_habit()
+        today = date.today()
+        logs = [
+            HabitLog.objects.create(
+                habit=habit, date=today - timedelta(days=i), completed=True
+            )
+            for i in range(4)
+        ]
+        assert habit.calculate_current_streak() == 4
+
+        logs[3].date = today - timedelta(days=7)
+        logs[3].save()
+        logs[0].delete()
+        HabitLog.objects.create(habit=habit, date=today - timedelta(days=8))
+
+        habit = Habit.objects.get(pk=habit.pk)
+        assert habit.calculate_current_streak() == 0
+        assert habit.get_longest_streak() == 2
+        assert habit.completion_bitmap.count() == 3
+        assert check_bitmaps([habit.pk]) == []
+
+    def test_bitmap_writes_leave_updated_at(self):
+        """Test that logging does not bump the habit's own timestamp."""
+        habit = self.make_habit()
+        updated_at = habit.updated_at
+
+        HabitLog.objects.create(habit=habit, date=date.today(), completed=True)
+
+        assert Habit.objects.get(pk=habit.pk).updated_at == updated_at
+
+    def test_saving_stale_habit_keeps_bitmap(self):
+        """Test that saving a habit loaded before a log leaves its bitmap."""
+        habit = self.make_habit()
+        stale = Habit.objects.get(pk=habit.pk)
+        HabitLog.objects.create(habit=habit, date=date.today(), completed=True)
+
+        stale.name = "Run"
+        stale.save()
+        stale.save(update_fields=["name", "completion_bits"])
+
+        habit = Habit.objects.get(pk=habit.pk)
+        assert habit.name == "Run"
+        assert habit.calculate_current_streak() == 1
+        assert check_bitmaps([habit.pk]) == []
+
+    def test_stats_read_without_queries(self, django_assert_num_queries):
+        """Test that streaks and completion rate need no HabitLog scan."""
+        habit = self.make_habit()
+        for i in range(11):
+            HabitLog.objects.create(
+                habit=habit, date=date.today() - timedelta(days=i), completed=True
+            )
+        habit = Habit.objects.get(pk=habit.pk)
+
+        with django_assert_num_queries(0):
+            assert habit.calculate_current_streak() == 11
+            assert habit.get_longest_streak() == 11
+            assert habit.get_completion_rate() == 100.0
+
+
+@pytest.mark.django_db
+class TestHabitMatrixView:
+    """Test GET /api/habits/matrix/."""
+
+    def setup_method(self):
+        """Create a user with two habits and a client."""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com"
+        )
+        self.habits = [
+            Habit.objects.create(
+                user=self.user,
+                name=name,
+                frequency=HabitFrequency.DAILY,
+                start_date=date(2024, 1, 1),
+            )
+            for name in ("Exercise", "Read")
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("habits:habit-matrix")
+
+    def decode(self, entry, start, length):
+        """Return the completed dates in a "bits" matrix entry."""
+        bits = int.from_bytes(base64.b64decode(entry["bits"]), "little")
+        return [start + timedelta(days=i) for i in range(length) if bits >> i & 1]
+
+    def test_matrix_matches_logs(self, django_assert_num_queries):
+        """Test that each vector decodes to the completed logs in range."""
+        completed = [date(2024, 1, 1) + timedelta(days=i) for i in range(0, 60, 7)]
+        HabitLog.objects.bulk_create(
+            HabitLog(habit=self.habits[0], date=day, completed=True)
+            for day in completed
+        )
+        HabitLog.objects.create(
+            habit=self.habits[0], date=date(2024, 1, 2), completed=False
+        )
+        rebuild_bitmaps([self.habits[0].pk])
+        params = {"from": "2024-01-08", "to": "2024-02-29"}
+
+        with django_assert_num_queries(1):
+            response = self.client.get(self.url, params)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["days"] == 53
+        exercise, read = response.data["habits"]
+        assert exercise["completed"] == 8
+        assert self.decode(exercise, date(2024, 1, 8), 53) == completed[1:]
+        assert self.decode(read, date(2024, 1, 8), 53) == []
+
+    def test_runs_encoding_and_habit_filter(self):
+        """Test ?encoding=runs and ?habits= selecting one habit."""
+        for i in (1, 2, 3, 6):
+            HabitLog.objects.create(
+                habit=self.habits[1],
+                date=date(2024, 1, 1) + timedelta(days=i),
+                completed=True,
+            )
+
+        response = self.client.get(
+            self.url,
+            {
+                "from": "2024-01-01",
+                "to": "2024-01-10",
+                "habits": str(self.habits[1].pk),
+                "encoding": "runs",
+            },
+        )
+
+        assert [entry["name"] for entry in response.data["habits"]] == ["Read"]
+        assert response.data["habits"][0]["runs"] == [1, 3, 2, 1, 3]
+
+    def test_year_of_thirty_habits_is_compact(self):
+        """Test that 30 habits over a year fit in a few KB."""
+        habits = Habit.objects.bulk_create(
+            Habit(user=self.user, name=f"Habit {i}", start_date=date(2024, 1, 1))
+            for i in range(28)
+        )
+        for habit in self.habits + habits:
+            bitmap = CompletionBitmap.from_dates(
+                date(2024, 1, 1) + timedelta(days=i) for i in range(0, 366, 2)
+            )
+            habit.completion_bits_origin, habit.completion_bits = bitmap.to_fields()
+        Habit.objects.bulk_update(
+            self.habits + habits, ["completion_bits", "completion_bits_origin"]
+        )
+
+        response = self.client.get(self.url, {"from": "2024-01-01", "to": "2024-12-31"})
+
+        assert len(response.data["habits"]) == 30
+        assert all(entry["completed"] == 183 for entry in response.data["habits"])
+        assert len(json.dumps(response.json())) < 5000
+
+    def test_matrix_is_scoped_to_user(self):
+        """Test that another user's habit ids are ignored."""
+        other_user = User.objects.create_user(
+            username="otheruser", email="other@example.com"
+        )
+        other = Habit.objects.create(
+            user=other_user, name="Other", start_date=date(2024, 1, 1)
+        )
+
+        response = self.client.get(self.url, {"habits": str(other.pk)})
+
+        assert response.data["habits"] == []
+
+    def test_bad_parameters(self):
+        """Test that malformed or oversized ranges return 400."""
+        for params in (
+            {"from": "yesterday"},
+            {"from": "2024-02-01", "to": "2024-01-01"},
+            {"from": "2000-01-01", "to": "2024-01-01"},
+            {"habits": "1,two"},
+            {"encoding": "png"},
+        ):
+            response = self.client.get(self.url, params)
+            assert response.status_code == status.HTTP_400_BAD_REQUEST, params
@@ -0,0 +1,145 @@
+"""
+Unit tests for the versioned habit stats cache.
+"""
+
+import pytest
+from datetime import date, timedelta
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from habits import cache as stats_cache
+from habits.models import Habit, HabitLog, HabitCategory, HabitFrequency
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestHabitStatsCache:
+    """Test cached GET /api/habits/{id}/stats/ responses."""
+
+    def setup_method(self):
+        """Create a user with one daily habit and an authenticated client."""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com"
+        )
+        self.habit = Habit.objects.create(
+            user=self.user,
+            name="Exercise",
+            category=HabitCategory.HEALTH,
+            frequency=HabitFrequency.DAILY,
+            goal_count=1,
+            start_date=date.today() - timedelta(days=5),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("habits:habit-stats", args=[self.habit.id])
+
+    def test_second_request_is_a_hit_without_queries(self, django_assert_num_queries):
+        """Test that a repeated request is served from the cache."""
+        first = self.client.get(self.url)
+
+        with django_assert_num_queries(0):
+            second = self.client.get(self.url)
+
+        assert first["X-Cache"] == "MISS"
+        assert second["X-Cache"] == "HIT"
+        assert second.data == first.data
+        assert stats_cache.get_counters() == {
+            "hits": 1,
+            "misses": 1,
+            "hit_rate": 0.5,
+        }
+
+    def test_logging_invalidates_cached_stats(self, django_capture_on_commit_callbacks):
+        """Test that a HabitLog write bumps the habit's version."""
+        assert self.client.get(self.url).data["current_streak"] == 0
+
+        with django_capture_on_commit_callbacks(execute=True):
+            HabitLog.objects.create(habit=self.habit, date=date.today(), completed=True)
+        response = self.client.get(self.url)
+
+        assert response["X-Cache"] == "MISS"
+        assert response.data["current_streak"] == 1
+
+    def test_deleting_log_invalidates_cached_stats(
+        self, django_capture_on_commit_callbacks
+    ):
+        """Test that deleting a log bumps the habit's version."""
+        log = HabitLog.objects.create(
+            habit=self.habit, date=date.today(), completed=True
+        )
+        assert self.client.get(self.url).data["completed_logs"] == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            log.delete()
+
+        assert self.client.get(self.url).data["completed_logs"] == 0
+
+    def test_habit_update_invalidates_cached_stats(
+        self, django_capture_on_commit_callbacks
+    ):
+        """Test that changing the goal refreshes period progress."""
+        self.client.get(self.url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            self.habit.frequency = HabitFrequency.WEEKLY
+            self.habit.goal_count = 3
+            self.habit.save()
+        response = self.client.get(self.url)
+
+        assert response["X-Cache"] == "MISS"
+        assert response.data["period_progress"]["goal"] == 3
+
+    def test_cached_stats_not_served_to_other_users(self):
+        """Test that another user's request misses and gets a 404."""
+        self.client.get(self.url)
+        other = User.objects.create_user(username="other", email="other@example.com")
+        client = APIClient()
+        client.force_authenticate(user=other)
+
+        response = client.get(self.url)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_cache_counters_command(self):
+        """Test reporting and resetting the counters."""
+        self.client.get(self.url)
+        self.client.get(self.url)
+        stdout = StringIO()
+
+        call_command("habit_stats_cache", "--reset", stdout=stdout)
+
+        assert "hits=1 misses=1 hit_rate=50.00%" in stdout.getvalue()
+        assert stats_cache.get_counters()["hits"] == 0
+
+    def test_file_cache_versions_without_incr(self, settings, tmp_path, monkeypatch):
+        """Test versioning and counting on a backend without atomic incr()."""
+        settings.CACHES = {
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": str(tmp_path),
+            }
+        }
+        cache = stats_cache.get_cache()
+
+        def incr(*args, **kwargs):
+            raise AssertionError("non-atomic incr()")
+
+        monkeypatch.setattr(cache, "incr", incr)
+        version = stats_cache.get_version(self.habit.pk)
+        assert self.client.get(self.url)["X-Cache"] == "MISS"
+        assert self.client.get(self.url)["X-Cache"] == "HIT"
+
+        stats_cache.bump_version(self.habit.pk)
+        stats_cache.bump_version(self.habit.pk)
+
+        assert stats_cache.get_version(self.habit.pk) not in (version, None)
+        assert self.client.get(self.url)["X-Cache"] == "MISS"
+        assert not stats_cache.counting()
+        assert stats_cache.get_counters()["hits"] == 0
+        stdout = StringIO()
+        call_command("habit_stats_cache", stdout=stdout)
+        assert "atomic increments" in stdout.getvalue()
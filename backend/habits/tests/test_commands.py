@@ -0,0 +1,92 @@
+"""
+Unit tests for habits management commands.
+"""
+
+import pytest
+from datetime import date
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from habits.models import Habit, HabitLog, HabitStats, HabitFrequency
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestRebuildHabitStatsCommand:
+    """Test the rebuild_habit_stats command."""
+
+    def make_stale_habit(self):
+        """Create a habit whose stats were bypassed by a queryset update."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        habit = Habit.objects.create(
+            user=user,
+            name="Exercise",
+            frequency=HabitFrequency.DAILY,
+            start_date=date.today(),
+        )
+        HabitLog.objects.create(habit=habit, date=date.today(), completed=True)
+        HabitLog.objects.filter(habit=habit).update(completed=False)
+        return habit
+
+    def test_verify_only_reports_stale_stats(self):
+        """Test that verification fails without touching stale rows."""
+        habit = self.make_stale_habit()
+        stderr = StringIO()
+
+        with pytest.raises(CommandError):
+            call_command("rebuild_habit_stats", "--verify-only", stderr=stderr)
+
+        assert "completed_logs is 1, expected 0" in stderr.getvalue()
+        assert HabitStats.objects.get(pk=habit.pk).completed_logs == 1
+
+    def test_rebuild_fixes_stale_stats(self):
+        """Test that a rebuild brings every row back in line."""
+        habit = self.make_stale_habit()
+        stdout = StringIO()
+
+        call_command("rebuild_habit_stats", "--batch-size", "1", stdout=stdout)
+
+        assert "Rebuilt and verified stats for 1 habit(s)" in stdout.getvalue()
+        assert HabitStats.objects.get(pk=habit.pk).completed_logs == 0
+        assert HabitStats.objects.verify([habit.pk]) == []
+
+
+@pytest.mark.django_db
+class TestCheckCompletionBitmapsCommand:
+    """Test the check_completion_bitmaps command."""
+
+    def make_stale_habit(self):
+        """Create a habit whose bitmap was bypassed by a bulk insert."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        habit = Habit.objects.create(
+            user=user,
+            name="Exercise",
+            frequency=HabitFrequency.DAILY,
+            start_date=date.today(),
+        )
+        HabitLog.objects.bulk_create(
+            [HabitLog(habit=habit, date=date.today(), completed=True)]
+        )
+        return habit
+
+    def test_reports_stale_bitmaps(self):
+        """Test that mismatches fail the check."""
+        habit = self.make_stale_habit()
+        stderr = StringIO()
+
+        with pytest.raises(CommandError):
+            call_command("check_completion_bitmaps", stderr=stderr)
+
+        assert f"Habit {habit.pk}: bitmap does not match its logs" in stderr.getvalue()
+
+    def test_repair_rebuilds_bitmaps(self):
+        """Test that --repair fixes the bitmap from the logs."""
+        habit = self.make_stale_habit()
+        stdout = StringIO()
+
+        call_command("check_completion_bitmaps", "--repair", stdout=stdout)
+
+        assert "Checked 1 habit bitmap(s), repaired 1" in stdout.getvalue()
+        assert Habit.objects.get(pk=habit.pk).calculate_current_streak() == 1
@@ -0,0 +1,173 @@
+"""
+Unit tests for conditional GET (ETag / If-None-Match) on habit endpoints.
+"""
+
+import pytest
+from datetime import date, timedelta
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from rest_framework import status
+from habits.models import Habit, HabitLog, HabitCategory, HabitFrequency
+from habits.views import HabitLogViewSet
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestHabitConditionalGet:
+    """Test ETag validation of habit list, detail and stats responses."""
+
+    def setup_method(self):
+        """Create a user with one daily habit and an authenticated client."""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com"
+        )
+        self.habit = Habit.objects.create(
+            user=self.user,
+            name="Exercise",
+            category=HabitCategory.HEALTH,
+            frequency=HabitFrequency.DAILY,
+            goal_count=1,
+            start_date=date.today() - timedelta(days=5),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.list_url = reverse("habits:habit-list")
+        self.detail_url = reverse("habits:habit-detail", args=[self.habit.id])
+        self.stats_url = reverse("habits:habit-stats", args=[self.habit.id])
+
+    def test_list_matching_etag_is_not_modified(self, django_assert_num_queries):
+        """Test that a matching If-None-Match costs one aggregate query."""
+        etag = self.client.get(self.list_url)["ETag"]
+
+        with django_assert_num_queries(1):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+        assert "Authorization" in response["Vary"]
+        assert not response.content
+
+    def test_detail_matching_etag_is_not_modified(self):
+        """Test that the detail view honours If-None-Match."""
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_stats_matching_etag_needs_no_queries(self, django_assert_num_queries):
+        """Test that stats revalidation only reads the cache version."""
+        etag = self.client.get(self.stats_url)["ETag"]
+
+        with django_assert_num_queries(0):
+            response = self.client.get(self.stats_url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_logging_changes_etags(self, django_capture_on_commit_callbacks):
+        """Test that a new log invalidates list, detail and stats ETags."""
+        urls = [self.list_url, self.detail_url, self.stats_url]
+        etags = [self.client.get(url)["ETag"] for url in urls]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            HabitLog.objects.create(habit=self.habit, date=date.today(), completed=True)
+
+        for url, etag in zip(urls, etags):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == status.HTTP_200_OK
+            assert response["ETag"] != etag
+
+    def test_deleting_log_changes_etag(self):
+        """Test that a delete changes the ETag although no timestamp grows."""
+        HabitLog.objects.create(
+            habit=self.habit, date=date.today() - timedelta(days=1), completed=True
+        )
+        log = HabitLog.objects.create(
+            habit=self.habit, date=date.today(), completed=True
+        )
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        log.delete()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_etag_differs_per_user(self):
+        """Test that another user gets a different list ETag."""
+        other_user = User.objects.create_user(
+            username="otheruser", email="other@example.com"
+        )
+        other_client = APIClient()
+        other_client.force_authenticate(user=other_user)
+        etag = self.client.get(self.list_url)["ETag"]
+
+        response = other_client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != etag
+
+    def test_other_users_habit_is_still_not_found(self):
+        """Test that If-None-Match never bypasses ownership checks."""
+        other_user = User.objects.create_user(
+            username="otheruser", email="other@example.com"
+        )
+        other_client = APIClient()
+        other_client.force_authenticate(user=other_user)
+
+        for url in [self.detail_url, self.stats_url]:
+            response = other_client.get(url, HTTP_IF_NONE_MATCH="*")
+            assert response.status_code == status.HTTP_404_NOT_FOUND
+            assert "ETag" not in response
+
+
+@pytest.mark.django_db
+class TestHabitLogConditionalGet:
+    """Test ETag validation of habit log list and detail responses."""
+
+    def setup_method(self):
+        """Create a user with one logged habit."""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com"
+        )
+        self.habit = Habit.objects.create(
+            user=self.user,
+            name="Exercise",
+            category=HabitCategory.HEALTH,
+            frequency=HabitFrequency.DAILY,
+            goal_count=1,
+            start_date=date.today() - timedelta(days=5),
+        )
+        self.log = HabitLog.objects.create(
+            habit=self.habit, date=date.today(), completed=True
+        )
+        self.factory = APIRequestFactory()
+
+    def get(self, actions, **kwargs):
+        """Call HabitLogViewSet directly with the given headers."""
+        headers = kwargs.pop("headers", {})
+        request = self.factory.get("/", **headers)
+        force_authenticate(request, user=self.user)
+        return HabitLogViewSet.as_view(actions)(request, **kwargs)
+
+    def test_list_matching_etag_is_not_modified(self):
+        """Test that the log list honours If-None-Match."""
+        etag = self.get({"get": "list"})["ETag"]
+
+        response = self.get({"get": "list"}, headers={"HTTP_IF_NONE_MATCH": etag})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_updating_log_changes_detail_etag(self):
+        """Test that editing a log invalidates its ETag."""
+        etag = self.get({"get": "retrieve"}, pk=self.log.pk)["ETag"]
+
+        self.log.notes = "Felt great"
+        self.log.save()
+        response = self.get(
+            {"get": "retrieve"}, pk=self.log.pk, headers={"HTTP_IF_NONE_MATCH": etag}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != etag
@@ -0,0 +1,178 @@
+"""
+Unit tests for the streaming habit export.
+"""
+
+import csv
+import gzip
+import json
+import tracemalloc
+import pytest
+from datetime import date, timedelta
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from habits.exporters import encode, export_lines
+from habits.importers import import_logs
+from habits.models import Habit, HabitLog, HabitFrequency
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestHabitExport:
+    """Test GET /api/habits/export/."""
+
+    def setup_method(self):
+        """Create a user with two habits and a week of logs."""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com"
+        )
+        self.habits = [
+            Habit.objects.create(
+                user=self.user,
+                name=name,
+                frequency=HabitFrequency.DAILY,
+                start_date=date(2024, 1, 1),
+            )
+            for name in ("Exercise", "Read")
+        ]
+        HabitLog.objects.bulk_create(
+            HabitLog(
+                habit=habit,
+                date=date(2024, 1, 1) + timedelta(days=i),
+                completed=i % 2 == 0,
+                notes="Tired, but done" if i == 0 else "",
+            )
+            for habit in self.habits
+            for i in range(7)
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("habits:habit-export")
+
+    def read(self, response):
+        """Join a streaming response body."""
+        assert response.streaming
+        return b"".join(response.streaming_content)
+
+    def test_ndjson_export_lists_habits_then_logs(self):
+        """Test that the default export is NDJSON with habit and log lines."""
+        response = self.client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "application/x-ndjson"
+        assert "attachment" in response["Content-Disposition"]
+        records = [json.loads(line) for line in self.read(response).splitlines()]
+        assert [r["name"] for r in records if r["type"] == "habit"] == [
+            "Exercise",
+            "Read",
+        ]
+        logs = [r for r in records if r["type"] == "log"]
+        assert len(logs) == 14
+        assert logs[0] == {
+            "type": "log",
+            "habit": "Exercise",
+            "date": "2024-01-01",
+            "completed": True,
+            "notes": "Tired, but done",
+        }
+
+    def test_csv_export_via_format_parameter(self):
+        """Test that ?format=csv streams one CSV row per log."""
+        response = self.client.get(self.url, {"format": "csv"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "text/csv"
+        rows = list(csv.DictReader(StringIO(self.read(response).decode())))
+        assert len(rows) == 14
+        assert rows[0] == {
+            "habit": "Exercise",
+            "date": "2024-01-01",
+            "completed": "True",
+            "notes": "Tired, but done",
+        }
+
+    def test_gzip_when_accepted(self):
+        """Test that the body is gzip-compressed for gzip-capable clients."""
+        plain = self.read(self.client.get(self.url))
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+        assert response["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response["Vary"]
+        assert gzip.decompress(self.read(response)) == plain
+
+    def test_unknown_format_is_rejected(self):
+        """Test that an unsupported format returns 400, not a renderer 404."""
+        response = self.client.get(self.url, {"format": "xml"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_export_only_contains_own_data(self):
+        """Test that another user's export is empty."""
+        other_user = User.objects.create_user(
+            username="otheruser", email="other@example.com"
+        )
+        client = APIClient()
+        client.force_authenticate(user=other_user)
+
+        response = client.get(self.url)
+
+        assert self.read(response) == b""
+
+    def test_export_round_trips_through_importer(self):
+        """Test that an NDJSON export imports into another account."""
+        other_user = User.objects.create_user(
+            username="otheruser", email="other@example.com"
+        )
+        body = self.read(self.client.get(self.url)).decode()
+
+        result = import_logs(other_user, StringIO(body), fmt="ndjson")
+
+        assert (result.logs, result.skipped, result.habits_created) == (14, 0, 2)
+        assert sorted(
+            HabitLog.objects.filter(user=other_user).values_list(
+                "habit__name", "date", "completed", "notes"
+            )
+        ) == sorted(
+            HabitLog.objects.filter(user=self.user).values_list(
+                "habit__name", "date", "completed", "notes"
+            )
+        )
+
+
+@pytest.mark.django_db
+class TestExportMemory:
+    """Test that export memory does not grow with the number of logs."""
+
+    def peak_memory(self, days):
+        """Export a habit with ``days`` logs and return peak traced bytes."""
+        user = User.objects.create_user(
+            username=f"user{days}", email=f"user{days}@example.com"
+        )
+        habit = Habit.objects.create(
+            user=user,
+            name="Exercise",
+            frequency=HabitFrequency.DAILY,
+            start_date=date(2000, 1, 1),
+        )
+        HabitLog.objects.bulk_create(
+            HabitLog(habit=habit, date=date(2000, 1, 1) + timedelta(days=i))
+            for i in range(days)
+        )
+
+        tracemalloc.start()
+        try:
+            for _ in encode(export_lines(user, "ndjson"), compress=True):
+                pass
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def test_peak_memory_is_flat(self):
+        """Test that 5x the logs (both above one chunk) needs no more memory."""
+        small = self.peak_memory(2_500)
+        large = self.peak_memory(12_500)
+
+        assert large < small * 1.5
@@ -0,0 +1,328 @@
+"""
+Unit tests for streaming habit log imports.
+"""
+
+import pytest
+from datetime import date, timedelta
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DatabaseError
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from habits import importers
+from habits.bitmaps import check_bitmaps
+from habits.importers import ImportInterrupted, import_logs
+from habits.models import (
+    Habit,
+    HabitLog,
+    HabitStats,
+    HabitFrequency,
+    UserDailyRollup,
+)
+
+User = get_user_model()
+
+
+def daily_csv(habit, days, start=date(2024, 1, 1)):
+    """Return CSV text with one completed log per day."""
+    lines = ["habit,date,completed,notes"]
+    for i in range(days):
+        lines.append(f"{habit},{start + timedelta(days=i)},true,")
+    return "\n".join(lines) + "\n"
+
+
+@pytest.mark.django_db
+class TestImportLogs:
+    """Test import_logs() across formats."""
+
+    def setup_method(self):
+        """Create a user with one existing habit."""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com"
+        )
+        self.habit = Habit.objects.create(
+            user=self.user,
+            name="Exercise",
+            frequency=HabitFrequency.DAILY,
+            start_date=date(2024, 1, 1),
+        )
+
+    def test_csv_import_writes_in_batches_and_refreshes_stats(
+        self, django_assert_max_num_queries
+    ):
+        """Test that a long history costs a query count set by the batch size."""
+        stream = StringIO(daily_csv("Exercise", 500))
+
+        # Each batch commits with its change sequence number, its logs
+        # applied to stats, bitmaps and rollups in place.
+        with django_assert_max_num_queries(90):
+            result = import_logs(self.user, stream, batch_size=100)
+
+        assert (result.rows, result.logs, result.skipped) == (500, 500, 0)
+        assert result.rows_per_second > 0
+        stats = HabitStats.objects.get(pk=self.habit.pk)
+        assert (stats.completed_logs, stats.longest_streak) == (500, 500)
+        assert check_bitmaps([self.habit.pk]) == []
+
+    def test_failed_chunk_keeps_earlier_chunks_and_resumes(self, monkeypatch):
+        """Test that chunks before a failure stay committed and can be skipped."""
+        write = importers._write
+        calls = []
+
+        def failing_write(logs, on_conflict):
+            calls.append(len(logs))
+            if len(calls) == 3:
+                raise DatabaseError("disk full")
+            write(logs, on_conflict)
+
+        monkeypatch.setattr(importers, "_write", failing_write)
+        with pytest.raises(ImportInterrupted) as interrupted:
+            import_logs(self.user, StringIO(daily_csv("Exercise", 500)), batch_size=100)
+
+        assert interrupted.value.rows == 200
+        assert HabitLog.objects.filter(habit=self.habit).count() == 200
+        assert HabitStats.objects.get(pk=self.habit.pk).longest_streak == 200
+        assert check_bitmaps([self.habit.pk]) == []
+
+        monkeypatch.setattr(importers, "_write", write)
+        result = import_logs(
+            self.user,
+            StringIO(daily_csv("Exercise", 500)),
+            batch_size=100,
+            resume_after=interrupted.value.rows,
+        )
+
+        assert (result.rows, result.logs) == (300, 300)
+        assert HabitLog.objects.filter(habit=self.habit).count() == 500
+        assert HabitStats.objects.get(pk=self.habit.pk).longest_streak == 500
+
+    def test_created_habit_start_moves_back_across_chunks(self):
+        """Test that out of order rows leave correct starts and rollups."""
+        stream = StringIO(
+            "habit,date\nRead,2024-01-07\nRead,2024-01-01\nRead,2024-01-03\n"
+        )
+
+        import_logs(self.user, stream, batch_size=1)
+
+        habit = Habit.objects.get(user=self.user, name="Read")
+        assert habit.start_date == date(2024, 1, 1)
+        first, last = UserDailyRollup.objects.history_range([self.user.pk])
+        assert {
+            (rollup.date, rollup.completed, rollup.expected)
+            for rollup in UserDailyRollup.objects.filter(user=self.user)
+        } == {
+            (rollup.date, rollup.completed, rollup.expected)
+            for rollup in UserDailyRollup.objects.compute([self.user.pk], first, last)
+        }
+
+    def test_chunks_update_derived_state_in_place(self, monkeypatch):
+        """Test that chunks keep stats exact and extend rollups to today once."""
+        HabitLog.objects.create(habit=self.habit, date=date(2024, 1, 5), completed=True)
+        stream = StringIO(
+            "habit,date,completed\n"
+            "Read,2024-01-04,true\nExercise,2024-01-03,true\n"
+            "Write,2024-01-02,true\nExercise,2024-01-05,false\n"
+            "Read,2024-01-01,true\nRead,2024-01-02,true\n"
+            "Exercise,2024-01-04,true\nWrite,2024-01-03,false\n"
+        )
+        rebuild = UserDailyRollup.objects.rebuild
+        ranges = []
+
+        def recording_rebuild(user_ids, start=None, end=None):
+            ranges.append((start, end))
+            return rebuild(user_ids, start, end)
+
+        monkeypatch.setattr(UserDailyRollup.objects, "rebuild", recording_rebuild)
+        result = import_logs(self.user, stream, batch_size=3)
+
+        assert result.habits_created == 2
+        habit_ids = list(Habit.objects.values_list("pk", flat=True))
+        assert HabitStats.objects.verify(habit_ids) == []
+        assert check_bitmaps(habit_ids) == []
+        assert [end for _, end in ranges].count(date.today()) == 1
+        first, last = UserDailyRollup.objects.history_range([self.user.pk])
+        assert {
+            (rollup.date, rollup.completed, rollup.expected)
+            for rollup in UserDailyRollup.objects.filter(user=self.user)
+        } == {
+            (rollup.date, rollup.completed, rollup.expected)
+            for rollup in UserDailyRollup.objects.compute([self.user.pk], first, last)
+        }
+
+    def test_csv_import_creates_missing_habits(self):
+        """Test that unknown names become daily habits starting on day one."""
+        stream = StringIO(
+            "habit,date,completed\n"
+            "Read,2024-03-05,yes\n"
+            "Read,2024-03-01,no\n"
+            "Exercise,2024-03-01,\n"
+        )
+
+        result = import_logs(self.user, stream)
+
+        assert result.habits_created == 1
+        habit = Habit.objects.get(user=self.user, name="Read")
+        assert habit.start_date == date(2024, 3, 1)
+        assert dict(habit.logs.values_list("date", "completed")) == {
+            date(2024, 3, 5): True,
+            date(2024, 3, 1): False,
+        }
+        assert HabitLog.objects.get(habit=self.habit).completed is True
+
+    def test_malformed_rows_are_skipped_and_reported(self):
+        """Test that bad rows are counted without aborting the import."""
+        stream = StringIO(
+            "habit,date,completed\n"
+            "Exercise,2024-01-01,true\n"
+            "Exercise,yesterday,true\n"
+            ",2024-01-02,true\n"
+            "Exercise,2024-01-03,maybe\n"
+        )
+
+        result = import_logs(self.user, stream)
+
+        assert (result.rows, result.logs, result.skipped) == (4, 1, 3)
+        assert result.errors[0] == "Row 2: invalid date 'yesterday'"
+
+    def test_on_conflict_update_and_skip(self):
+        """Test that existing days are overwritten or kept as asked."""
+        HabitLog.objects.create(
+            habit=self.habit, date=date(2024, 1, 1), completed=True, notes="Kept"
+        )
+        row = "habit,date,completed,notes\nExercise,2024-01-01,false,New\n"
+
+        import_logs(self.user, StringIO(row), on_conflict="skip")
+        assert HabitLog.objects.get(habit=self.habit).notes == "Kept"
+
+        import_logs(self.user, StringIO(row), on_conflict="update")
+        log = HabitLog.objects.get(habit=self.habit)
+        assert (log.completed, log.notes) == (False, "New")
+        assert HabitStats.objects.get(pk=self.habit.pk).completed_logs == 0
+
+    def test_ndjson_import(self):
+        """Test that NDJSON lines map to logs and bad lines are reported."""
+        stream = StringIO(
+            '{"habit": "Exercise", "date": "2024-01-01", "completed": true}\n'
+            "\n"
+            '{"habit": "Exercise", "date": "2024-01-02", "notes": "Run"}\n'
+            "not json\n"
+        )
+
+        result = import_logs(self.user, stream, fmt="ndjson")
+
+        assert (result.logs, result.skipped) == (2, 1)
+        assert HabitLog.objects.get(date=date(2024, 1, 2)).notes == "Run"
+
+    def test_loop_checkmarks_import(self):
+        """Test that only manually checked Loop days become completions."""
+        stream = StringIO(
+            "Date,Exercise,Meditate,\n"
+            "2024-01-03,2,0,\n"
+            "2024-01-02,1,2,\n"
+            "2024-01-01,2,-1,\n"
+        )
+
+        result = import_logs(self.user, stream, fmt="loop")
+
+        assert result.logs == 3
+        assert sorted(
+            HabitLog.objects.filter(user=self.user).values_list("habit__name", "date")
+        ) == [
+            ("Exercise", date(2024, 1, 1)),
+            ("Exercise", date(2024, 1, 3)),
+            ("Meditate", date(2024, 1, 2)),
+        ]
+
+
+@pytest.mark.django_db
+class TestImportHabitLogsCommand:
+    """Test the import_habit_logs command."""
+
+    def test_command_imports_file_and_reports_throughput(self, tmp_path):
+        """Test that the command imports a file and prints rows per second."""
+        User.objects.create_user(username="testuser", email="test@example.com")
+        path = tmp_path / "history.csv"
+        path.write_text(daily_csv("Exercise", 30))
+        stdout = StringIO()
+
+        call_command(
+            "import_habit_logs", str(path), "--user", "testuser", stdout=stdout
+        )
+
+        assert "Imported 30 log(s) from 30 row(s)" in stdout.getvalue()
+        assert "rows/s" in stdout.getvalue()
+        assert HabitLog.objects.count() == 30
+
+    def test_command_reports_where_to_resume(self, tmp_path, monkeypatch):
+        """Test that a failed import names the --resume-after value."""
+        User.objects.create_user(username="testuser", email="test@example.com")
+        path = tmp_path / "history.csv"
+        path.write_text(daily_csv("Exercise", 30))
+        write = importers._write
+
+        def failing_write(logs, on_conflict):
+            if HabitLog.objects.exists():
+                raise DatabaseError("disk full")
+            write(logs, on_conflict)
+
+        monkeypatch.setattr(importers, "_write", failing_write)
+        with pytest.raises(CommandError, match="--resume-after 10 "):
+            call_command(
+                "import_habit_logs",
+                str(path),
+                "--user",
+                "testuser",
+                "--batch-size",
+                "10",
+            )
+
+        assert HabitLog.objects.count() == 10
+
+
+@pytest.mark.django_db
+class TestImportView:
+    """Test POST /api/habits/import/."""
+
+    def setup_method(self):
+        """Create an authenticated client."""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("habits:habit-import")
+
+    def test_upload_infers_loop_format(self):
+        """Test that a Checkmarks.csv upload is read as a Loop export."""
+        upload = SimpleUploadedFile(
+            "Checkmarks.csv", b"Date,Exercise,\n2024-01-01,2,\n2024-01-02,2,\n"
+        )
+
+        response = self.client.post(self.url, {"file": upload}, format="multipart")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["logs"] == 2
+        assert response.data["habits_created"] == 1
+        habit = Habit.objects.get(user=self.user)
+        assert habit.get_longest_streak() == 2
+
+    def test_upload_rejects_bad_requests(self):
+        """Test that missing files, bad options and binary data return 400."""
+        upload = SimpleUploadedFile("history.csv", b"habit,date\n")
+        binary = SimpleUploadedFile("history.csv", b"habit,date\n\xff\xfe\n")
+
+        assert self.client.post(self.url, {}, format="multipart").status_code == 400
+        assert (
+            self.client.post(
+                self.url, {"file": upload, "format": "xml"}, format="multipart"
+            ).status_code
+            == 400
+        )
+        assert (
+            self.client.post(self.url, {"file": binary}, format="multipart").status_code
+            == 400
+        )
@@ -0,0 +1,69 @@
+"""
+Unit tests for the concurrent load generator.
+"""
+
+import pytest
+from habits.loadtest import (
+    HISTOGRAM_BOUNDS_MS,
+    Sample,
+    format_report,
+    histogram,
+    parse_mix,
+    run_load,
+    summarize,
+)
+from habits.seeding import DEFAULT_PASSWORD, seed
+
+
+class TestLoadTestHelpers:
+    """Test mix parsing, histograms and summaries."""
+
+    def test_parse_mix(self):
+        """Test weights parsing and rejection of unknown scenarios."""
+        assert parse_mix("list=3, log=1") == {"list": 3, "log": 1}
+        for value in ("list", "list=x", "export=1", "list=0"):
+            with pytest.raises(ValueError):
+                parse_mix(value)
+
+    def test_histogram(self):
+        """Test that latencies land in the first bucket that holds them."""
+        buckets = dict(histogram([0.0005, 0.001, 0.004, 0.15, 9.0]))
+
+        assert len(buckets) == len(HISTOGRAM_BOUNDS_MS) + 1
+        assert (buckets[1], buckets[5], buckets[200], buckets["inf"]) == (2, 1, 1, 1)
+        assert sum(buckets.values()) == 5
+
+    def test_summarize_counts_errors_and_locks(self):
+        """Test per-scenario totals, lock counts and throughput."""
+        samples = [
+            Sample("log", 201, 0.01, False),
+            Sample("log", 500, 2.0, True),
+            Sample("log", 0, 0.5, False),
+            Sample("list", 200, 0.02, False),
+        ]
+
+        result = summarize(samples, 2.0, users=2)
+
+        assert (result["requests"], result["throughput_rps"]) == (4, 2.0)
+        assert (result["errors"], result["locked"]) == (2, 1)
+        assert result["scenarios"]["log"]["statuses"] == {"201": 1, "500": 1, "0": 1}
+        assert list(result["scenarios"]) == ["list", "log"]
+        assert "1 database is locked" in format_report(result)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestRunLoad:
+    """Test a virtual user against a live server."""
+
+    def test_virtual_user_exercises_every_scenario(self, live_server, settings):
+        """Test that each scenario in the mix is called and succeeds."""
+        settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+        # One virtual user: the in-memory test database locks whole tables.
+        seed(1, 2, 10, density=0.5, prefix="vu")
+        mix = parse_mix("login=1,list=1,log=1,stats=1,logs=1")
+
+        result = run_load(live_server.url, ["vu0"], DEFAULT_PASSWORD, mix, 0.5, 10)
+
+        assert result["users"] == 1
+        assert result["errors"] == 0
+        assert set(result["scenarios"]) == {"login", "list", "log", "stats", "logs"}
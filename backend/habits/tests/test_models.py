@@ -7,6 +7,7 @@ import pytest
 from datetime import datetime, timedelta, date
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from habits.bitmaps import rebuild_bitmaps
 from habits.models import Habit, HabitLog, HabitCategory, HabitFrequency
 
 User = get_user_model()
@@ -252,6 +253,29 @@ class TestHabitLogModel:
         assert log_yesterday.date == yesterday
         assert HabitLog.objects.filter(habit=habit).count() == 2
 
+    def test_habit_log_copies_user_from_habit(self):
+        """Test that save() and bulk_create() fill the denormalized owner."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        habit = Habit.objects.create(
+            user=user,
+            name="Exercise",
+            category=HabitCategory.HEALTH,
+            frequency=HabitFrequency.DAILY,
+            goal_count=1,
+            start_date=date.today(),
+        )
+
+        log = HabitLog.objects.create(habit=habit, date=date.today(), completed=True)
+        HabitLog.objects.bulk_create(
+            [HabitLog(habit=habit, date=date.today() - timedelta(days=1))]
+        )
+
+        assert log.user == user
+        assert list(user.habit_logs.values_list("habit_id", flat=True)) == [
+            habit.id,
+            habit.id,
+        ]
+
 
 @pytest.mark.django_db
 class TestHabitStreakCalculation:
@@ -345,3 +369,80 @@ class TestHabitStreakCalculation:
 
         streak = habit.calculate_current_streak()
         assert streak == 0
+
+
+@pytest.mark.django_db
+class TestHabitQuerySetWithStats:
+    """Test batch statistics from Habit.objects.with_stats()."""
+
+    def test_with_stats_annotates_each_habit(self):
+        """Test that counts, streaks and completion rate are attached."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        habit = Habit.objects.create(
+            user=user,
+            name="Exercise",
+            category=HabitCategory.HEALTH,
+            frequency=HabitFrequency.DAILY,
+            goal_count=1,
+            start_date=date.today() - timedelta(days=9),
+        )
+
+        today = date.today()
+        for i in range(3):
+            HabitLog.objects.create(
+                habit=habit, date=today - timedelta(days=i), completed=True
+            )
+        HabitLog.objects.create(
+            habit=habit, date=today - timedelta(days=5), completed=False
+        )
+
+        annotated = Habit.objects.with_stats().get(pk=habit.pk)
+
+        assert annotated.total_logs == 4
+        assert annotated.completed_logs == 3
+        assert annotated.current_streak == 3
+        assert annotated.longest_streak == 3
+        assert annotated.completion_rate == habit.get_completion_rate() == 30.0
+
+    def test_with_stats_non_daily_counts_periods(self):
+        """Test that weekly habits report streaks and progress in weeks."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        habit = Habit.objects.create(
+            user=user,
+            name="Review",
+            category=HabitCategory.PRODUCTIVITY,
+            frequency=HabitFrequency.WEEKLY,
+            goal_count=1,
+            start_date=date.today(),
+        )
+        HabitLog.objects.create(habit=habit, date=date.today(), completed=True)
+
+        annotated = Habit.objects.with_stats().get(pk=habit.pk)
+
+        assert annotated.current_streak == habit.calculate_current_streak() == 1
+        assert annotated.longest_streak == 1
+        assert annotated.period_progress.period == "week"
+        assert annotated.period_progress.met is True
+
+    def test_with_stats_fixed_query_count(self, django_assert_num_queries):
+        """Test that a page of daily habits is one query regardless of size."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        today = date.today()
+        for n in range(30):
+            habit = Habit.objects.create(
+                user=user,
+                name=f"Habit {n}",
+                frequency=HabitFrequency.DAILY,
+                start_date=today - timedelta(days=60),
+            )
+            HabitLog.objects.bulk_create(
+                HabitLog(habit=habit, date=today - timedelta(days=i), completed=True)
+                for i in range(n + 1)
+            )
+        rebuild_bitmaps(Habit.objects.values_list("pk", flat=True))
+
+        with django_assert_num_queries(1):
+            habits = list(Habit.objects.filter(user=user).with_stats()[:20])
+
+        assert len(habits) == 20
+        assert {habit.current_streak for habit in habits} == set(range(11, 31))
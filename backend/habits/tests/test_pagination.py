@@ -0,0 +1,114 @@
+"""
+Unit tests for keyset (cursor) pagination of habits and habit logs.
+"""
+
+import re
+import pytest
+from datetime import date, timedelta
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from habits.models import Habit, HabitLog, HabitCategory, HabitFrequency
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    """Test cursor pagination on /api/habits/ and /api/habits/logs/."""
+
+    def setup_method(self):
+        """Create three habits with 40 days of logs each."""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com"
+        )
+        self.habits = [
+            Habit.objects.create(
+                user=self.user,
+                name=f"Habit {i}",
+                category=HabitCategory.HEALTH,
+                frequency=HabitFrequency.DAILY,
+                goal_count=1,
+                start_date=date.today() - timedelta(days=39),
+            )
+            for i in range(3)
+        ]
+        HabitLog.objects.bulk_create(
+            HabitLog(habit=habit, date=date.today() - timedelta(days=i), completed=True)
+            for habit in self.habits
+            for i in range(40)
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def walk(self, url):
+        """Follow next links and return every result."""
+        results = []
+        while url:
+            response = self.client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            results.extend(response.data["results"])
+            url = response.data["next"]
+        return results
+
+    def test_logs_route_is_not_shadowed_by_habit_detail(self):
+        """Test that /api/habits/logs/ reaches the log list."""
+        response = self.client.get(reverse("habits:habitlog-list"))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"]) == 20
+        assert "count" not in response.data
+
+    def test_log_pages_cover_every_log_once_in_order(self):
+        """Test that pages tie-break equal dates on id without gaps or repeats."""
+        logs = self.walk(reverse("habits:habitlog-list") + "?page_size=7")
+
+        assert len(logs) == len({log["id"] for log in logs}) == 120
+        keys = [(log["date"], log["id"]) for log in logs]
+        assert keys == sorted(keys, reverse=True)
+
+    def test_habit_pages_are_newest_first(self):
+        """Test that habits page on (created_at, id), newest first."""
+        habits = self.walk(reverse("habits:habit-list") + "?page_size=2")
+
+        assert [habit["id"] for habit in habits] == [
+            habit.id for habit in reversed(self.habits)
+        ]
+
+    def test_deep_page_runs_no_count_or_offset_scan(self):
+        """Test that a deep page filters on the cursor instead of skipping rows."""
+        url = reverse("habits:habitlog-list") + "?page_size=10"
+        for _ in range(8):
+            url = self.client.get(url).data["next"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        (page_sql,) = [q["sql"] for q in queries if "LIMIT" in q["sql"].upper()]
+        assert "COUNT(" not in page_sql.upper()
+        # Only rows sharing the cursor's date (one per habit) are skipped.
+        offset = re.search(r"OFFSET (\d+)", page_sql, re.IGNORECASE)
+        assert offset is None or int(offset.group(1)) < len(self.habits)
+
+    def test_estimated_total_is_opt_in(self):
+        """Test that X-Total-Estimate is only sent when asked for."""
+        url = reverse("habits:habitlog-list")
+
+        assert "X-Total-Estimate" not in self.client.get(url)
+        response = self.client.get(url, {"estimate_total": 1})
+
+        assert response["X-Total-Estimate"] == "120"
+
+    def test_estimated_total_is_capped(self, monkeypatch):
+        """Test that the fallback estimate stops counting at the cap."""
+        monkeypatch.setattr("habits.pagination.ESTIMATE_CAP", 100)
+
+        response = self.client.get(
+            reverse("habits:habitlog-list"), {"estimate_total": "true"}
+        )
+
+        assert response["X-Total-Estimate"] == "100+"
@@ -0,0 +1,165 @@
+"""
+Unit tests for the weekly and monthly period engine.
+"""
+
+import pytest
+from datetime import date, timedelta
+from django.contrib.auth import get_user_model
+from habits.models import Habit, HabitLog, HabitFrequency
+from habits.bitmaps import rebuild_bitmaps
+from habits.periods import (
+    current_progress,
+    get_period_stats,
+    next_period_start,
+    period_start,
+)
+
+User = get_user_model()
+
+# A fixed Wednesday keeps week and month boundaries predictable.
+TODAY = date(2026, 10, 14)
+THIS_WEEK = date(2026, 10, 12)
+
+
+def make_habit(user, frequency, goal_count, name="Habit"):
+    """Create a habit of the given frequency and goal."""
+    return Habit.objects.create(
+        user=user,
+        name=name,
+        frequency=frequency,
+        goal_count=goal_count,
+        start_date=date(2024, 1, 1),
+    )
+
+
+def log_dates(habit, dates, completed=True):
+    """Bulk-create logs for the given dates."""
+    HabitLog.objects.bulk_create(
+        HabitLog(habit=habit, date=day, completed=completed) for day in dates
+    )
+
+
+def week_days(monday, count):
+    """Return the first ``count`` days of the week starting at ``monday``."""
+    return [monday + timedelta(days=i) for i in range(count)]
+
+
+class TestPeriodBoundaries:
+    """Test period start and step helpers."""
+
+    def test_week_starts_on_iso_monday(self):
+        """Test that weeks start on Monday."""
+        assert period_start(TODAY, HabitFrequency.WEEKLY) == THIS_WEEK
+        assert period_start(THIS_WEEK, HabitFrequency.WEEKLY) == THIS_WEEK
+
+    def test_month_steps_across_year_end(self):
+        """Test month stepping across months of different lengths."""
+        assert period_start(TODAY, HabitFrequency.MONTHLY) == date(2026, 10, 1)
+        assert next_period_start(date(2026, 1, 1), HabitFrequency.MONTHLY) == date(
+            2026, 2, 1
+        )
+        assert next_period_start(date(2026, 12, 1), HabitFrequency.MONTHLY) == date(
+            2027, 1, 1
+        )
+
+
+@pytest.mark.django_db
+class TestPeriodStats:
+    """Test period progress and period streaks."""
+
+    def test_weekly_goal_streak(self):
+        """Test consecutive weeks meeting a 3x goal form a streak."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        habit = make_habit(user, HabitFrequency.WEEKLY, goal_count=3)
+        for weeks_ago in (1, 2, 3):
+            log_dates(habit, week_days(THIS_WEEK - timedelta(weeks=weeks_ago), 3))
+        log_dates(habit, week_days(THIS_WEEK, 2))
+
+        stats = get_period_stats([habit], today=TODAY)[habit.pk]
+
+        assert stats.current_period.start == THIS_WEEK
+        assert stats.current_period.completed == 2
+        assert stats.current_period.met is False
+        assert stats.current_streak == 3
+        assert stats.longest_streak == 3
+
+    def test_missed_week_breaks_streak(self):
+        """Test that a week below goal ends the streak."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        habit = make_habit(user, HabitFrequency.WEEKLY, goal_count=2)
+        log_dates(habit, week_days(THIS_WEEK - timedelta(weeks=5), 2))
+        log_dates(habit, week_days(THIS_WEEK - timedelta(weeks=4), 2))
+        log_dates(habit, week_days(THIS_WEEK - timedelta(weeks=3), 2))
+        log_dates(habit, week_days(THIS_WEEK - timedelta(weeks=2), 1))
+        log_dates(habit, week_days(THIS_WEEK, 2))
+
+        stats = get_period_stats([habit], today=TODAY)[habit.pk]
+
+        assert stats.current_period.met is True
+        assert stats.current_streak == 1
+        assert stats.longest_streak == 3
+
+    def test_incomplete_logs_do_not_count(self):
+        """Test that only completed logs count toward the goal."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        habit = make_habit(user, HabitFrequency.WEEKLY, goal_count=2)
+        log_dates(habit, [THIS_WEEK])
+        log_dates(habit, [THIS_WEEK + timedelta(days=1)], completed=False)
+
+        stats = get_period_stats([habit], today=TODAY)[habit.pk]
+
+        assert stats.current_period.completed == 1
+        assert stats.current_streak == 0
+
+    def test_monthly_streak_across_year_end(self):
+        """Test monthly streaks across a year boundary."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        habit = make_habit(user, HabitFrequency.MONTHLY, goal_count=1)
+        log_dates(habit, [date(2025, 11, 3), date(2025, 12, 30), date(2026, 1, 2)])
+
+        stats = get_period_stats([habit], today=date(2026, 1, 20))[habit.pk]
+
+        assert stats.current_period.start == date(2026, 1, 1)
+        assert stats.current_streak == 3
+        assert stats.longest_streak == 3
+
+    def test_current_progress_matches_period_stats(self):
+        """Test that bitmap progress agrees with the aggregate engine."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        weekly = make_habit(user, HabitFrequency.WEEKLY, goal_count=2, name="Weekly")
+        monthly = make_habit(user, HabitFrequency.MONTHLY, goal_count=3, name="Month")
+        for weeks_ago in (0, 1, 2, 4):
+            log_dates(weekly, week_days(THIS_WEEK - timedelta(weeks=weeks_ago), 2))
+        log_dates(monthly, [TODAY - timedelta(days=i) for i in range(0, 90, 9)])
+        rebuild_bitmaps([weekly.pk, monthly.pk])
+
+        expected = get_period_stats([weekly, monthly], today=TODAY)
+        for habit in Habit.objects.filter(pk__in=[weekly.pk, monthly.pk]):
+            current, streak = current_progress(habit, today=TODAY)
+            assert current == expected[habit.pk].current_period
+            assert streak == expected[habit.pk].current_streak
+        assert expected[weekly.pk].current_streak == 3
+
+    def test_daily_habits_are_skipped(self):
+        """Test that daily habits are left to the streak engine."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        habit = make_habit(user, HabitFrequency.DAILY, goal_count=1)
+
+        assert get_period_stats([habit], today=TODAY) == {}
+
+    def test_one_query_for_multi_year_mixed_habits(self, django_assert_num_queries):
+        """Test that weekly and monthly habits share one aggregate query."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        weekly = make_habit(user, HabitFrequency.WEEKLY, goal_count=4, name="Weekly")
+        monthly = make_habit(
+            user, HabitFrequency.MONTHLY, goal_count=10, name="Monthly"
+        )
+        history = [TODAY - timedelta(days=i) for i in range(3 * 365)]
+        log_dates(weekly, history)
+        log_dates(monthly, history)
+
+        with django_assert_num_queries(1):
+            stats = get_period_stats([weekly, monthly], today=TODAY)
+
+        assert stats[weekly.pk].longest_streak == 156
+        assert stats[monthly.pk].current_streak == 37
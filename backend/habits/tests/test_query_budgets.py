@@ -0,0 +1,213 @@
+"""
+Query-budget regression tests for every API endpoint.
+
+Each endpoint is called for a user from a small and a large seeded dataset
+(more habits than a page, longer histories and streaks). The two calls must
+run the same number of queries, and no more than the endpoint's budget; a
+failure lists the SQL of the large run so the offending query is visible.
+
+Budgets include JWT authentication and the derived state (stats, bitmaps,
+daily rollups, tombstones) that writes keep current. Left out:
+GET /api/habits/export/, which streams logs in fixed-size chunks so its
+query count grows with history by design, and POST /api/habits/logs/, as
+logs are created through POST /api/habits/{id}/log/.
+"""
+
+import pytest
+from datetime import date, timedelta
+from typing import Callable, NamedTuple
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from habits.benchmarks import PASSWORD, DatasetSize, seed_dataset
+from habits.models import Habit, HabitLog
+
+SMALL = DatasetSize(users=1, habits=2, days=3)
+LARGE = DatasetSize(users=1, habits=25, days=90)
+
+TODAY = date.today().isoformat()
+# A day before any seeded history, so check-ins create logs in both datasets.
+UNLOGGED_DAY = (date.today() - timedelta(days=365)).isoformat()
+
+
+class Endpoint(NamedTuple):
+    """An API call and the most queries it may run."""
+
+    name: str
+    budget: int
+    call: Callable
+
+
+def habit_url(name, ctx):
+    """Reverse a habit detail route for the context's habit."""
+    return reverse(f"habits:{name}", args=[ctx["habit"].pk])
+
+
+def log_url(ctx):
+    """Reverse the log detail route for the context's log."""
+    return reverse("habits:habitlog-detail", args=[ctx["log"].pk])
+
+
+ENDPOINTS = [
+    # HabitViewSet
+    Endpoint("habit-list", 3, lambda c, ctx: c.get(reverse("habits:habit-list"))),
+    Endpoint(
+        "habit-create",
+        11,
+        lambda c, ctx: c.post(
+            reverse("habits:habit-list"),
+            {"name": "New", "frequency": "daily", "start_date": TODAY},
+            format="json",
+        ),
+    ),
+    Endpoint("habit-retrieve", 4, lambda c, ctx: c.get(habit_url("habit-detail", ctx))),
+    Endpoint(
+        "habit-update",
+        6,
+        lambda c, ctx: c.patch(
+            habit_url("habit-detail", ctx), {"name": "Renamed"}, format="json"
+        ),
+    ),
+    Endpoint(
+        "habit-destroy", 17, lambda c, ctx: c.delete(habit_url("habit-detail", ctx))
+    ),
+    Endpoint(
+        "habit-log",
+        19,
+        lambda c, ctx: c.post(
+            habit_url("habit-log", ctx),
+            {"date": TODAY, "completed": True},
+            format="json",
+        ),
+    ),
+    Endpoint(
+        "habit-check-in",
+        18,
+        lambda c, ctx: c.post(
+            reverse("habits:habit-check-in"),
+            [
+                {"habit": habit.pk, "date": UNLOGGED_DAY, "completed": True}
+                for habit in ctx["habits"][:2]
+            ],
+            format="json",
+        ),
+    ),
+    Endpoint(
+        "habit-import",
+        19,
+        lambda c, ctx: c.post(
+            reverse("habits:habit-import"),
+            {
+                "file": SimpleUploadedFile(
+                    "history.csv",
+                    f"habit,date,completed\nHabit 0,{TODAY},true\n".encode(),
+                )
+            },
+            format="multipart",
+        ),
+    ),
+    Endpoint("habit-sync", 4, lambda c, ctx: c.get(reverse("habits:habit-sync"))),
+    Endpoint("habit-today", 3, lambda c, ctx: c.get(reverse("habits:habit-today"))),
+    Endpoint("habit-matrix", 2, lambda c, ctx: c.get(reverse("habits:habit-matrix"))),
+    Endpoint("habit-trends", 2, lambda c, ctx: c.get(reverse("habits:habit-trends"))),
+    Endpoint("habit-logs", 3, lambda c, ctx: c.get(habit_url("habit-logs", ctx))),
+    Endpoint("habit-stats", 2, lambda c, ctx: c.get(habit_url("habit-stats", ctx))),
+    # HabitLogViewSet
+    Endpoint("log-list", 3, lambda c, ctx: c.get(reverse("habits:habitlog-list"))),
+    Endpoint("log-retrieve", 3, lambda c, ctx: c.get(log_url(ctx))),
+    Endpoint(
+        "log-update",
+        21,
+        lambda c, ctx: c.patch(log_url(ctx), {"notes": "Edited"}, format="json"),
+    ),
+    Endpoint("log-destroy", 19, lambda c, ctx: c.delete(log_url(ctx))),
+    # core auth
+    Endpoint(
+        "auth-signup",
+        7,
+        lambda c, ctx: c.post(
+            reverse("signup"),
+            {
+                "username": f"new{ctx['user'].pk}",
+                "email": f"new{ctx['user'].pk}@example.com",
+                "password": "testpass123",
+                "password2": "testpass123",
+            },
+            format="json",
+        ),
+    ),
+    Endpoint(
+        "auth-login",
+        6,
+        lambda c, ctx: c.post(
+            reverse("login"),
+            {"username": ctx["user"].username, "password": PASSWORD},
+            format="json",
+        ),
+    ),
+    Endpoint(
+        "auth-refresh",
+        13,
+        lambda c, ctx: c.post(
+            reverse("token_refresh"), {"refresh": ctx["refresh"]}, format="json"
+        ),
+    ),
+    Endpoint(
+        "auth-logout",
+        8,
+        lambda c, ctx: c.post(
+            reverse("logout"), {"refresh": ctx["refresh"]}, format="json"
+        ),
+    ),
+]
+
+
+def run(endpoint, size, prefix):
+    """Seed ``size`` and return the captured queries of one call."""
+    (user,) = seed_dataset(size, prefix=prefix)
+    habits = list(Habit.objects.filter(user=user).order_by("pk"))
+    ctx = {
+        "user": user,
+        "habits": habits,
+        "habit": habits[0],
+        "log": HabitLog.objects.filter(habit=habits[0]).order_by("pk").first(),
+        "refresh": str(RefreshToken.for_user(user)),
+    }
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    caches[settings.HABIT_STATS_CACHE].clear()
+
+    with CaptureQueriesContext(connection) as queries:
+        response = endpoint.call(client, ctx)
+    assert response.status_code < 400, (endpoint.name, response.status_code)
+    return queries
+
+
+@pytest.mark.django_db
+class TestQueryBudgets:
+    """Test every endpoint against its query budget on two dataset sizes."""
+
+    @pytest.mark.parametrize("endpoint", ENDPOINTS, ids=lambda endpoint: endpoint.name)
+    def test_query_budget(self, endpoint, settings):
+        """Test that queries stay within budget whatever the dataset size."""
+        settings.SQL_INSTRUMENTATION_SAMPLE_RATE = 0
+        # Hashing cost is irrelevant to query counts.
+        settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+        small = run(endpoint, SMALL, prefix="small")
+        large = run(endpoint, LARGE, prefix="large")
+
+        if len(small) != len(large) or len(large) > endpoint.budget:
+            sql = "\n".join(
+                f"{number}. {query['sql']}"
+                for number, query in enumerate(large.captured_queries, 1)
+            )
+            pytest.fail(
+                f"{endpoint.name}: {len(small)} queries for {SMALL}, "
+                f"{len(large)} for {LARGE} (budget {endpoint.budget})\n{sql}",
+                pytrace=False,
+            )
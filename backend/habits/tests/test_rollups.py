@@ -0,0 +1,252 @@
+"""
+Unit tests for per-user daily rollups and completion trends.
+"""
+
+import pytest
+from datetime import date, timedelta
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from habits.bulk import upsert_logs
+from habits.models import (
+    Habit,
+    HabitLog,
+    HabitCategory,
+    HabitFrequency,
+    UserDailyRollup,
+)
+
+User = get_user_model()
+
+TODAY = date.today()
+
+
+def ago(days):
+    """Return the date ``days`` days before today."""
+    return TODAY - timedelta(days=days)
+
+
+def stored(user):
+    """Return the user's rollups as {date: (completed, expected, categories)}."""
+    return {
+        rollup.date: (rollup.completed, rollup.expected, rollup.categories)
+        for rollup in UserDailyRollup.objects.filter(user=user)
+    }
+
+
+def recomputed(user):
+    """Return what a full rebuild would store, without writing it."""
+    first, last = UserDailyRollup.objects.history_range([user.pk])
+    return {
+        rollup.date: (rollup.completed, rollup.expected, rollup.categories)
+        for rollup in UserDailyRollup.objects.compute([user.pk], first, last)
+    }
+
+
+@pytest.mark.django_db
+class TestUserDailyRollup:
+    """Test that habit and log writes keep rollups current."""
+
+    def setup_method(self):
+        """Create a daily health habit and a weekly learning habit."""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com"
+        )
+        self.exercise = Habit.objects.create(
+            user=self.user,
+            name="Exercise",
+            category=HabitCategory.HEALTH,
+            frequency=HabitFrequency.DAILY,
+            start_date=ago(4),
+        )
+        self.read = Habit.objects.create(
+            user=self.user,
+            name="Read",
+            category=HabitCategory.LEARNING,
+            frequency=HabitFrequency.WEEKLY,
+            goal_count=2,
+            start_date=ago(4),
+        )
+
+    def test_new_daily_habit_is_expected_every_day(self):
+        """Test that creating a habit fills expected counts through today."""
+        rollups = stored(self.user)
+
+        assert sorted(rollups) == [ago(i) for i in range(4, -1, -1)]
+        assert rollups[TODAY] == (0, 1, {"health": {"completed": 0, "expected": 1}})
+
+    def test_log_writes_update_rollups(self):
+        """Test create, date change and delete against a fresh computation."""
+        log = HabitLog.objects.create(habit=self.exercise, date=ago(1), completed=True)
+        HabitLog.objects.create(habit=self.read, date=ago(1), completed=True)
+        HabitLog.objects.create(habit=self.read, date=ago(2), completed=False)
+
+        assert stored(self.user)[ago(1)] == (
+            2,
+            2,
+            {
+                "health": {"completed": 1, "expected": 1},
+                "learning": {"completed": 1, "expected": 1},
+            },
+        )
+
+        log = HabitLog.objects.get(pk=log.pk)
+        log.date = ago(3)
+        log.save()
+        assert stored(self.user)[ago(1)][:2] == (1, 2)
+        assert stored(self.user)[ago(3)][:2] == (1, 1)
+
+        log.delete()
+        assert stored(self.user)[ago(3)][:2] == (0, 1)
+        assert stored(self.user) == recomputed(self.user)
+
+    def test_habit_changes_rebuild_expected_counts(self):
+        """Test that deactivating or deleting a habit updates history."""
+        HabitLog.objects.create(habit=self.exercise, date=ago(2), completed=True)
+
+        self.exercise.is_active = False
+        self.exercise.save()
+        rollups = stored(self.user)
+        assert list(rollups) == [ago(2)]
+        assert rollups[ago(2)][:2] == (1, 1)
+
+        self.exercise.delete()
+        assert stored(self.user) == {}
+
+    def test_bulk_check_in_updates_rollups(self):
+        """Test that the bulk write path refreshes rollups once."""
+        upsert_logs(
+            self.user,
+            [
+                {"habit": self.exercise.pk, "date": ago(i), "completed": True}
+                for i in range(3)
+            ],
+        )
+
+        assert [stored(self.user)[ago(i)][0] for i in range(5)] == [1, 1, 1, 0, 0]
+        assert stored(self.user) == recomputed(self.user)
+
+    def test_rebuild_upserts_rows_written_concurrently(self, monkeypatch):
+        """Test that a row inserted after the delete is updated, not duplicated."""
+        compute = UserDailyRollup.objects.compute
+
+        def racing_compute(user_ids, start, end):
+            # What a concurrent rebuild for the same user and day would commit.
+            UserDailyRollup.objects.create(
+                user=self.user, date=TODAY, completed=5, expected=5
+            )
+            return compute(user_ids, start, end)
+
+        monkeypatch.setattr(UserDailyRollup.objects, "compute", racing_compute)
+        UserDailyRollup.objects.rebuild([self.user.pk], TODAY, TODAY)
+        monkeypatch.undo()
+
+        assert UserDailyRollup.objects.filter(user=self.user, date=TODAY).count() == 1
+        assert stored(self.user)[TODAY] == recomputed(self.user)[TODAY]
+
+
+@pytest.mark.django_db
+class TestRebuildRollupsCommand:
+    """Test the rebuild_rollups command."""
+
+    def test_rebuild_restores_bypassed_rows(self):
+        """Test that queryset updates are caught up in user chunks."""
+        users = [
+            User.objects.create_user(username=f"user{i}", email=f"user{i}@example.com")
+            for i in range(3)
+        ]
+        for user in users:
+            habit = Habit.objects.create(user=user, name="Exercise", start_date=ago(9))
+            HabitLog.objects.create(habit=habit, date=ago(1), completed=True)
+        HabitLog.objects.update(completed=False)
+        UserDailyRollup.objects.filter(date=TODAY).delete()
+        stdout = StringIO()
+
+        call_command(
+            "rebuild_rollups",
+            "--since",
+            ago(1).isoformat(),
+            "--chunk-size",
+            "2",
+            stdout=stdout,
+        )
+
+        assert "Rebuilt 6 rollup row(s) for 3 user(s)" in stdout.getvalue()
+        for user in users:
+            assert stored(user) == recomputed(user)
+            assert stored(user)[ago(1)][0] == 0
+
+
+@pytest.mark.django_db
+class TestHabitTrendsView:
+    """Test GET /api/habits/trends/."""
+
+    def setup_method(self):
+        """Create two daily habits over two weeks, one done every other day."""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com"
+        )
+        self.start = date(2024, 1, 1)
+        habits = [
+            Habit.objects.create(
+                user=self.user,
+                name=name,
+                category=category,
+                frequency=HabitFrequency.DAILY,
+                start_date=self.start,
+            )
+            for name, category in (
+                ("Exercise", HabitCategory.HEALTH),
+                ("Read", HabitCategory.LEARNING),
+            )
+        ]
+        HabitLog.objects.bulk_create(
+            HabitLog(
+                habit=habits[0],
+                date=self.start + timedelta(days=i),
+                completed=True,
+            )
+            for i in range(0, 14, 2)
+        )
+        UserDailyRollup.objects.rebuild([self.user.pk])
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("habits:habit-trends")
+
+    def test_weekly_trends(self, django_assert_num_queries):
+        """Test week buckets with totals, rate and categories in one query."""
+        params = {"from": "2024-01-01", "to": "2024-01-14", "period": "week"}
+
+        with django_assert_num_queries(1):
+            response = self.client.get(self.url, params)
+
+        assert response.status_code == status.HTTP_200_OK
+        first, second = response.data["buckets"]
+        assert first == {
+            "start": date(2024, 1, 1),
+            "completed": 4,
+            "expected": 14,
+            "categories": {
+                "health": {"completed": 4, "expected": 7},
+                "learning": {"completed": 0, "expected": 7},
+            },
+            "rate": 28.6,
+        }
+        assert (second["completed"], second["expected"]) == (3, 14)
+
+    def test_daily_trends_include_empty_days(self):
+        """Test that days before any habit started have no rate."""
+        params = {"from": "2023-12-30", "to": "2024-01-02"}
+
+        buckets = self.client.get(self.url, params).data["buckets"]
+
+        assert [bucket["rate"] for bucket in buckets] == [None, None, 50.0, 0.0]
+
+    def test_bad_period_is_rejected(self):
+        """Test that an unknown period returns 400."""
+        response = self.client.get(self.url, {"period": "year"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,112 @@
+"""
+Unit tests for synthetic data seeding and the seed_habits command.
+"""
+
+import pytest
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from core.models import UserProfile
+from habits.models import Habit, HabitLog, HabitStats, UserDailyRollup
+from habits.seeding import DEFAULT_PASSWORD, seed
+
+User = get_user_model()
+
+
+def log_rows(prefix):
+    """Return the seeded logs of ``prefix`` users as comparable tuples."""
+    return list(
+        HabitLog.objects.filter(user__username__startswith=prefix)
+        .order_by("user__username", "habit__name", "date")
+        .values_list("user__username", "habit__name", "date", "completed")
+    )
+
+
+@pytest.mark.django_db
+class TestSeed:
+    """Test the bulk seeding routine."""
+
+    def test_creates_users_profiles_habits_and_logs(self):
+        """Test row counts, shared password and streak habits."""
+        result = seed(3, 2, 10, density=0.5, streak_habits=1, chunk_size=2)
+
+        users = User.objects.filter(username__startswith="seed")
+        assert result[:3] == (3, 6, HabitLog.objects.count())
+        assert users.count() == 3
+        assert UserProfile.objects.filter(user__in=users).count() == 3
+        assert Habit.objects.count() == 6
+        assert users.first().check_password(DEFAULT_PASSWORD)
+        streak = HabitLog.objects.filter(habit__name="Habit 0")
+        assert streak.count() == 30
+        assert not streak.filter(completed=False).exists()
+        assert 30 < result.logs < 60
+        assert result.logs_per_second > 0
+
+    def test_same_seed_gives_same_rows(self):
+        """Test that the RNG makes runs reproducible."""
+        seed(2, 3, 20, prefix="first", rng_seed=7)
+        seed(2, 3, 20, prefix="second", rng_seed=7)
+        seed(2, 3, 20, prefix="third", rng_seed=8)
+
+        def rows(prefix):
+            return [row[1:] for row in log_rows(prefix)]
+
+        assert rows("first") == rows("second")
+        assert rows("first") != rows("third")
+
+    def test_derived_state_is_built(self):
+        """Test that stats and rollups exist despite skipped signals."""
+        seed(1, 2, 5, density=1.0, completion_rate=1.0)
+
+        assert HabitStats.objects.count() == 2
+        assert all(stats.current_streak == 5 for stats in HabitStats.objects.all())
+        assert UserDailyRollup.objects.count() == 5
+        assert UserDailyRollup.objects.filter(completed=2, expected=2).count() == 5
+
+    def test_skip_derived(self):
+        """Test that derived=False leaves derived tables empty."""
+        seed(1, 2, 5, derived=False)
+
+        assert not HabitStats.objects.exists()
+        assert not UserDailyRollup.objects.exists()
+
+
+@pytest.mark.django_db
+class TestSeedHabitsCommand:
+    """Test the seed_habits command."""
+
+    def test_seeds_and_reports_throughput(self):
+        """Test options are passed through and totals are reported."""
+        stdout = StringIO()
+
+        call_command(
+            "seed_habits",
+            "--users",
+            "2",
+            "--habits-per-user",
+            "3",
+            "--days",
+            "4",
+            "--density",
+            "1",
+            "--prefix",
+            "load",
+            stdout=stdout,
+        )
+
+        assert "Seeded 2 user(s), 6 habit(s) and 24 log(s)" in stdout.getvalue()
+        assert "logs/s" in stdout.getvalue()
+        assert User.objects.filter(username__startswith="load").count() == 2
+
+    def test_existing_prefix_is_rejected(self):
+        """Test that seeding twice with one prefix fails before writing."""
+        call_command("seed_habits", "--users", "1", "--days", "1", stdout=StringIO())
+
+        with pytest.raises(CommandError, match="already exist"):
+            call_command("seed_habits", "--users", "1", "--days", "1")
+
+    def test_invalid_density_is_rejected(self):
+        """Test that shares outside 0..1 are rejected."""
+        with pytest.raises(CommandError, match="Invalid share"):
+            call_command("seed_habits", "--density", "1.5")
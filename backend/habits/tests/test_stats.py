@@ -0,0 +1,162 @@
+"""
+Unit tests for the HabitStats summary table.
+Checks that ORM writes keep it equal to a full recomputation.
+"""
+
+import pytest
+from datetime import date, timedelta
+from django.contrib.auth import get_user_model
+from habits.models import Habit, HabitLog, HabitStats, HabitCategory, HabitFrequency
+
+User = get_user_model()
+
+
+def make_habit(user, name="Exercise"):
+    """Create a daily habit started 30 days ago."""
+    return Habit.objects.create(
+        user=user,
+        name=name,
+        category=HabitCategory.HEALTH,
+        frequency=HabitFrequency.DAILY,
+        goal_count=1,
+        start_date=date.today() - timedelta(days=30),
+    )
+
+
+def assert_fresh(habit):
+    """Assert the stored summary matches a recomputation from the logs."""
+    assert HabitStats.objects.verify([habit.pk]) == []
+
+
+@pytest.mark.django_db
+class TestHabitStatsMaintenance:
+    """Test HabitStats updates on HabitLog create, update and delete."""
+
+    def test_appending_logs_extends_current_run(self):
+        """Test that logging consecutive days grows the current streak."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        habit = make_habit(user)
+        today = date.today()
+
+        for i in range(3, -1, -1):
+            HabitLog.objects.create(
+                habit=habit, date=today - timedelta(days=i), completed=True
+            )
+
+        stats = HabitStats.objects.get(pk=habit.pk)
+        assert stats.total_logs == 4
+        assert stats.completed_logs == 4
+        assert stats.current_streak == 4
+        assert stats.longest_streak == 4
+        assert stats.current_run_start == today - timedelta(days=3)
+        assert stats.last_completed_date == today
+        assert_fresh(habit)
+
+    def test_incomplete_log_only_counts_total(self):
+        """Test that an incomplete log leaves runs untouched."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        habit = make_habit(user)
+        HabitLog.objects.create(habit=habit, date=date.today(), completed=False)
+
+        stats = HabitStats.objects.get(pk=habit.pk)
+        assert stats.total_logs == 1
+        assert stats.completed_logs == 0
+        assert stats.current_streak == 0
+        assert_fresh(habit)
+
+    def test_backfilled_log_joins_runs(self):
+        """Test that logging a missed past day merges the runs around it."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        habit = make_habit(user)
+        today = date.today()
+        for i in [0, 1, 3, 4]:
+            HabitLog.objects.create(
+                habit=habit, date=today - timedelta(days=i), completed=True
+            )
+        assert HabitStats.objects.get(pk=habit.pk).current_streak == 2
+
+        HabitLog.objects.create(
+            habit=habit, date=today - timedelta(days=2), completed=True
+        )
+
+        stats = HabitStats.objects.get(pk=habit.pk)
+        assert stats.current_streak == 5
+        assert stats.longest_streak == 5
+        assert_fresh(habit)
+
+    def test_updating_log_recomputes(self):
+        """Test that unmarking a completed day splits the run."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        habit = make_habit(user)
+        today = date.today()
+        logs = [
+            HabitLog.objects.create(
+                habit=habit, date=today - timedelta(days=i), completed=True
+            )
+            for i in range(5)
+        ]
+
+        logs[1].completed = False
+        logs[1].save()
+
+        stats = HabitStats.objects.get(pk=habit.pk)
+        assert stats.completed_logs == 4
+        assert stats.current_streak == 1
+        assert stats.longest_streak == 3
+        assert_fresh(habit)
+
+    def test_deleting_log_recomputes(self):
+        """Test that deleting today's log ends the current streak."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        habit = make_habit(user)
+        today = date.today()
+        HabitLog.objects.create(
+            habit=habit, date=today - timedelta(days=1), completed=True
+        )
+        log = HabitLog.objects.create(habit=habit, date=today, completed=True)
+
+        log.delete()
+
+        stats = HabitStats.objects.get(pk=habit.pk)
+        assert stats.total_logs == 1
+        assert stats.current_streak == 0
+        assert stats.longest_streak == 1
+        assert_fresh(habit)
+
+    def test_queryset_delete_recomputes(self):
+        """Test that bulk deletes through the ORM also refresh stats."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        habit = make_habit(user)
+        for i in range(3):
+            HabitLog.objects.create(
+                habit=habit, date=date.today() - timedelta(days=i), completed=True
+            )
+
+        HabitLog.objects.filter(habit=habit).delete()
+
+        stats = HabitStats.objects.get(pk=habit.pk)
+        assert stats.total_logs == 0
+        assert stats.last_completed_date is None
+        assert_fresh(habit)
+
+    def test_deleting_habit_removes_stats(self):
+        """Test that cascading a habit delete does not rebuild its stats."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        habit = make_habit(user)
+        HabitLog.objects.create(habit=habit, date=date.today(), completed=True)
+
+        habit.delete()
+
+        assert not HabitStats.objects.exists()
+
+    def test_for_habit_builds_missing_row(self):
+        """Test that stats are built on first access for existing history."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        habit = make_habit(user)
+        HabitLog.objects.create(habit=habit, date=date.today(), completed=True)
+        HabitStats.objects.all().delete()
+
+        stats = HabitStats.objects.for_habit(Habit.objects.get(pk=habit.pk))
+
+        assert stats.completed_logs == 1
+        assert HabitStats.objects.filter(pk=habit.pk).exists()
@@ -0,0 +1,174 @@
+"""
+Unit tests for the set-based streak engine.
+Covers the window-function query, the portable fallback and query cost.
+"""
+
+import time
+import pytest
+from datetime import date, timedelta
+from django.contrib.auth import get_user_model
+from django.db import connection
+from habits.models import Habit, HabitLog, HabitCategory, HabitFrequency
+from habits.streaks import NO_STREAKS, Streaks, get_streaks
+
+User = get_user_model()
+
+
+def make_habit(user, name="Exercise", days_ago=30):
+    """Create a daily habit started ``days_ago`` days before today."""
+    return Habit.objects.create(
+        user=user,
+        name=name,
+        category=HabitCategory.HEALTH,
+        frequency=HabitFrequency.DAILY,
+        goal_count=1,
+        start_date=date.today() - timedelta(days=days_ago),
+    )
+
+
+def log_days(habit, days_ago, completed=True):
+    """Bulk-create logs for the given offsets (in days before today)."""
+    today = date.today()
+    HabitLog.objects.bulk_create(
+        HabitLog(habit=habit, date=today - timedelta(days=d), completed=completed)
+        for d in days_ago
+    )
+
+
+@pytest.fixture(params=["window", "scan"])
+def engine(request, monkeypatch):
+    """Run a test against both the window-function query and the fallback."""
+    if request.param == "scan":
+        monkeypatch.setattr(connection.features, "supports_over_clause", False)
+    return request.param
+
+
+@pytest.mark.django_db
+class TestStreakEngine:
+    """Test current and longest streak computation."""
+
+    def test_current_and_longest_streak(self, engine):
+        """Test a current run and an older, longer run."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        habit = make_habit(user)
+        log_days(habit, [0, 1, 2])
+        log_days(habit, [10, 11, 12, 13, 14])
+
+        assert get_streaks([habit.id]) == {habit.id: Streaks(current=3, longest=5)}
+
+    def test_current_streak_zero_when_today_missing(self, engine):
+        """Test that a run ending yesterday is not a current streak."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        habit = make_habit(user)
+        log_days(habit, [1, 2, 3])
+
+        assert get_streaks([habit.id])[habit.id] == Streaks(current=0, longest=3)
+
+    def test_incomplete_logs_break_runs(self, engine):
+        """Test that logs marked incomplete do not count toward streaks."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        habit = make_habit(user)
+        log_days(habit, [0, 2, 3])
+        log_days(habit, [1], completed=False)
+
+        assert get_streaks([habit.id])[habit.id] == Streaks(current=1, longest=2)
+
+    def test_future_logs_do_not_extend_current_streak(self, engine):
+        """Test that the current streak counts back from today only."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        habit = make_habit(user)
+        log_days(habit, [-2, -1, 0, 1])
+
+        assert get_streaks([habit.id])[habit.id] == Streaks(current=2, longest=4)
+
+    def test_multiple_habits_in_one_call(self, engine):
+        """Test that runs are computed per habit, including habits without logs."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        first = make_habit(user, name="First")
+        second = make_habit(user, name="Second")
+        empty = make_habit(user, name="Empty")
+        log_days(first, [0, 1])
+        log_days(second, [0, 1, 2, 3])
+
+        assert get_streaks([first.id, second.id, empty.id]) == {
+            first.id: Streaks(current=2, longest=2),
+            second.id: Streaks(current=4, longest=4),
+            empty.id: NO_STREAKS,
+        }
+
+    def test_no_habits(self):
+        """Test that an empty id list needs no query."""
+        assert get_streaks([]) == {}
+
+    def test_single_query_regardless_of_streak_length(
+        self, engine, django_assert_num_queries
+    ):
+        """Test that query count does not grow with the streak."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        short = make_habit(user, name="Short")
+        long = make_habit(user, name="Long", days_ago=400)
+        log_days(short, range(5))
+        log_days(long, range(400))
+
+        with django_assert_num_queries(1):
+            get_streaks([short.id])
+        with django_assert_num_queries(1):
+            assert get_streaks([long.id])[long.id] == Streaks(400, 400)
+
+
+def legacy_current_streak(habit):
+    """Reference per-day loop the engine replaced (one query per streak day)."""
+    streak, current_date = 0, date.today()
+    while HabitLog.objects.filter(
+        habit=habit, date=current_date, completed=True
+    ).exists():
+        streak += 1
+        current_date -= timedelta(days=1)
+    return streak
+
+
+def median_latency(func, repeats=20):
+    """Return the median wall-clock time of ``func`` in seconds."""
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return sorted(samples)[len(samples) // 2]
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+class TestStreakEngineBenchmark:
+    """Benchmark streak latency as the streak grows (run with -m benchmark)."""
+
+    STREAK_LENGTHS = [10, 100, 400, 1000]
+
+    def test_latency_against_per_day_loop(self, engine):
+        """Test that the engine outpaces the per-day loop as streaks grow."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        timings = {}
+
+        for length in self.STREAK_LENGTHS:
+            habit = make_habit(user, name=f"Streak {length}", days_ago=length)
+            log_days(habit, range(length))
+            assert get_streaks([habit.pk])[habit.pk].current == legacy_current_streak(
+                habit
+            )
+            timings[length] = (
+                median_latency(lambda: get_streaks([habit.pk])),
+                median_latency(lambda: legacy_current_streak(habit), repeats=3),
+            )
+
+        print(f"\n{engine} streak engine vs per-day loop, median latency (ms):")
+        for length, (engine_seconds, legacy_seconds) in timings.items():
+            print(
+                f"  {length:>5} days: engine {engine_seconds * 1000:8.3f}"
+                f"  loop {legacy_seconds * 1000:9.3f}"
+            )
+
+        shortest, longest = self.STREAK_LENGTHS[0], self.STREAK_LENGTHS[-1]
+        engine_growth = timings[longest][0] / timings[shortest][0]
+        legacy_growth = timings[longest][1] / timings[shortest][1]
+        assert engine_growth < legacy_growth
+        assert timings[longest][0] * 10 < timings[longest][1]
@@ -0,0 +1,182 @@
+"""
+Unit tests for the delta sync feed and tombstones.
+"""
+
+import pytest
+from datetime import date, timedelta
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from habits.models import Habit, HabitLog, HabitFrequency, Tombstone
+from habits.sync import encode_cursor, get_changes
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestHabitSync:
+    """Test GET /api/habits/sync/."""
+
+    def setup_method(self):
+        """Create two habits with logs and a cursor past them."""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com"
+        )
+        self.habits = [
+            Habit.objects.create(
+                user=self.user,
+                name=name,
+                frequency=HabitFrequency.DAILY,
+                start_date=date.today() - timedelta(days=9),
+            )
+            for name in ("Exercise", "Read")
+        ]
+        self.logs = [
+            HabitLog.objects.create(
+                habit=habit, date=date.today() - timedelta(days=i), completed=True
+            )
+            for habit in self.habits
+            for i in range(10)
+        ]
+        self.cursor = get_changes(self.user)["cursor"]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("habits:habit-sync")
+
+    def test_full_sync_without_cursor(self):
+        """Test that the first sync returns every row and a cursor."""
+        response = self.client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["habits"]) == 2
+        assert len(response.data["logs"]) == 20
+        assert response.data["deleted"] == {"habits": [], "logs": []}
+        assert response.data["more"] is False
+        assert response.data["cursor"].split("-")[1] == self.cursor.split("-")[1]
+
+    def test_steady_state_sync_is_empty(self, django_assert_max_num_queries):
+        """Test that nothing changed means an empty payload in three queries."""
+        with django_assert_max_num_queries(3):
+            response = self.client.get(self.url, {"since": self.cursor})
+
+        assert response.data["habits"] == []
+        assert response.data["logs"] == []
+        assert response.data["deleted"] == {"habits": [], "logs": []}
+
+    def test_sync_returns_only_changes(self):
+        """Test that updates and deletions since the cursor are reported."""
+        changed = self.logs[0]
+        changed.notes = "Longer run"
+        changed.save()
+        deleted = self.logs[1]
+        deleted_id = deleted.pk
+        deleted.delete()
+
+        data = self.client.get(self.url, {"since": self.cursor}).data
+
+        assert data["habits"] == []
+        assert [log["id"] for log in data["logs"]] == [changed.pk]
+        assert data["logs"][0]["notes"] == "Longer run"
+        assert data["deleted"] == {"habits": [], "logs": [deleted_id]}
+
+    def test_changes_are_found_by_sequence_not_timestamp(self):
+        """Test that a write stamped before the cursor is still reported."""
+        changed = self.logs[2]
+        changed.completed = False
+        changed.save()
+        # As if its transaction committed long after updated_at was taken.
+        HabitLog.objects.filter(pk=changed.pk).update(
+            updated_at=timezone.now() - timedelta(hours=1)
+        )
+
+        data = self.client.get(self.url, {"since": self.cursor}).data
+
+        assert [log["id"] for log in data["logs"]] == [changed.pk]
+
+    def test_sync_pages_through_logs(self, settings):
+        """Test that pages chain through every log, including ones changed."""
+        settings.HABIT_SYNC_PAGE_SIZE = 6
+        data = self.client.get(self.url).data
+        seen, pages = [log["id"] for log in data["logs"]], 1
+        changed = self.logs[0]
+        changed.notes = "Changed while paging"
+        changed.save()
+        while data["more"]:
+            data = self.client.get(self.url, {"since": data["cursor"]}).data
+            seen += [log["id"] for log in data["logs"]]
+            pages += 1
+
+        assert pages == 4
+        assert sorted(set(seen)) == sorted(log.pk for log in self.logs)
+        assert seen[-1] == changed.pk
+        assert self.client.get(self.url, {"since": data["cursor"]}).data["logs"] == []
+
+    def test_habit_delete_leaves_one_tombstone(self):
+        """Test that cascaded logs are covered by their habit's tombstone."""
+        habit = self.habits[1]
+        habit_id = habit.pk
+        habit.delete()
+
+        data = self.client.get(self.url, {"since": self.cursor}).data
+
+        assert data["deleted"] == {"habits": [habit_id], "logs": []}
+        assert Tombstone.objects.count() == 1
+
+    def test_user_delete_leaves_no_tombstones(self):
+        """Test that deleting an account does not record its rows."""
+        self.user.delete()
+
+        assert not Tombstone.objects.exists()
+
+    def test_sync_is_scoped_to_user(self):
+        """Test that another user's changes never appear."""
+        other_user = User.objects.create_user(
+            username="otheruser", email="other@example.com"
+        )
+        Habit.objects.create(
+            user=other_user, name="Other", start_date=date.today()
+        ).delete()
+
+        data = self.client.get(self.url, {"since": self.cursor}).data
+
+        assert data["habits"] == []
+        assert data["deleted"] == {"habits": [], "logs": []}
+
+    def test_bad_cursors(self):
+        """Test that malformed cursors are rejected and old ones expire."""
+        expired = encode_cursor(0, issued=timezone.now() - timedelta(days=365))
+        timestamp_only = self.cursor.split("-")[0]
+
+        for cursor in ("abc", "1-2-3-4", "1--2"):
+            assert self.client.get(self.url, {"since": cursor}).status_code == 400
+        for cursor in (expired, timestamp_only, encode_cursor(10**6)):
+            assert (
+                self.client.get(self.url, {"since": cursor}).status_code
+                == status.HTTP_410_GONE
+            )
+
+
+@pytest.mark.django_db
+class TestPurgeTombstonesCommand:
+    """Test the purge_tombstones command."""
+
+    def test_purges_only_expired_tombstones(self):
+        """Test that tombstones past retention are deleted."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        Tombstone.objects.create(
+            user=user,
+            kind=Tombstone.HABIT,
+            object_id=1,
+            deleted_at=timezone.now() - timedelta(days=365),
+        )
+        Tombstone.objects.create(user=user, kind=Tombstone.HABIT, object_id=2)
+        stdout = StringIO()
+
+        call_command("purge_tombstones", stdout=stdout)
+
+        assert "Deleted 1 tombstone(s)" in stdout.getvalue()
+        assert list(Tombstone.objects.values_list("object_id", flat=True)) == [2]
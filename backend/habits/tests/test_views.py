@@ -6,10 +6,25 @@ Week 2: Tests for habit list, create, update, delete, daily tracking.
 import pytest
 from datetime import date, timedelta
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
-from habits.models import Habit, HabitLog, HabitCategory, HabitFrequency
+from habits.bitmaps import (
+    CompletionBitmap,
+    check_bitmaps,
+    compute_bitmaps,
+    rebuild_bitmaps,
+)
+from habits.models import (
+    Habit,
+    HabitLog,
+    HabitCategory,
+    HabitFrequency,
+    HabitStats,
+    UserDailyRollup,
+)
 
 User = get_user_model()
 
@@ -35,7 +50,7 @@ class TestHabitListView:
         response = client.get(reverse("habits:habit-list"))
 
         assert response.status_code == status.HTTP_200_OK
-        assert response.data["count"] == 1
+        assert len(response.data["results"]) == 1
         assert response.data["results"][0]["name"] == "Exercise"
 
     def test_list_habits_only_own(self):
@@ -65,9 +80,36 @@ class TestHabitListView:
         response = client.get(reverse("habits:habit-list"))
 
         assert response.status_code == status.HTTP_200_OK
-        assert response.data["count"] == 1
+        assert len(response.data["results"]) == 1
         assert response.data["results"][0]["name"] == "User1 Exercise"
 
+    def test_list_habits_query_count_independent_of_size(
+        self, django_assert_max_num_queries
+    ):
+        """Test that listing many habits with long streaks stays in budget."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        today = date.today()
+        for n in range(30):
+            habit = Habit.objects.create(
+                user=user,
+                name=f"Habit {n}",
+                frequency=HabitFrequency.DAILY,
+                start_date=today - timedelta(days=60),
+            )
+            HabitLog.objects.bulk_create(
+                HabitLog(habit=habit, date=today - timedelta(days=i), completed=True)
+                for i in range(60)
+            )
+        rebuild_bitmaps(Habit.objects.values_list("pk", flat=True))
+
+        client = APIClient()
+        client.force_authenticate(user=user)
+        with django_assert_max_num_queries(3):
+            response = client.get(reverse("habits:habit-list"))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["results"][0]["current_streak"] == 60
+
     def test_create_habit(self):
         """Test creating a new habit."""
         user = User.objects.create_user(username="testuser", email="test@example.com")
@@ -152,6 +194,39 @@ class TestHabitDetailView:
         assert habit.name == "Updated Exercise"
         assert habit.goal_count == 2
 
+    def test_update_responds_with_stats_of_the_saved_habit(self):
+        """Test that stats in an update response match the next GET."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        habit = Habit.objects.create(
+            user=user,
+            name="Exercise",
+            frequency=HabitFrequency.DAILY,
+            start_date=date.today() - timedelta(days=3),
+        )
+        for days_ago in (0, 1):
+            HabitLog.objects.create(
+                habit=habit,
+                date=date.today() - timedelta(days=days_ago),
+                completed=True,
+            )
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = reverse("habits:habit-detail", args=[habit.id])
+
+        response = client.patch(
+            url,
+            {"start_date": (date.today() - timedelta(days=1)).isoformat()},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["completion_rate"] == 100.0
+        response = client.patch(url, {"frequency": "weekly"}, format="json")
+        assert response.data["period_progress"]["period"] == "week"
+        fields = ["completion_rate", "current_streak", "longest_streak"]
+        fetched = client.get(url).data
+        assert [response.data[f] for f in fields] == [fetched[f] for f in fields]
+
     def test_delete_habit(self):
         """Test deleting a habit."""
         user = User.objects.create_user(username="testuser", email="test@example.com")
@@ -192,6 +267,121 @@ class TestHabitDetailView:
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
 
+@pytest.mark.django_db
+class TestHabitNestedLogs:
+    """Test the bounded logs window in habit detail and the logs sub-resource."""
+
+    def setup_method(self):
+        """Create a habit with a year of daily logs."""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com"
+        )
+        self.habit = Habit.objects.create(
+            user=self.user,
+            name="Exercise",
+            category=HabitCategory.HEALTH,
+            frequency=HabitFrequency.DAILY,
+            goal_count=1,
+            start_date=date.today() - timedelta(days=364),
+        )
+        HabitLog.objects.bulk_create(
+            HabitLog(
+                habit=self.habit, date=date.today() - timedelta(days=i), completed=True
+            )
+            for i in range(365)
+        )
+        rebuild_bitmaps([self.habit.pk])
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("habits:habit-detail", args=[self.habit.id])
+
+    def test_detail_nests_last_30_days_by_default(self):
+        """Test that only the default window of logs is embedded."""
+        response = self.client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK
+        dates = [log["date"] for log in response.data["logs"]]
+        assert len(dates) == 31
+        assert dates[0] == date.today().isoformat()
+        assert dates[-1] == (date.today() - timedelta(days=30)).isoformat()
+
+    def test_logs_since_and_limit(self):
+        """Test that logs_since and logs_limit move and narrow the window."""
+        since = date.today() - timedelta(days=200)
+
+        response = self.client.get(
+            self.url, {"logs_since": since.isoformat(), "logs_limit": 5}
+        )
+
+        assert [log["date"] for log in response.data["logs"]] == [
+            (date.today() - timedelta(days=i)).isoformat() for i in range(5)
+        ]
+
+    def test_invalid_window_is_rejected(self):
+        """Test that malformed window parameters return 400."""
+        response = self.client.get(
+            self.url, {"logs_since": "yesterday", "logs_limit": 10_000}
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert set(response.data) == {"logs_since", "logs_limit"}
+
+    def test_nested_logs_cost_one_query(self, django_assert_num_queries):
+        """Test that the window is prefetched for the habit in one query."""
+        # ETag aggregate, habit with stats, prefetched logs window.
+        with django_assert_num_queries(3):
+            response = self.client.get(self.url)
+
+        assert len(response.data["logs"]) == 31
+
+    def test_create_response_nests_empty_window(self):
+        """Test that a created habit reports its (empty) logs window."""
+        data = {
+            "name": "Read",
+            "category": HabitCategory.LEARNING,
+            "frequency": HabitFrequency.DAILY,
+            "goal_count": 1,
+            "start_date": date.today().isoformat(),
+        }
+
+        response = self.client.post(reverse("habits:habit-list"), data, format="json")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["logs"] == []
+
+    def test_logs_sub_resource_pages_full_history(self):
+        """Test that GET /api/habits/{id}/logs/ pages through every log."""
+        url = reverse("habits:habit-logs", args=[self.habit.id])
+
+        response = self.client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "count" not in response.data
+        assert len(response.data["results"]) == 20
+        assert response.data["results"][0]["date"] == date.today().isoformat()
+
+        dates = []
+        url += "?page_size=100"
+        while url:
+            page = self.client.get(url).data
+            dates.extend(log["date"] for log in page["results"])
+            url = page["next"]
+        assert len(dates) == len(set(dates)) == 365
+        assert dates == sorted(dates, reverse=True)
+
+    def test_logs_sub_resource_of_other_user_is_not_found(self):
+        """Test that the logs sub-resource checks habit ownership."""
+        other_user = User.objects.create_user(
+            username="otheruser", email="other@example.com"
+        )
+        client = APIClient()
+        client.force_authenticate(user=other_user)
+
+        response = client.get(reverse("habits:habit-logs", args=[self.habit.id]))
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
 @pytest.mark.django_db
 class TestHabitLogView:
     """Test habit logging endpoints."""
@@ -223,6 +413,53 @@ class TestHabitLogView:
         assert response.status_code == status.HTTP_201_CREATED
         assert HabitLog.objects.filter(habit=habit, completed=True).exists()
 
+    def test_logging_updates_derived_state_in_place(self, monkeypatch):
+        """Test that single logs keep stats, bitmaps and rollups exact."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        today = date.today()
+        habit = Habit.objects.create(
+            user=user, name="Exercise", start_date=today - timedelta(days=9)
+        )
+        url = reverse("habits:habit-log", args=[habit.id])
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("full refresh for a single log")
+
+        monkeypatch.setattr("habits.bulk.refresh_derived_state", fail)
+        for days_ago, completed in [
+            (3, True),
+            (2, False),
+            (2, True),
+            (1, True),
+            (1, True),
+            (1, False),
+            (5, True),
+        ]:
+            day = today - timedelta(days=days_ago)
+            response = client.post(
+                url, {"date": day.isoformat(), "completed": completed}, format="json"
+            )
+            assert response.status_code in (201, 200)
+
+        stored = HabitStats.objects.get(habit=habit)
+        expected = HabitStats.objects.compute([habit.pk])[habit.pk]
+        for field in HabitStats.SUMMARY_FIELDS:
+            assert getattr(stored, field) == getattr(expected, field)
+        habit.refresh_from_db()
+        assert (
+            CompletionBitmap.from_habit(habit) == compute_bitmaps([habit.pk])[habit.pk]
+        )
+        first, last = UserDailyRollup.objects.history_range([user.pk])
+        assert {
+            (rollup.date, rollup.completed, rollup.expected)
+            for rollup in UserDailyRollup.objects.filter(user=user)
+        } == {
+            (rollup.date, rollup.completed, rollup.expected)
+            for rollup in UserDailyRollup.objects.compute([user.pk], first, last)
+        }
+
     def test_update_habit_log(self):
         """Test updating habit log."""
         user = User.objects.create_user(username="testuser", email="test@example.com")
@@ -256,6 +493,62 @@ class TestHabitLogView:
         log.refresh_from_db()
         assert log.completed is True
 
+    def test_log_list_filters_on_owner_column(self):
+        """Test that listing logs does not join through habits."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        other_user = User.objects.create_user(
+            username="otheruser", email="other@example.com"
+        )
+        for owner in (user, other_user):
+            habit = Habit.objects.create(
+                user=owner,
+                name="Exercise",
+                category=HabitCategory.HEALTH,
+                frequency=HabitFrequency.DAILY,
+                goal_count=1,
+                start_date=date.today(),
+            )
+            HabitLog.objects.create(habit=habit, date=date.today(), completed=True)
+
+        client = APIClient()
+        client.force_authenticate(user=user)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse("habits:habitlog-list"))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [log["id"] for log in response.data["results"]] == list(
+            user.habit_logs.values_list("id", flat=True)
+        )
+        assert not any('"habits_habit"' in query["sql"] for query in queries)
+
+    def test_cannot_update_other_user_log(self):
+        """Test that another user's log is not found."""
+        owner = User.objects.create_user(username="owner", email="owner@example.com")
+        habit = Habit.objects.create(
+            user=owner,
+            name="Exercise",
+            category=HabitCategory.HEALTH,
+            frequency=HabitFrequency.DAILY,
+            goal_count=1,
+            start_date=date.today(),
+        )
+        log = HabitLog.objects.create(habit=habit, date=date.today(), completed=True)
+        intruder = User.objects.create_user(
+            username="intruder", email="intruder@example.com"
+        )
+
+        client = APIClient()
+        client.force_authenticate(user=intruder)
+        response = client.patch(
+            reverse("habits:habitlog-detail", args=[log.id]),
+            {"completed": False},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        log.refresh_from_db()
+        assert log.completed is True
+
 
 @pytest.mark.django_db
 class TestHabitStatsView:
@@ -289,3 +582,432 @@ class TestHabitStatsView:
         assert response.data["current_streak"] == 3
         assert response.data["longest_streak"] == 3
         assert "completion_rate" in response.data
+
+    def test_stats_query_count_independent_of_history(self, django_assert_num_queries):
+        """Test that stats are a single lookup no matter how long the history."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        habit = Habit.objects.create(
+            user=user,
+            name="Exercise",
+            category=HabitCategory.HEALTH,
+            frequency=HabitFrequency.DAILY,
+            goal_count=1,
+            start_date=date.today() - timedelta(days=399),
+        )
+        for i in range(400):
+            HabitLog.objects.create(
+                habit=habit, date=date.today() - timedelta(days=i), completed=True
+            )
+
+        client = APIClient()
+        client.force_authenticate(user=user)
+        with django_assert_num_queries(1):
+            response = client.get(reverse("habits:habit-stats", args=[habit.id]))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["current_streak"] == 400
+        assert response.data["completion_rate"] == 100.0
+
+    def test_weekly_habit_stats_report_period_progress(self):
+        """Test that weekly habits report progress against goal_count."""
+        user = User.objects.create_user(username="testuser", email="test@example.com")
+        habit = Habit.objects.create(
+            user=user,
+            name="Gym",
+            category=HabitCategory.HEALTH,
+            frequency=HabitFrequency.WEEKLY,
+            goal_count=3,
+            start_date=date.today() - timedelta(days=30),
+        )
+        HabitLog.objects.create(habit=habit, date=date.today(), completed=True)
+
+        client = APIClient()
+        client.force_authenticate(user=user)
+        response = client.get(reverse("habits:habit-stats", args=[habit.id]))
+
+        assert response.status_code == status.HTTP_200_OK
+        progress = response.data["period_progress"]
+        assert progress["period"] == "week"
+        assert progress["completed"] == 1
+        assert progress["goal"] == 3
+        assert progress["met"] is False
+        assert response.data["current_streak"] == 0
+
+
+@pytest.mark.django_db
+class TestHabitCheckInView:
+    """Test POST /api/habits/check-in/ bulk logging."""
+
+    def setup_method(self):
+        """Create a user with twelve daily habits."""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com"
+        )
+        self.habits = [
+            Habit.objects.create(
+                user=self.user,
+                name=f"Habit {i}",
+                category=HabitCategory.HEALTH,
+                frequency=HabitFrequency.DAILY,
+                goal_count=1,
+                start_date=date.today() - timedelta(days=5),
+            )
+            for i in range(12)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("habits:habit-check-in")
+
+    def entries(self, habits, day=None, **fields):
+        """Build one check-in entry per habit."""
+        day = (day or date.today()).isoformat()
+        return [{"habit": habit.id, "date": day, **fields} for habit in habits]
+
+    def test_check_in_creates_logs_and_refreshes_stats(
+        self, django_capture_on_commit_callbacks
+    ):
+        """Test that a batch writes every log and updates derived stats."""
+        stats_url = reverse("habits:habit-stats", args=[self.habits[0].id])
+        assert self.client.get(stats_url).data["current_streak"] == 0
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = self.client.post(
+                self.url, self.entries(self.habits), format="json"
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["created"] == 12
+        assert [r["status"] for r in response.data["results"]] == ["created"] * 12
+        assert HabitLog.objects.filter(user=self.user, completed=True).count() == 12
+        assert self.client.get(stats_url).data["current_streak"] == 1
+        habit = Habit.objects.with_stats().get(pk=self.habits[0].pk)
+        assert habit.current_streak == 1
+
+    def test_check_in_locks_habits_before_reading_existing_logs(self, monkeypatch):
+        """Test that concurrent check-ins cannot both see a day as unlogged."""
+        # SQLite has no FOR UPDATE; record it where PostgreSQL would get it.
+        monkeypatch.setattr(connection.features, "has_select_for_update", True)
+        statements = []
+
+        def strip_for_update(execute, sql, params, many, context):
+            statements.append(sql)
+            return execute(sql.replace(" FOR UPDATE", ""), params, many, context)
+
+        with connection.execute_wrapper(strip_for_update):
+            response = self.client.post(
+                self.url, self.entries(self.habits[:2]), format="json"
+            )
+
+        assert response.data["created"] == 2
+        locked = next(i for i, sql in enumerate(statements) if "FOR UPDATE" in sql)
+        read = next(i for i, sql in enumerate(statements) if "habits_habitlog" in sql)
+        assert '"habits_habit"' in statements[locked] and locked < read
+
+    def test_check_in_updates_existing_log(self):
+        """Test that an entry for an already logged day updates that log."""
+        log = HabitLog.objects.create(
+            habit=self.habits[0], date=date.today(), completed=True
+        )
+
+        response = self.client.post(
+            self.url,
+            self.entries(self.habits[:1], completed=False, notes="Skipped"),
+            format="json",
+        )
+
+        assert response.data["updated"] == 1
+        assert response.data["results"][0]["id"] == log.id
+        log.refresh_from_db()
+        assert log.completed is False
+        assert log.notes == "Skipped"
+        assert self.habits[0].stats.completed_logs == 0
+
+    def test_check_in_updates_derived_state_in_place(self, monkeypatch):
+        """Test that batches keep derived state exact without full rebuilds."""
+        habits = self.habits[:3]
+        HabitLog.objects.create(
+            habit=habits[0], date=date.today() - timedelta(days=2), completed=True
+        )
+
+        def fail(*args, **kwargs):
+            raise AssertionError("full rebuild for a check-in")
+
+        monkeypatch.setattr("habits.bulk.refresh_derived_state", fail)
+        monkeypatch.setattr(HabitStats.objects, "rebuild", fail)
+        for days_ago, completed in [(1, True), (0, True), (1, False), (3, True)]:
+            day = date.today() - timedelta(days=days_ago)
+            response = self.client.post(
+                self.url,
+                self.entries(habits, day=day, completed=completed),
+                format="json",
+            )
+            assert response.status_code == status.HTTP_200_OK
+
+        habit_ids = [habit.pk for habit in habits]
+        assert HabitStats.objects.verify(habit_ids) == []
+        assert check_bitmaps(habit_ids) == []
+        first, last = UserDailyRollup.objects.history_range([self.user.pk])
+        assert {
+            (rollup.date, rollup.completed, rollup.expected)
+            for rollup in UserDailyRollup.objects.filter(user=self.user)
+        } == {
+            (rollup.date, rollup.completed, rollup.expected)
+            for rollup in UserDailyRollup.objects.compute([self.user.pk], first, last)
+        }
+
+    def test_check_in_query_count_independent_of_batch_size(
+        self, django_assert_max_num_queries
+    ):
+        """Test that twelve habits cost no more queries than two."""
+        with CaptureQueriesContext(connection) as small:
+            self.client.post(self.url, self.entries(self.habits[:2]), format="json")
+
+        yesterday = date.today() - timedelta(days=1)
+        with django_assert_max_num_queries(len(small)):
+            response = self.client.post(
+                self.url, self.entries(self.habits, day=yesterday), format="json"
+            )
+
+        assert response.data["created"] == 12
+
+    def test_check_in_reports_invalid_entries(self):
+        """Test that bad entries are reported while the rest are written."""
+        other_user = User.objects.create_user(
+            username="otheruser", email="other@example.com"
+        )
+        other_habit = Habit.objects.create(
+            user=other_user,
+            name="Other",
+            category=HabitCategory.HEALTH,
+            frequency=HabitFrequency.DAILY,
+            goal_count=1,
+            start_date=date.today(),
+        )
+        entries = self.entries([self.habits[0], other_habit, self.habits[0]])
+        entries.append({"habit": self.habits[1].id, "date": "not-a-date"})
+
+        response = self.client.post(self.url, entries, format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert (response.data["created"], response.data["failed"]) == (1, 3)
+        results = response.data["results"]
+        assert [r["index"] for r in results] == [0, 1, 2, 3]
+        assert [r["status"] for r in results] == [
+            "created",
+            "error",
+            "error",
+            "error",
+        ]
+        assert "habit" in results[1]["errors"]
+        assert "date" in results[3]["errors"]
+        assert not HabitLog.objects.filter(habit=other_habit).exists()
+
+    def test_check_in_requires_a_list(self):
+        """Test that a non-list or empty body is rejected."""
+        for body in [{"habit": self.habits[0].id}, []]:
+            response = self.client.post(self.url, body, format="json")
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestHabitLogUpsert:
+    """Test upsert and Idempotency-Key handling of POST /api/habits/{id}/log/."""
+
+    def setup_method(self):
+        """Create a user with one daily habit."""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com"
+        )
+        self.habit = Habit.objects.create(
+            user=self.user,
+            name="Exercise",
+            category=HabitCategory.HEALTH,
+            frequency=HabitFrequency.DAILY,
+            goal_count=1,
+            start_date=date.today(),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("habits:habit-log", args=[self.habit.id])
+        self.data = {"date": date.today().isoformat(), "completed": True}
+
+    def test_logging_same_day_twice_updates_the_log(self):
+        """Test that a repeated log is an update, not an IntegrityError."""
+        first = self.client.post(self.url, self.data, format="json")
+        second = self.client.post(
+            self.url, {**self.data, "completed": False}, format="json"
+        )
+
+        assert first.status_code == status.HTTP_201_CREATED
+        assert second.status_code == status.HTTP_200_OK
+        assert second.data["id"] == first.data["id"]
+        assert second.data["created_at"] == first.data["created_at"]
+        log = HabitLog.objects.get(habit=self.habit)
+        assert log.completed is False
+        self.habit.refresh_from_db()
+        assert self.habit.stats.completed_logs == 0
+        assert self.habit.calculate_current_streak() == 0
+
+    def test_retry_with_idempotency_key_is_replayed_from_cache(
+        self, django_assert_num_queries
+    ):
+        """Test that a retried request costs no database queries."""
+        first = self.client.post(
+            self.url, self.data, format="json", HTTP_IDEMPOTENCY_KEY="abc-123"
+        )
+
+        with django_assert_num_queries(0):
+            retry = self.client.post(
+                self.url, self.data, format="json", HTTP_IDEMPOTENCY_KEY="abc-123"
+            )
+
+        assert retry.status_code == status.HTTP_201_CREATED
+        assert retry.data == first.data
+        assert retry["Idempotent-Replayed"] == "true"
+        assert HabitLog.objects.filter(habit=self.habit).count() == 1
+
+    def test_idempotency_key_reused_for_other_request_is_rejected(self):
+        """Test that one key cannot be replayed for a different body."""
+        self.client.post(
+            self.url, self.data, format="json", HTTP_IDEMPOTENCY_KEY="abc-123"
+        )
+
+        response = self.client.post(
+            self.url,
+            {**self.data, "completed": False},
+            format="json",
+            HTTP_IDEMPOTENCY_KEY="abc-123",
+        )
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert HabitLog.objects.get(habit=self.habit).completed is True
+
+    def test_idempotency_keys_are_per_user(self):
+        """Test that another user's key never replays this user's response."""
+        self.client.post(
+            self.url, self.data, format="json", HTTP_IDEMPOTENCY_KEY="abc-123"
+        )
+        other_user = User.objects.create_user(
+            username="otheruser", email="other@example.com"
+        )
+        client = APIClient()
+        client.force_authenticate(user=other_user)
+
+        response = client.post(
+            self.url, self.data, format="json", HTTP_IDEMPOTENCY_KEY="abc-123"
+        )
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_failed_requests_are_not_stored(self):
+        """Test that a retry after a validation error is processed again."""
+        bad = self.client.post(
+            self.url, {"date": "bad"}, format="json", HTTP_IDEMPOTENCY_KEY="k"
+        )
+        good = self.client.post(
+            self.url, self.data, format="json", HTTP_IDEMPOTENCY_KEY="k"
+        )
+
+        assert bad.status_code == status.HTTP_400_BAD_REQUEST
+        assert good.status_code == status.HTTP_201_CREATED
+
+
+@pytest.mark.django_db
+class TestHabitTodayView:
+    """Test GET /api/habits/today/."""
+
+    def setup_method(self):
+        """Create an authenticated client."""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("habits:habit-today")
+
+    def make_habits(self, count, frequency=HabitFrequency.DAILY, **fields):
+        """Create ``count`` habits logged for the last three days."""
+        habits = [
+            Habit.objects.create(
+                user=self.user,
+                name=f"{frequency} {i}",
+                category=HabitCategory.HEALTH,
+                frequency=frequency,
+                goal_count=1,
+                start_date=date.today() - timedelta(days=10),
+                **fields,
+            )
+            for i in range(count)
+        ]
+        for habit in habits:
+            for days_ago in range(3):
+                HabitLog.objects.create(
+                    habit=habit,
+                    date=date.today() - timedelta(days=days_ago),
+                    completed=True,
+                )
+        return habits
+
+    def test_today_lists_active_habits_with_status(self):
+        """Test that each active habit carries today's log and streak."""
+        done = self.make_habits(1)[0]
+        pending = Habit.objects.create(
+            user=self.user,
+            name="Read",
+            frequency=HabitFrequency.DAILY,
+            start_date=date.today(),
+        )
+        self.make_habits(1, is_active=False)
+
+        response = self.client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK
+        by_id = {habit["id"]: habit for habit in response.data}
+        assert set(by_id) == {done.id, pending.id}
+        assert by_id[done.id]["today"]["completed"] is True
+        assert by_id[done.id]["current_streak"] == 3
+        assert by_id[done.id]["period_progress"]["met"] is True
+        assert by_id[pending.id]["today"] is None
+        assert by_id[pending.id]["current_streak"] == 0
+
+    def test_streak_not_done_today_matches_stats(self):
+        """Test that /today/ and /stats/ agree for a habit not yet done today."""
+        habit = Habit.objects.create(
+            user=self.user,
+            name="Exercise",
+            frequency=HabitFrequency.DAILY,
+            start_date=date.today() - timedelta(days=5),
+        )
+        for days_ago in (1, 2):
+            HabitLog.objects.create(
+                habit=habit,
+                date=date.today() - timedelta(days=days_ago),
+                completed=True,
+            )
+
+        today = self.client.get(self.url).data[0]
+        stats = self.client.get(reverse("habits:habit-stats", args=[habit.id])).data
+
+        assert today["current_streak"] == stats["current_streak"] == 0
+        assert today["period_progress"]["met"] is False
+
+    def test_today_excludes_other_users(self):
+        """Test that only the requesting user's habits are listed."""
+        other_user = User.objects.create_user(
+            username="otheruser", email="other@example.com"
+        )
+        Habit.objects.create(user=other_user, name="Other", start_date=date.today())
+
+        assert self.client.get(self.url).data == []
+
+    @pytest.mark.parametrize("count", [2, 15])
+    def test_today_query_budget(self, count, django_assert_num_queries):
+        """Test that the dashboard takes two queries at any size."""
+        self.make_habits(count)
+        self.make_habits(count, frequency=HabitFrequency.WEEKLY)
+
+        # Habits with their bitmaps, then today's logs.
+        with django_assert_num_queries(2):
+            response = self.client.get(self.url)
+
+        assert len(response.data) == 2 * count
@@ -0,0 +1,53 @@
+"""
+Completion trends for habits app.
+Buckets a user's UserDailyRollup rows by day, ISO week or calendar month,
+so a trend costs one query over O(days) rows however many logs it covers.
+"""
+
+from datetime import date
+from typing import List
+
+from habits.models import UserDailyRollup
+from habits.periods import PERIOD_NAMES, next_period_start, period_start
+
+PERIOD_FREQUENCIES = {name: frequency for frequency, name in PERIOD_NAMES.items()}
+
+
+def get_trends(user, start: date, end: date, period: str = "day") -> List[dict]:
+    """
+    Return one bucket per period from ``start`` to ``end`` with completed
+    and expected counts, completion rate and a per-category breakdown.
+    Periods without rollups are included with zero counts.
+    """
+    frequency = PERIOD_FREQUENCIES[period]
+    buckets = {}
+    bucket = period_start(start, frequency)
+    while bucket <= end:
+        buckets[bucket] = {"completed": 0, "expected": 0, "categories": {}}
+        bucket = next_period_start(bucket, frequency)
+
+    rows = UserDailyRollup.objects.filter(
+        user=user, date__range=(start, end)
+    ).values_list("date", "completed", "expected", "categories")
+    for day, completed, expected, categories in rows:
+        totals = buckets[period_start(day, frequency)]
+        totals["completed"] += completed
+        totals["expected"] += expected
+        for category, counts in categories.items():
+            bucket_counts = totals["categories"].setdefault(
+                category, {"completed": 0, "expected": 0}
+            )
+            bucket_counts["completed"] += counts["completed"]
+            bucket_counts["expected"] += counts["expected"]
+
+    return [
+        {"start": bucket, **totals, "rate": _rate(totals)}
+        for bucket, totals in buckets.items()
+    ]
+
+
+def _rate(totals):
+    """Completion percentage of a bucket, or None when nothing was expected."""
+    if not totals["expected"]:
+        return None
+    return round(totals["completed"] / totals["expected"] * 100, 1)
@@ -3,36 +3,127 @@ API views for habit tracking endpoints.
 Provides CRUD operations for habits and habit logging.
 """
 
+import io
+import re
+from collections import Counter
+from datetime import date
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.conf import settings
+from django.db.models import Count, Max
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from habits.models import Habit, HabitLog
+from django.utils.cache import patch_vary_headers
+from habits import cache as stats_cache
+from habits import exporters, idempotency, importers, sync, trends
+from habits.bitmaps import completion_matrix
+from habits.bulk import CREATED, ERROR, UPDATED, EntryResult, upsert_logs
+from habits.conditional import ConditionalGetMixin
+from habits.exporters import ExportContentNegotiation
+from habits.models import Habit, HabitFrequency, HabitLog, HabitStats
+from habits.pagination import HabitCursorPagination, HabitLogCursorPagination
+from habits.permissions import IsOwner
+from habits.periods import daily_period_stats, get_period_stats
+from habits.streaks import Streaks
 from habits.serializers import (
+    CheckInEntrySerializer,
     HabitSerializer,
     HabitListSerializer,
     HabitLogSerializer,
+    TodayHabitSerializer,
+    get_logs_window,
+    get_matrix_params,
+    get_trends_params,
 )
 
+# Same test Django's GZipMiddleware applies to Accept-Encoding.
+ACCEPTS_GZIP = re.compile(r"\bgzip\b")
+
 
-class HabitViewSet(viewsets.ModelViewSet):
+class HabitViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Habit CRUD operations.
-    - List: GET /api/habits/ (user's habits only)
+    - List: GET /api/habits/ (user's habits only, cursor-paginated)
     - Create: POST /api/habits/
     - Retrieve: GET /api/habits/{id}/
     - Update: PUT/PATCH /api/habits/{id}/
     - Delete: DELETE /api/habits/{id}/
     - Log: POST /api/habits/{id}/log/
+    - Check-in: POST /api/habits/check-in/ (many habits in one request)
+    - Import: POST /api/habits/import/ (CSV, NDJSON or Loop export upload)
+    - Export: GET /api/habits/export/?format=ndjson|csv (streamed)
+    - Sync: GET /api/habits/sync/?since=<cursor> (changes since cursor)
+    - Today: GET /api/habits/today/ (active habits with today's status)
+    - Matrix: GET /api/habits/matrix/?from=&to=&habits= (packed heatmap)
+    - Trends: GET /api/habits/trends/?from=&to=&period=day|week|month
+    - Logs: GET /api/habits/{id}/logs/ (cursor-paginated full history)
     - Stats: GET /api/habits/{id}/stats/
+
+    List, retrieve and stats responses carry an ETag and answer a matching
+    If-None-Match with 304 Not Modified.
     """
 
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsOwner]
+    pagination_class = HabitCursorPagination
+    # Numeric ids only, so /api/habits/logs/ reaches HabitLogViewSet.
+    lookup_value_regex = r"\d+"
+
+    # Actions whose responses include streaks, counts or completion rate.
+    # Updates are left out: values computed before the save would be stale,
+    # so HabitSerializer computes them from the saved habit instead.
+    stats_actions = {"list", "retrieve"}
+    # Actions whose responses nest a window of recent logs.
+    nested_logs_actions = {"retrieve", "update", "partial_update"}
 
     def get_queryset(self):
-        """Return only the current user's habits."""
-        return Habit.objects.filter(user=self.request.user)
+        """Return only the current user's habits, with stats where needed."""
+        queryset = Habit.objects.filter(user=self.request.user)
+        if self.action in self.stats_actions:
+            queryset = queryset.with_stats()
+        elif self.action == "stats":
+            queryset = queryset.select_related("stats")
+        if self.action in self.nested_logs_actions:
+            queryset = queryset.with_recent_logs(*self.get_logs_window())
+        return queryset
+
+    def get_logs_window(self):
+        """Return (since, limit) for nested logs from logs_since/logs_limit."""
+        if not hasattr(self, "_logs_window"):
+            self._logs_window = get_logs_window(self.request.query_params)
+        return self._logs_window
+
+    def get_serializer_context(self):
+        """Pass the nested logs window to HabitSerializer."""
+        context = super().get_serializer_context()
+        if self.action in self.nested_logs_actions | {"create"}:
+            context["logs_window"] = self.get_logs_window()
+        return context
+
+    def get_etag_validators(self):
+        """Validate habits and their logs with one aggregate, stats by version."""
+        pk = self.kwargs.get("pk")
+        if self.detail and not str(pk).isdigit():
+            return None
+        if self.action == "stats":
+            return stats_cache.get_version(int(pk))
+
+        habits = Habit.objects.filter(user=self.request.user)
+        if self.detail:
+            habits = habits.filter(pk=pk)
+        validators = habits.aggregate(
+            habit_count=Count("id", distinct=True),
+            habits_updated=Max("updated_at"),
+            log_count=Count("logs", distinct=True),
+            logs_updated=Max("logs__updated_at"),
+        )
+        if self.detail and not validators["habit_count"]:
+            # Missing or not the user's: leave the 404 to get_object().
+            return None
+        return tuple(validators.values())
 
     def get_serializer_class(self):
         """Use list serializer for list view, full serializer for detail views."""
@@ -44,7 +135,9 @@ class HabitViewSet(viewsets.ModelViewSet):
         """Set the user when creating a habit."""
         serializer.save(user=self.request.user)
 
-    @action(detail=True, methods=["post"], permission_classes=[IsAuthenticated])
+    @action(
+        detail=True, methods=["post"], permission_classes=[IsAuthenticated, IsOwner]
+    )
     def log(self, request, pk=None):
         """
         Log a habit completion.
@@ -56,16 +149,358 @@ class HabitViewSet(viewsets.ModelViewSet):
             "completed": true,
             "notes": "Optional notes"
         }
+
+        Logging a day that already has a log updates it (200) instead of
+        failing; a new log returns 201. Requests carrying an Idempotency-Key
+        header are answered from the stored response when retried.
         """
-        habit = self.get_object()
+        key = idempotency.get_key(request)
+        if key is not None:
+            request_fingerprint = idempotency.fingerprint(request, "log", pk)
+            replayed = idempotency.replay(request, key, request_fingerprint)
+            if replayed is not None:
+                return replayed
+
         serializer = HabitLogSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        entry = {
+            "habit": int(pk),
+            "date": serializer.validated_data["date"],
+            "completed": serializer.validated_data.get("completed", False),
+            "notes": serializer.validated_data.get("notes", ""),
+        }
+        (result,) = upsert_logs(request.user, [entry])
+        if result.status == ERROR:
+            raise Http404
+        if result.status == CREATED:
+            log, status_code = result.log, status.HTTP_201_CREATED
+        else:
+            # The upsert only returns the id; read back the stored row.
+            log, status_code = (
+                HabitLog.objects.get(pk=result.log.pk),
+                status.HTTP_200_OK,
+            )
+
+        response = Response(HabitLogSerializer(log).data, status=status_code)
+        if key is not None:
+            idempotency.store(request, key, request_fingerprint, response)
+        return response
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="check-in",
+        url_name="check-in",
+        permission_classes=[IsAuthenticated],
+    )
+    def check_in(self, request):
+        """
+        Log many habits in one request, creating or updating each day's log.
+        POST /api/habits/check-in/
+
+        Request body:
+        [
+            {"habit": 1, "date": "2024-01-15", "completed": true, "notes": ""},
+            {"habit": 2, "date": "2024-01-15"}
+        ]
+
+        Returns per-entry results in request order:
+        {
+            "created": 1,
+            "updated": 0,
+            "failed": 1,
+            "results": [
+                {"index": 0, "status": "created", "id": 7, "habit": 1, ...},
+                {"index": 1, "status": "error", "errors": {"habit": [...]}}
+            ]
+        }
+
+        Invalid entries are reported without failing the rest of the batch.
+        """
+        entries = request.data
+        max_entries = settings.HABIT_CHECK_IN_MAX_ENTRIES
+        if not isinstance(entries, list) or not 0 < len(entries) <= max_entries:
+            return Response(
+                {
+                    "non_field_errors": [
+                        f"Expected a list of 1 to {max_entries} check-in entries."
+                    ]
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = [None] * len(entries)
+        valid, positions = [], []
+        for index, entry in enumerate(entries):
+            serializer = CheckInEntrySerializer(data=entry)
+            if serializer.is_valid():
+                valid.append(serializer.validated_data)
+                positions.append(index)
+            else:
+                results[index] = EntryResult(index, ERROR, errors=serializer.errors)
+        for index, result in zip(positions, upsert_logs(request.user, valid)):
+            results[index] = result._replace(index=index)
+
+        summary = Counter(result.status for result in results)
+        return Response(
+            {
+                "created": summary[CREATED],
+                "updated": summary[UPDATED],
+                "failed": summary[ERROR],
+                "results": [result.as_dict() for result in results],
+            }
+        )
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        url_name="import",
+        parser_classes=[MultiPartParser],
+        permission_classes=[IsAuthenticated],
+    )
+    def import_logs(self, request):
+        """
+        Import log history from an uploaded file.
+        POST /api/habits/import/ (multipart/form-data)
+
+        Fields: file, plus optional format ("csv", "ndjson" or "loop",
+        inferred from the file name otherwise) and on_conflict ("update" or
+        "skip"). Habits are matched by name and created when missing.
+        Returns the import totals, e.g.
+        {"rows": 1825, "logs": 1825, "skipped": 0, "habits_created": 5, ...}
+
+        Rows are committed in chunks: a file that turns out not to be UTF-8
+        partway returns 400 with the number of rows already imported.
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response(
+                {"file": ["No file was submitted."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            fmt, on_conflict = importers.parse_options(
+                request.data.get("format"),
+                request.data.get("on_conflict", "update"),
+                upload.name,
+            )
+        except ValueError as error:
+            return Response(
+                {"non_field_errors": [str(error)]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        try:
+            result = importers.import_logs(
+                request.user, stream, fmt=fmt, on_conflict=on_conflict
+            )
+        except importers.ImportInterrupted as interrupted:
+            if not isinstance(interrupted.error, UnicodeDecodeError):
+                raise
+            return Response(
+                {
+                    "file": ["The file is not UTF-8 encoded text."],
+                    "rows_imported": interrupted.rows,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(result.as_dict())
+
+    @action(
+        detail=False,
+        methods=["get"],
+        content_negotiation_class=ExportContentNegotiation,
+        permission_classes=[IsAuthenticated],
+    )
+    def export(self, request):
+        """
+        Stream every habit and log of the user.
+        GET /api/habits/export/?format=ndjson|csv
+
+        NDJSON (default) holds habit and log lines, CSV one row per log.
+        The body is gzip-compressed while streaming when the client sends
+        Accept-Encoding: gzip.
+        """
+        fmt = request.query_params.get("format", "ndjson")
+        if fmt not in exporters.FORMATS:
+            return Response(
+                {"format": [f"Choose one of: {', '.join(exporters.FORMATS)}."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        compress = bool(ACCEPTS_GZIP.search(request.headers.get("Accept-Encoding", "")))
+        response = StreamingHttpResponse(
+            exporters.encode(exporters.export_lines(request.user, fmt), compress),
+            content_type=exporters.FORMATS[fmt],
+        )
+        if compress:
+            response["Content-Encoding"] = "gzip"
+        patch_vary_headers(response, ["Accept-Encoding"])
+        response["Content-Disposition"] = (
+            f'attachment; filename="habits-{date.today().isoformat()}.{fmt}"'
+        )
+        return response
+
+    @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated])
+    def today(self, request):
+        """
+        Get every active habit with today's log, streak and period progress.
+        GET /api/habits/today/
 
-        if serializer.is_valid():
-            serializer.save(habit=habit)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        Returns a list, e.g.
+        [
+            {
+                "id": 1,
+                "name": "Exercise",
+                ...,
+                "current_streak": 3,
+                "period_progress": {...},
+                "today": {"id": 7, "date": "2024-01-15", "completed": true, ...}
+            }
+        ]
 
-    @action(detail=True, methods=["get"], permission_classes=[IsAuthenticated])
+        "today" is null for habits not logged yet today. The response takes
+        two queries however many habits the user has and however long their
+        histories are.
+        """
+        habits = (
+            Habit.objects.filter(user=request.user, is_active=True)
+            .with_streaks()
+            .with_day_log(date.today())
+        )
+        return Response(TodayHabitSerializer(habits, many=True).data)
+
+    @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated])
+    def matrix(self, request):
+        """
+        Get a habit x date completion matrix for heatmaps.
+        GET /api/habits/matrix/?from=2024-01-01&to=2024-12-31&habits=1,2
+
+        Returns:
+        {
+            "from": "2024-01-01",
+            "to": "2024-12-31",
+            "days": 366,
+            "encoding": "bits",
+            "habits": [
+                {"id": 1, "name": "Exercise", "completed": 200, "bits": "t9u..."}
+            ]
+        }
+
+        "bits" is base64 of a little-endian bitmap, bit 0 being "from";
+        with ?encoding=runs each habit has "runs" instead, alternating
+        missed and completed run lengths starting with a missed run. The
+        range defaults to the year ending today. The matrix comes from the
+        stored completion bitmaps in one query, so a year of 30 habits is a
+        few KB rather than thousands of log objects.
+        """
+        start, end, habit_ids, encoding = get_matrix_params(request.query_params)
+        habits = (
+            Habit.objects.filter(user=request.user)
+            .only("id", "name", "completion_bits", "completion_bits_origin")
+            .order_by("id")
+        )
+        if habit_ids is not None:
+            habits = habits.filter(pk__in=habit_ids)
+        return Response(
+            {
+                "from": start,
+                "to": end,
+                "days": (end - start).days + 1,
+                "encoding": encoding,
+                "habits": completion_matrix(habits, start, end, encoding),
+            }
+        )
+
+    @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated])
+    def trends(self, request):
+        """
+        Get completed and expected habit counts over time.
+        GET /api/habits/trends/?from=2024-01-01&to=2024-03-31&period=week
+
+        Returns:
+        {
+            "from": "2024-01-01",
+            "to": "2024-03-31",
+            "period": "week",
+            "buckets": [
+                {
+                    "start": "2024-01-01",
+                    "completed": 12,
+                    "expected": 14,
+                    "rate": 85.7,
+                    "categories": {"health": {"completed": 6, "expected": 7}}
+                }
+            ]
+        }
+
+        period is day (default), week or month; the range defaults to the
+        30 days ending today. Read from daily rollups in one query.
+        """
+        start, end, period = get_trends_params(request.query_params)
+        return Response(
+            {
+                "from": start,
+                "to": end,
+                "period": period,
+                "buckets": trends.get_trends(request.user, start, end, period),
+            }
+        )
+
+    @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated])
+    def sync(self, request):
+        """
+        Get habits and logs changed since a cursor.
+        GET /api/habits/sync/?since=<cursor>
+
+        Returns:
+        {
+            "cursor": "1705312800000000-42",
+            "more": false,
+            "habits": [{"id": 1, "name": "Exercise", ..., "updated_at": ...}],
+            "logs": [{"id": 7, "habit_id": 1, "date": "2024-01-15", ...}],
+            "deleted": {"habits": [3], "logs": [12, 13]}
+        }
+
+        Without since, every habit and log is returned. Logs come in pages
+        of HABIT_SYNC_PAGE_SIZE: while "more" is true, request again with
+        the returned cursor. Pass the last cursor as since on the next sync;
+        rows may repeat across syncs and should be applied by id. An expired
+        cursor returns 410 Gone.
+        """
+        try:
+            changes = sync.get_changes(request.user, request.query_params.get("since"))
+        except sync.CursorExpired as error:
+            return Response({"since": [str(error)]}, status=status.HTTP_410_GONE)
+        except sync.CursorError as error:
+            return Response({"since": [str(error)]}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(changes)
+
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path="logs",
+        url_name="logs",
+        permission_classes=[IsAuthenticated, IsOwner],
+    )
+    def history(self, request, pk=None):
+        """
+        Get a habit's full log history, newest first, one page at a time.
+        GET /api/habits/{id}/logs/
+        """
+        habit = self.get_object()
+        paginator = HabitLogCursorPagination()
+        page = paginator.paginate_queryset(
+            HabitLog.objects.filter(habit=habit), request, view=self
+        )
+        serializer = HabitLogSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=["get"], permission_classes=[IsAuthenticated, IsOwner])
     def stats(self, request, pk=None):
         """
         Get habit statistics.
@@ -77,35 +512,88 @@ class HabitViewSet(viewsets.ModelViewSet):
             "longest_streak": 5,
             "completion_rate": 0.65,
             "total_logs": 13,
-            "completed_logs": 8
+            "completed_logs": 8,
+            "period_progress": {
+                "period": "week",
+                "start": "2024-01-15",
+                "completed": 2,
+                "goal": 3,
+                "met": false
+            }
         }
+
+        Streaks count days for daily habits and consecutive periods meeting
+        goal_count for weekly and monthly habits. Responses are served from
+        the versioned stats cache when possible (X-Cache: HIT or MISS), and
+        a matching If-None-Match is answered with 304.
         """
+        return self.conditional_response(request, self._stats_response, pk=pk)
+
+    def _stats_response(self, request, pk=None):
+        """Build the stats response, from the stats cache when possible."""
+        version = None
+        if str(pk).isdigit():
+            version = stats_cache.get_version(int(pk))
+            stats_data = stats_cache.get_stats(int(pk), version, request.user.pk)
+            if stats_data is not None:
+                return Response(stats_data, headers={"X-Cache": "HIT"})
+
         habit = self.get_object()
+        stats = HabitStats.objects.for_habit(habit)
+
+        if habit.frequency == HabitFrequency.DAILY:
+            streaks = Streaks(stats.current_streak, stats.longest_streak)
+            period_stats = daily_period_stats(streaks)
+        else:
+            period_stats = get_period_stats([habit])[habit.pk]
 
         stats_data = {
-            "current_streak": habit.calculate_current_streak(),
-            "longest_streak": habit.get_longest_streak(),
-            "completion_rate": habit.get_completion_rate(),
-            "total_logs": habit.logs.count(),
-            "completed_logs": habit.logs.filter(completed=True).count(),
+            "current_streak": period_stats.current_streak,
+            "longest_streak": period_stats.longest_streak,
+            "completion_rate": habit.completion_rate_for(stats.completed_logs),
+            "total_logs": stats.total_logs,
+            "completed_logs": stats.completed_logs,
+            "period_progress": period_stats.current_period.as_dict(),
         }
+        if version is not None:
+            stats_cache.set_stats(habit.pk, version, request.user.pk, stats_data)
 
-        return Response(stats_data)
+        return Response(stats_data, headers={"X-Cache": "MISS"})
 
 
-class HabitLogViewSet(viewsets.ModelViewSet):
+class HabitLogViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for HabitLog CRUD operations.
-    - List: GET /api/habit-logs/ (user's logs only)
-    - Create: POST /api/habit-logs/
-    - Retrieve: GET /api/habit-logs/{id}/
-    - Update: PUT/PATCH /api/habit-logs/{id}/
-    - Delete: DELETE /api/habit-logs/{id}/
+    - List: GET /api/habits/logs/ (user's logs only, cursor-paginated)
+    - Create: POST /api/habits/logs/
+    - Retrieve: GET /api/habits/logs/{id}/
+    - Update: PUT/PATCH /api/habits/logs/{id}/
+    - Delete: DELETE /api/habits/logs/{id}/
+
+    List and retrieve responses carry an ETag and answer a matching
+    If-None-Match with 304 Not Modified.
     """
 
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsOwner]
+    pagination_class = HabitLogCursorPagination
     serializer_class = HabitLogSerializer
 
+    def get_etag_validators(self):
+        """Validate the user's logs with one aggregate query."""
+        pk = self.kwargs.get("pk")
+        if self.detail and not str(pk).isdigit():
+            return None
+
+        logs = HabitLog.objects.filter(user=self.request.user)
+        if self.detail:
+            logs = logs.filter(pk=pk)
+        validators = logs.aggregate(
+            log_count=Count("id"), logs_updated=Max("updated_at")
+        )
+        if self.detail and not validators["log_count"]:
+            return None
+        return tuple(validators.values())
+
     def get_queryset(self):
-        """Return only logs for the current user's habits."""
-        return HabitLog.objects.filter(habit__user=self.request.user)
+        """Return only the current user's logs, filtered on HabitLog.user."""
+        return HabitLog.objects.filter(user=self.request.user)